@@ -0,0 +1,168 @@
+import copy
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+class TokenUserCache:
+    """
+    Bounded LRU of token key -> user with a TTL, optionally backed by a
+    shared Django cache.
+
+    The LRU is per process. Without a shared cache, invalidation only clears
+    it in the process that deleted the token or saved the user, and other
+    processes drop their copy when it expires after ``ttl`` seconds, so keep
+    the TTL short. With a shared cache, invalidation also writes a new
+    version of the token there, and a local entry is only trusted while the
+    version it was stored with is current.
+    """
+
+    def __init__(self, max_size, ttl, cache_alias=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.cache_alias = cache_alias
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _shared_key(self, key):
+        return "authtoken:" + hashlib.sha256(key.encode()).hexdigest()
+
+    def _version_key(self, key):
+        return "authtoken-version:" + hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[2] > now:
+                    self._entries.move_to_end(key)
+                else:
+                    del self._entries[key]
+                    entry = None
+
+        shared = caches[self.cache_alias] if self.cache_alias else None
+        if entry is not None:
+            user, version, _ = entry
+            # Another process may have revoked the token since it was stored.
+            if shared is None or shared.get(self._version_key(key)) == version:
+                # Concurrent requests must not share one user instance.
+                return copy.copy(user)
+            with self._lock:
+                self._entries.pop(key, None)
+
+        if shared is not None:
+            shared_key, version_key = self._shared_key(key), self._version_key(key)
+            found = shared.get_many([shared_key, version_key])
+            user = found.get(shared_key)
+            if user is not None:
+                self._store(key, user, found.get(version_key))
+                return user
+        return None
+
+    def set(self, key, user):
+        version = None
+        if self.cache_alias:
+            cache = caches[self.cache_alias]
+            version = cache.get(self._version_key(key))
+            cache.set(self._shared_key(key), user, self.ttl)
+        self._store(key, user, version)
+
+    def _store(self, key, user, version):
+        with self._lock:
+            self._entries[key] = (user, version, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _revoke(self, keys):
+        # Local entries live at most ``ttl``, so the version must outlive
+        # only those stored before it changed.
+        cache = caches[self.cache_alias]
+        cache.delete_many([self._shared_key(k) for k in keys])
+        cache.set_many({self._version_key(k): uuid.uuid4().hex for k in keys}, self.ttl)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.cache_alias:
+            self._revoke([key])
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            stale = [k for k, (u, _, _) in self._entries.items() if u.pk == user_id]
+            for key in stale:
+                del self._entries[key]
+        if self.cache_alias:
+            keys = Token.objects.filter(user_id=user_id).values_list("key", flat=True)
+            self._revoke(list(keys))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_token_cache = None
+
+
+def get_token_cache():
+    global _token_cache
+    if _token_cache is None:
+        config = settings.TOKEN_AUTH_CACHE
+        _token_cache = TokenUserCache(
+            max_size=config["MAX_SIZE"],
+            ttl=config["TTL"],
+            cache_alias=config.get("CACHE_ALIAS"),
+        )
+    return _token_cache
+
+
+def reset_token_cache():
+    global _token_cache
+    _token_cache = None
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that remembers recent token -> user lookups, saving
+    the authtoken_token/auth_user query on most requests.
+    """
+
+    def authenticate_credentials(self, key):
+        token_cache = get_token_cache()
+        user = token_cache.get(key)
+        if user is not None:
+            return user, Token(key=key, user=user)
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, user)
+        return user, token
+
+
+async def aauthenticate(request):
+    """
+    Resolve ``Authorization: Token <key>`` for plain async Django views,
+    which cannot use DRF's synchronous authentication classes.
+    Returns the active user or None.
+    """
+    keyword, _, key = request.headers.get("Authorization", "").partition(" ")
+    if keyword != "Token" or not key:
+        return None
+    token_cache = get_token_cache()
+    user = token_cache.get(key)
+    if user is not None:
+        return user
+    try:
+        token = await Token.objects.select_related("user").aget(key=key)
+    except Token.DoesNotExist:
+        return None
+    if not token.user.is_active:
+        return None
+    token_cache.set(key, token.user)
+    return token.user
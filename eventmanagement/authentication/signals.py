@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import get_token_cache, reset_token_cache
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def invalidate_cached_token(sender, instance, **kwargs):
+    get_token_cache().invalidate(instance.key)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, created, **kwargs):
+    # Covers deactivation as well as any other change to the cached user.
+    if not created:
+        get_token_cache().invalidate_user(instance.pk)
+
+
+@receiver(setting_changed)
+def reload_token_cache(setting, **kwargs):
+    if setting == "TOKEN_AUTH_CACHE":
+        reset_token_cache()
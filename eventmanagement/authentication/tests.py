@@ -1,3 +1,104 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from authentication.authentication import TokenUserCache, get_token_cache
 
-# Create your tests here.
+User = get_user_model()
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        get_token_cache().clear()
+        self.user = User.objects.create_user(username="user", password="pass123")
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.url = reverse("reservation-list")
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(self.url)
+        return resp, len(ctx.captured_queries)
+
+    def test_cached_requests_skip_token_lookup(self):
+        _, uncached = self.count_queries()
+        resp, cached = self.count_queries()
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(uncached - cached, 1)
+
+    def test_deleted_token_is_rejected(self):
+        self.count_queries()
+        self.token.delete()
+        resp, _ = self.count_queries()
+        self.assertEqual(resp.status_code, 401)
+
+    def test_rotated_token_is_rejected(self):
+        self.count_queries()
+        old_key = self.token.key
+        self.token.delete()
+        Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {old_key}")
+        resp, _ = self.count_queries()
+        self.assertEqual(resp.status_code, 401)
+
+    def test_deactivated_user_is_rejected(self):
+        self.count_queries()
+        self.user.is_active = False
+        self.user.save()
+        resp, _ = self.count_queries()
+        self.assertEqual(resp.status_code, 401)
+
+    @override_settings(
+        TOKEN_AUTH_CACHE={"MAX_SIZE": 10, "TTL": 60, "CACHE_ALIAS": "default"}
+    )
+    def test_shared_cache_backing(self):
+        cache.clear()
+        self.count_queries()
+        get_token_cache().clear()  # Simulates another worker with a cold LRU.
+        _, queries = self.count_queries()
+        # The list's validators and page count, but no token lookup.
+        self.assertEqual(queries, 2)
+
+        self.token.delete()
+        get_token_cache().clear()
+        resp, _ = self.count_queries()
+        self.assertEqual(resp.status_code, 401)
+
+
+class TokenUserCacheTests(TestCase):
+    def test_lru_eviction_and_ttl(self):
+        users = [User(pk=i, username=f"u{i}") for i in range(3)]
+        lru = TokenUserCache(max_size=2, ttl=60)
+        for i, user in enumerate(users):
+            lru.set(f"key{i}", user)
+        self.assertIsNone(lru.get("key0"))
+        self.assertEqual(lru.get("key2").username, "u2")
+
+        expired = TokenUserCache(max_size=2, ttl=0)
+        expired.set("key", users[0])
+        self.assertIsNone(expired.get("key"))
+
+    @override_settings(
+        TOKEN_AUTH_CACHE={"MAX_SIZE": 10, "TTL": 60, "CACHE_ALIAS": "default"}
+    )
+    def test_revocation_reaches_other_processes(self):
+        cache.clear()
+        user = User.objects.create_user(username="u", password="pass")
+        key = Token.objects.create(user=user).key
+        worker = TokenUserCache(max_size=10, ttl=60, cache_alias="default")
+        other = TokenUserCache(max_size=10, ttl=60, cache_alias="default")
+        worker.set(key, user)
+        self.assertEqual(other.get(key).pk, user.pk)
+
+        worker.invalidate(key)
+        self.assertIsNone(other.get(key))
+
+        other.set(key, user)
+        self.assertEqual(worker.get(key).pk, user.pk)
+        other.invalidate_user(user.pk)
+        self.assertIsNone(worker.get(key))
@@ -3,6 +3,7 @@ from rest_framework import generics
 from rest_framework.permissions import AllowAny
 from rest_framework.serializers import ModelSerializer
 from rest_framework.authtoken.models import Token
+from eventmanagement.ratelimit import RateLimitMixin
 
 
 class UserSerializer(ModelSerializer):
@@ -17,7 +18,8 @@ class UserSerializer(ModelSerializer):
         return user
 
 
-class SignupView(generics.CreateAPIView):
+class SignupView(RateLimitMixin, generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [AllowAny]
+    rate_limit_policy = "signup"
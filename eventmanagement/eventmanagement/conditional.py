@@ -0,0 +1,56 @@
+"""
+Conditional GET for read endpoints.
+
+Views describe what a response is built from with a small ``state`` dict,
+read with one aggregate query (row count, newest ``updated_at``, seat
+totals) or from an already loaded object, and ``serve`` turns it into a
+strong ETag and a Last-Modified header. A client whose copy is current gets
+a 304 before anything is serialized.
+
+Only If-None-Match is answered. Last-Modified has whole-second precision,
+so a seat claimed in the same second as the client's read would get a 304
+for stale data; deleting a row moves no timestamp at all. The header is
+still sent for caches and clients that display it.
+"""
+
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+
+def make_etag(request, state):
+    """Hash of the state and everything else that shapes the body."""
+    renderer = getattr(request, "accepted_renderer", None)
+    # Pagination links are absolute, so the host and query are part of it.
+    key = repr(
+        (
+            request.build_absolute_uri(),
+            renderer.format if renderer else None,
+            sorted(state.items()),
+        )
+    )
+    return quote_etag(hashlib.sha1(key.encode()).hexdigest())
+
+
+def newest(*times):
+    times = [t for t in times if t is not None]
+    return max(times) if times else None
+
+
+def serve(request, state, build):
+    """
+    A 304 if the client's copy matches ``state``, else ``Response(build())``,
+    with validators either way. ``state["last_modified"]`` is sent as
+    Last-Modified.
+    """
+    etag = make_etag(request, state)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = Response(build())
+    response["ETag"] = etag
+    last_modified = state.get("last_modified")
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    return response
@@ -0,0 +1,98 @@
+"""
+``DATABASES["default"]`` built from the environment.
+
+``DB_ENGINE`` selects ``sqlite`` (default, for local development) or
+``postgresql``. SQLite allows a single writer at a time; WAL mode lets
+readers run alongside it, and the busy timeout plus ``BEGIN IMMEDIATE`` make
+concurrent writers queue for the lock instead of failing with "database is
+locked". PostgreSQL keeps connections open between requests, or uses
+Django's connection pool when ``DB_POOL=1``, which requires psycopg 3
+(``psycopg[pool]``) instead of psycopg2.
+"""
+
+import os
+from importlib.util import find_spec
+
+from django.core.exceptions import ImproperlyConfigured
+
+
+def env_flag(name, default):
+    return os.environ.get(name, default) == "1"
+
+
+def sqlite_config(base_dir):
+    return {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.environ.get("SQLITE_PATH", base_dir / "db.sqlite3"),
+        "OPTIONS": {
+            # Seconds a connection waits on a locked database (busy_timeout).
+            "timeout": float(os.environ.get("SQLITE_BUSY_TIMEOUT", 20)),
+            # Take the write lock when the transaction starts. A deferred
+            # transaction that reads and then writes cannot wait for the lock,
+            # it fails immediately if another writer got there first.
+            "transaction_mode": "IMMEDIATE",
+            "init_command": "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;",
+        },
+        # An in-memory test database uses shared-cache table locks, which
+        # ignore the busy timeout, so threaded tests need a file.
+        "TEST": {"NAME": base_dir / "test_db.sqlite3"},
+    }
+
+
+def postgresql_config():
+    config = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": os.environ.get("POSTGRES_DB", "test_db"),
+        "USER": os.environ.get("POSTGRES_USER", "postgres"),
+        "PASSWORD": os.environ.get("POSTGRES_PASSWORD", "postgres"),
+        "HOST": os.environ.get("POSTGRES_HOST", "localhost"),
+        "PORT": os.environ.get("POSTGRES_PORT", "5432"),
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {},
+    }
+    if env_flag("DB_POOL", "0"):
+        # Django's pool is only implemented for psycopg 3, not psycopg2.
+        if not (find_spec("psycopg") and find_spec("psycopg_pool")):
+            raise ImproperlyConfigured(
+                'DB_POOL=1 requires psycopg 3, install "psycopg[binary,pool]".'
+            )
+        # Size the pool per worker process: workers * max_size must stay
+        # below the server's max_connections.
+        config["OPTIONS"]["pool"] = {
+            "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", 10)),
+            "timeout": float(os.environ.get("DB_POOL_TIMEOUT", 10)),
+        }
+        # The pool owns connection reuse; persistent connections must be off.
+        config["CONN_MAX_AGE"] = 0
+    return config
+
+
+def replica_configs(base_dir):
+    """
+    One ``replicaN`` alias per comma-separated ``DB_REPLICAS`` entry, with the
+    primary's settings otherwise. Entries are ``host[:port]`` for PostgreSQL
+    and file paths for SQLite. Tests read replicas through ``default``.
+    """
+    primary = database_config(base_dir)
+    entries = [e.strip() for e in os.environ.get("DB_REPLICAS", "").split(",")]
+    replicas = {}
+    for entry in filter(None, entries):
+        config = {**primary, "TEST": {"MIRROR": "default"}}
+        if primary["ENGINE"] == "django.db.backends.sqlite3":
+            config["NAME"] = entry
+        else:
+            host, _, port = entry.partition(":")
+            config["HOST"], config["PORT"] = host, port or primary["PORT"]
+        replicas[f"replica{len(replicas)}"] = config
+    return replicas
+
+
+def database_config(base_dir):
+    engine = os.environ.get("DB_ENGINE", "sqlite")
+    if engine == "sqlite":
+        return sqlite_config(base_dir)
+    if engine == "postgresql":
+        return postgresql_config()
+    raise ValueError(f"Unsupported DB_ENGINE {engine!r}, use sqlite or postgresql.")
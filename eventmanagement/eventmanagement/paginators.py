@@ -0,0 +1,43 @@
+"""
+Paginator for admin changelists over large tables.
+
+Django's paginator runs ``COUNT(*)`` over the whole filtered table on every
+page. ``EstimatedCountPaginator`` stops counting after ``limit`` rows, and
+for unfiltered lists on PostgreSQL reports the planner's row estimate from
+``pg_class`` once the table is larger than that. Page numbers past the
+count are not reachable, so lists with more matches than ``limit`` should
+be narrowed with filters or search.
+"""
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimated_rows(model, using):
+    """The planner's row estimate for ``model``'s table, or None."""
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    # -1 until the table is first vacuumed or analyzed.
+    return int(row[0]) if row and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    limit = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_rows(queryset.model, queryset.db)
+            if estimate is not None and estimate > self.limit:
+                return estimate
+        # Only the primary keys, so list annotations are not computed.
+        return queryset.values("pk")[: self.limit].count()
@@ -0,0 +1,254 @@
+"""
+Opt-in request profiling.
+
+For a sampled fraction of requests ``ProfilingMiddleware`` records wall time,
+database query count and time, and serializer time (``is_valid``, ``.data``
+and ``RowSerializer.many``). The numbers are returned in a ``Server-Timing``
+header, aggregated per view for ``/api/ops/profile/`` and optionally logged.
+Unsampled requests only pay for a random draw and a context variable
+check per query and serializer call.
+"""
+
+import bisect
+import contextvars
+import logging
+import random
+import threading
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from drf_spectacular.utils import extend_schema
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer
+from rest_framework.views import APIView
+
+from .rows import RowSerializer
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the wall time histogram buckets; the last one is open.
+BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+
+_current = contextvars.ContextVar("request_profile", default=None)
+
+
+class RequestProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.wall = 0.0
+        self.db_time = 0.0
+        self.queries = 0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+
+
+class ProfileStats:
+    """Per-process aggregates of sampled requests, keyed by view name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.views = {}
+
+    def record(self, view, profile):
+        with self._lock:
+            entry = self.views.get(view)
+            if entry is None:
+                entry = self.views[view] = {
+                    "count": 0,
+                    "wall": 0.0,
+                    "db": 0.0,
+                    "queries": 0,
+                    "serializer": 0.0,
+                    "histogram": [0] * (len(BUCKETS_MS) + 1),
+                }
+            entry["count"] += 1
+            entry["wall"] += profile.wall
+            entry["db"] += profile.db_time
+            entry["queries"] += profile.queries
+            entry["serializer"] += profile.serializer_time
+            entry["histogram"][bisect.bisect_left(BUCKETS_MS, profile.wall * 1000)] += 1
+
+    def as_dict(self):
+        with self._lock:
+            views = {view: dict(entry) for view, entry in self.views.items()}
+        result = {}
+        for view, entry in sorted(views.items()):
+            count = entry["count"]
+            result[view] = {
+                "count": count,
+                "avg_wall_ms": round(entry["wall"] * 1000 / count, 2),
+                "avg_db_ms": round(entry["db"] * 1000 / count, 2),
+                "avg_queries": round(entry["queries"] / count, 2),
+                "avg_serializer_ms": round(entry["serializer"] * 1000 / count, 2),
+                "wall_ms_histogram": dict(
+                    zip([str(b) for b in BUCKETS_MS] + ["+Inf"], entry["histogram"])
+                ),
+            }
+        return result
+
+
+stats = ProfileStats()
+
+
+def timed_queries(execute, sql, params, many, context):
+    """Database execute wrapper; a no-op outside profiled requests."""
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.db_time += time.perf_counter() - started
+        profile.queries += 1
+
+
+def add_wrapper(connection, **kwargs):
+    if timed_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(timed_queries)
+
+
+def timed_serializer(func):
+    """Add the outermost serializer call's time to the current profile."""
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        profile = _current.get()
+        if profile is None:
+            return func(*args, **kwargs)
+        profile.serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.serializer_depth -= 1
+            if not profile.serializer_depth:
+                profile.serializer_time += time.perf_counter() - started
+
+    return wrapper
+
+
+_installed = False
+
+
+def install():
+    """Hook the query and serializer timers in once per process."""
+    global _installed
+    # Wrappers live on each thread's connection object. Cover this thread's
+    # existing connections here and connections opened later via the signal.
+    for connection in connections.all(initialized_only=True):
+        add_wrapper(connection)
+    if _installed:
+        return
+    _installed = True
+    connection_created.connect(add_wrapper)
+    BaseSerializer.is_valid = timed_serializer(BaseSerializer.is_valid)
+    BaseSerializer.data = property(timed_serializer(BaseSerializer.data.fget))
+    RowSerializer.many = timed_serializer(RowSerializer.many)
+
+
+def view_name(request):
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match else "unresolved"
+
+
+class ProfilingMiddleware:
+    """
+    Samples ``REQUEST_PROFILING["SAMPLE_RATE"]`` of requests when
+    ``REQUEST_PROFILING["ENABLED"]`` is set. Put it first in MIDDLEWARE so
+    the wall time covers the rest of the stack.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        if settings.REQUEST_PROFILING["ENABLED"]:
+            install()
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        profile = RequestProfile()
+        token = _current.set(profile)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, profile)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        profile = RequestProfile()
+        token = _current.set(profile)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, profile)
+
+    def sampled(self):
+        config = settings.REQUEST_PROFILING
+        if not config["ENABLED"]:
+            return False
+        install()
+        return random.random() < config["SAMPLE_RATE"]
+
+    def finish(self, request, response, profile):
+        config = settings.REQUEST_PROFILING
+        profile.wall = time.perf_counter() - profile.started
+        view = view_name(request)
+        stats.record(view, profile)
+        if config["SERVER_TIMING"]:
+            response["Server-Timing"] = (
+                f"total;dur={profile.wall * 1000:.2f}, "
+                f'db;dur={profile.db_time * 1000:.2f};desc="{profile.queries} queries", '
+                f"serializer;dur={profile.serializer_time * 1000:.2f}"
+            )
+        if config["LOG"]:
+            logger.info(
+                f"{request.method} {view} {response.status_code} "
+                f"wall={profile.wall * 1000:.1f}ms db={profile.db_time * 1000:.1f}ms "
+                f"queries={profile.queries} serializer={profile.serializer_time * 1000:.1f}ms"
+            )
+        return response
+
+
+# An ops endpoint, not part of the public API schema.
+@extend_schema(exclude=True)
+class ProfileStatsView(APIView):
+    """
+    Aggregated timings of sampled requests in this process, per view.
+    DELETE resets the counters. Only staff users can access this endpoint.
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(
+            {
+                "enabled": settings.REQUEST_PROFILING["ENABLED"],
+                "sample_rate": settings.REQUEST_PROFILING["SAMPLE_RATE"],
+                "views": stats.as_dict(),
+            }
+        )
+
+    def delete(self, request):
+        stats.reset()
+        return Response(status=204)
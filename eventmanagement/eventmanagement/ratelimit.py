@@ -0,0 +1,276 @@
+"""
+Token-bucket rate limits for the booking and signup endpoints.
+
+Views using ``RateLimitMixin`` name a policy from ``RATE_LIMITS["POLICIES"]``,
+which maps scopes to DRF-style rates such as ``{"user": "10/min"}``. Every
+scope value gets a bucket holding up to N tokens that refills at N per
+period, so a client may burst N requests and then continue at the rate.
+Scopes are read from the raw request: ``user`` is a hash of the token in
+the Authorization header, ``ip`` the REMOTE_ADDR and ``event`` the
+``event_id`` in the body. The check runs before authentication, so a
+rejected request gets its 429 without a database query. Every bucket is
+checked before tokens are taken from any of them, so a request rejected by
+one scope does not use up the others.
+
+``LocalStore`` keeps exact buckets per process. ``CacheStore`` shares them
+between workers through a Django cache (e.g. Redis) using atomic increments.
+"""
+
+import hashlib
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from drf_spectacular.utils import extend_schema
+from rest_framework import exceptions, permissions
+from rest_framework.authentication import get_authorization_header
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    """``"10/min"`` -> ``(10, 60)``: bucket size and seconds to refill it."""
+    num, period = rate.split("/")
+    return int(num), PERIODS[period[0]]
+
+
+class LocalStore:
+    """Buckets in process memory; the least recently used are dropped first."""
+
+    max_size = 100000
+
+    def __init__(self):
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def tokens(self, key, capacity, period, now):
+        tokens, last = self._buckets.get(key, (capacity, now))
+        return min(capacity, tokens + (now - last) * capacity / period)
+
+    def peek(self, key, capacity, period, now):
+        """Seconds until a token is available, without taking it."""
+        with self._lock:
+            tokens = self.tokens(key, capacity, period, now)
+        return 0 if tokens >= 1 else (1 - tokens) * period / capacity
+
+    def consume(self, key, capacity, period, now):
+        """Take a token. Returns 0, or the seconds until one is available."""
+        rate = capacity / period
+        with self._lock:
+            tokens = self.tokens(key, capacity, period, now)
+            self._buckets.pop(key, None)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_size:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def refund(self, key, capacity, period, now):
+        """Give back a token taken by ``consume``."""
+        with self._lock:
+            if key in self._buckets:
+                tokens = self.tokens(key, capacity, period, now)
+                self._buckets[key] = (min(capacity, tokens + 1), now)
+
+
+class CacheStore:
+    """
+    Buckets in ``caches[RATE_LIMITS["CACHE_ALIAS"]]``. A bucket is the time it
+    started filling and an atomically incremented count of tokens taken; it
+    has earned ``capacity + elapsed * rate`` tokens so far. Both keys expire
+    one period after the last allowed request, when the bucket would be full
+    again anyway.
+    """
+
+    def peek(self, key, capacity, period, now):
+        cache = caches[settings.RATE_LIMITS["CACHE_ALIAS"]]
+        found = cache.get_many([f"{key}:start", f"{key}:taken"])
+        if f"{key}:start" not in found:
+            return 0
+        earned = capacity + (now - found[f"{key}:start"]) * capacity / period
+        taken = found.get(f"{key}:taken", 0) + 1
+        return 0 if taken <= earned else (taken - earned) * period / capacity
+
+    def consume(self, key, capacity, period, now):
+        cache = caches[settings.RATE_LIMITS["CACHE_ALIAS"]]
+        rate = capacity / period
+        timeout = math.ceil(period)
+        start_key, taken_key = f"{key}:start", f"{key}:taken"
+
+        start = cache.get(start_key)
+        if start is None:
+            if cache.add(start_key, now, timeout):
+                cache.set(taken_key, 0, timeout)
+            start = cache.get(start_key, now)
+        try:
+            taken = cache.incr(taken_key)
+        except ValueError:
+            cache.add(taken_key, 1, timeout)
+            taken = 1
+
+        earned = capacity + (now - start) * rate
+        if taken > earned:
+            cache.decr(taken_key)
+            return (taken - earned) / rate
+        # Tokens beyond the bucket size were never really earned; move the
+        # start forward so an idle client cannot bank them for a burst.
+        surplus = earned - (taken - 1) - capacity
+        cache.set(start_key, start + max(surplus, 0) / rate, timeout)
+        cache.touch(taken_key, timeout)
+        return 0
+
+    def refund(self, key, capacity, period, now):
+        try:
+            caches[settings.RATE_LIMITS["CACHE_ALIAS"]].decr(f"{key}:taken")
+        except ValueError:
+            pass
+
+
+_stores = {}
+
+
+def get_store():
+    path = settings.RATE_LIMITS["STORE"]
+    if path not in _stores:
+        _stores[path] = import_string(path)()
+    return _stores[path]
+
+
+def user_scope(request):
+    # Parsed like TokenAuthentication does, so "token <key>" and "Token <key>"
+    # share a bucket.
+    parts = get_authorization_header(request).split()
+    if len(parts) != 2 or parts[0].lower() != b"token":
+        return None
+    return parts[1].decode("latin-1")
+
+
+def ip_scope(request):
+    return request.META.get("REMOTE_ADDR")
+
+
+def event_scope(request):
+    if hasattr(request, "data"):
+        data = request.data
+    else:
+        # A plain Django request, e.g. of the async reservation endpoint.
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            data = None
+    event_id = data.get("event_id") if hasattr(data, "get") else None
+    return None if event_id is None else str(event_id)
+
+
+SCOPES = {"user": user_scope, "ip": ip_scope, "event": event_scope}
+
+
+class RateLimitStats:
+    """Per-process allowed/rejected counters per policy and scope."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts = {}
+
+    def record(self, policy, scope, allowed):
+        with self._lock:
+            entry = self.counts.setdefault(
+                f"{policy}:{scope}", {"allowed": 0, "rejected": 0}
+            )
+            entry["allowed" if allowed else "rejected"] += 1
+
+    def as_dict(self):
+        with self._lock:
+            return {name: dict(entry) for name, entry in sorted(self.counts.items())}
+
+
+stats = RateLimitStats()
+
+
+def check(policy, request):
+    """Take a token from each of the policy's buckets or raise ``Throttled``."""
+    config = settings.RATE_LIMITS
+    if not config["ENABLED"]:
+        return
+    now = time.time()
+    store = get_store()
+    buckets = []
+    for scope, rate in config["POLICIES"][policy].items():
+        value = SCOPES[scope](request)
+        if value is None:
+            continue
+        digest = hashlib.sha256(value.encode()).hexdigest()
+        buckets.append(
+            (scope, f"ratelimit:{policy}:{scope}:{digest}", *parse_rate(rate))
+        )
+
+    for scope, key, capacity, period in buckets:
+        wait = store.peek(key, capacity, period, now)
+        if wait:
+            stats.record(policy, scope, allowed=False)
+            raise exceptions.Throttled(wait=wait)
+
+    taken = []
+    for scope, key, capacity, period in buckets:
+        wait = store.consume(key, capacity, period, now)
+        if wait:
+            # A concurrent request emptied the bucket since the peek.
+            for key, capacity, period in taken:
+                store.refund(key, capacity, period, now)
+            stats.record(policy, scope, allowed=False)
+            raise exceptions.Throttled(wait=wait)
+        taken.append((key, capacity, period))
+    for scope, *_ in buckets:
+        stats.record(policy, scope, allowed=True)
+
+
+class RateLimitMixin:
+    """
+    Check ``rate_limit_policy`` before authentication. Viewsets may map
+    actions to policies instead, e.g. ``{"create": "reservation-create"}``.
+    """
+
+    rate_limit_policy = None
+
+    def initial(self, request, *args, **kwargs):
+        policy = self.rate_limit_policy
+        if isinstance(policy, dict):
+            policy = policy.get(getattr(self, "action", None))
+        if policy:
+            check(policy, request)
+        super().initial(request, *args, **kwargs)
+
+
+# An ops endpoint, not part of the public API schema.
+@extend_schema(exclude=True)
+class RateLimitStatsView(APIView):
+    """
+    Allowed and rejected requests per policy and scope in this process.
+    DELETE resets the counters. Only staff users can access this endpoint.
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(
+            {"enabled": settings.RATE_LIMITS["ENABLED"], "limits": stats.as_dict()}
+        )
+
+    def delete(self, request):
+        stats.reset()
+        return Response(status=204)
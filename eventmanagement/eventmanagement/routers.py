@@ -0,0 +1,117 @@
+"""
+Read-replica routing.
+
+``ReplicaRoutingMiddleware`` marks GET/HEAD/OPTIONS requests as replica
+reads; ``ReplicaRouter`` then sends their queries to a random replica and
+everything else to ``default``. A client that just made a write (any other
+method that did not fail) is pinned to ``default`` for
+``REPLICA_ROUTING["STICKY_SECONDS"]`` so it reads its own reservation or
+cancellation while replicas catch up. Clients are identified by their
+Authorization header or session cookie, hashed; anonymous clients are never
+pinned. Data stored in shared caches is read inside ``use_primary()``, since
+a replica that lags behind would otherwise be served to every client until
+the next write.
+"""
+
+import contextlib
+import contextvars
+import hashlib
+import random
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_use_replica = contextvars.ContextVar("use_replica", default=False)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = settings.REPLICA_ROUTING["ALIASES"]
+        if replicas and _use_replica.get():
+            return random.choice(replicas)
+        return None
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+
+@contextlib.contextmanager
+def use_primary():
+    """Send the reads made in the block to ``default``."""
+    token = _use_replica.set(False)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def pin_key(request):
+    """Cache key pinning this client to the primary, or None if anonymous."""
+    identity = request.headers.get("Authorization") or request.COOKIES.get(
+        settings.SESSION_COOKIE_NAME
+    )
+    if not identity:
+        return None
+    return "replica:pin:" + hashlib.sha256(identity.encode()).hexdigest()
+
+
+class ReplicaRoutingMiddleware:
+    """Decide per request whether reads may use a replica."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not settings.REPLICA_ROUTING["ALIASES"]:
+            return self.get_response(request)
+        key = pin_key(request)
+        token = _use_replica.set(self.can_use_replica(request, key))
+        try:
+            response = self.get_response(request)
+        finally:
+            _use_replica.reset(token)
+        self.pin_after_write(request, response, key)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.REPLICA_ROUTING["ALIASES"]:
+            return await self.get_response(request)
+        key = pin_key(request)
+        safe = request.method in SAFE_METHODS
+        pinned = safe and key is not None and await cache().aget(key)
+        token = _use_replica.set(safe and not pinned)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _use_replica.reset(token)
+        if key and not safe and response.status_code < 400:
+            await cache().aset(key, True, settings.REPLICA_ROUTING["STICKY_SECONDS"])
+        return response
+
+    def can_use_replica(self, request, key):
+        if request.method not in SAFE_METHODS:
+            return False
+        return key is None or not cache().get(key)
+
+    def pin_after_write(self, request, response, key):
+        if key and request.method not in SAFE_METHODS and response.status_code < 400:
+            cache().set(key, True, settings.REPLICA_ROUTING["STICKY_SECONDS"])
+
+
+def cache():
+    return caches[settings.REPLICA_ROUTING["CACHE_ALIAS"]]
@@ -0,0 +1,160 @@
+"""
+Read-only fast paths for DRF serializers on hot list and detail endpoints.
+
+A ``RowSerializer`` produces the same output as its ``serializer_class`` from
+``.values()`` rows, skipping model instances and the per-field
+``to_representation`` machinery. The plan is compiled once from the DRF
+serializer's fields: each readable field becomes a column and a converter,
+so renamed or added fields change both outputs together. Fields whose
+output cannot be read from one column (method fields, non-pk relations,
+nested serializers not listed in ``nested``) fail at compile time instead of
+drifting. DRF serializers are still used for input and writes.
+"""
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from django.utils.functional import classproperty
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+# Fields whose to_representation returns database values unchanged.
+PASSTHROUGH = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+)
+
+
+def iso_datetime(tz):
+    def convert(value):
+        value = value.astimezone(tz).isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    return convert
+
+
+class RowSerializer:
+    """
+    ``columns`` lists what to pass to ``.values()``; ``many`` and ``one``
+    turn the rows into the serializer's output. ``instance_row`` builds the
+    same row from an already loaded instance, for detail views.
+    """
+
+    serializer_class = None
+    # Output field name -> column, for fields not read from their own source.
+    sources = {}
+    # Output field name -> RowSerializer class for nested serializers.
+    nested = {}
+
+    def __init__(self, prefix=""):
+        self.prefix = prefix
+        self.children = {
+            name: row_serializer(f"{prefix}{name}__")
+            for name, row_serializer in self.nested.items()
+        }
+
+    @classproperty
+    def fields(cls):
+        # Built once per class; DRF fields are expensive to instantiate.
+        if "_fields" not in cls.__dict__:
+            cls._fields = [
+                (name, field)
+                for name, field in cls.serializer_class().fields.items()
+                if not field.write_only
+            ]
+        return cls._fields
+
+    def compile(self):
+        """
+        (name, column, converter) per field; nested fields have no column
+        and their own plan as converter. Compiled per page, since the
+        output time zone is the one active for the request.
+        """
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        plan = []
+        for name, field in self.fields:
+            if name in self.children:
+                plan.append((name, None, self.children[name].compile()))
+                continue
+            column = self.sources.get(name) or self.column(name, field)
+            plan.append((name, self.prefix + column, self.converter(field, tz)))
+        return plan
+
+    def column(self, name, field):
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            if field.pk_field is None and "." not in field.source:
+                return f"{field.source}_id"
+        elif isinstance(field, serializers.Field) and not isinstance(
+            field,
+            (serializers.BaseSerializer, serializers.RelatedField)
+            + (serializers.SerializerMethodField, serializers.HiddenField),
+        ):
+            if field.source != "*" and "." not in field.source:
+                return field.source
+        raise ImproperlyConfigured(
+            f"{type(self).__name__} cannot read '{name}' from a column; "
+            f"set it in 'sources' or 'nested'."
+        )
+
+    def converter(self, field, tz):
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            return None
+        if isinstance(field, serializers.DateTimeField):
+            output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+            if output_format == ISO_8601 and not hasattr(field, "timezone") and tz:
+                return iso_datetime(tz)
+            return field.to_representation
+        if isinstance(field, PASSTHROUGH):
+            return None
+        return field.to_representation
+
+    @property
+    def columns(self):
+        columns = []
+        for name, column, _ in self.compile():
+            if name in self.children:
+                columns.extend(self.children[name].columns)
+            else:
+                columns.append(column)
+        return columns
+
+    def prepare(self, rows):
+        """Add data that needs extra queries to the rows, once per page."""
+        for child in self.children.values():
+            child.prepare(rows)
+
+    def represent(self, row, plan):
+        data = {}
+        for name, column, convert in plan:
+            if column is None:
+                data[name] = self.children[name].represent(row, convert)
+                continue
+            value = row[column]
+            data[name] = value if value is None or convert is None else convert(value)
+        return data
+
+    def one(self, row):
+        return self.many([row])[0]
+
+    def many(self, rows):
+        rows = list(rows)
+        self.prepare(rows)
+        plan = self.compile()
+        return [self.represent(row, plan) for row in rows]
+
+    def instance_row(self, instance, row=None):
+        """The row ``.values(*columns)`` would return for ``instance``."""
+        row = {} if row is None else row
+        for name, column, _ in self.compile():
+            if name in self.children:
+                self.children[name].instance_row(getattr(instance, name), row)
+                continue
+            value = instance
+            for attr in column[len(self.prefix) :].split("__"):
+                value = getattr(value, attr)
+            row[column] = value
+        return row
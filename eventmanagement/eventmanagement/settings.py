@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 
+from .database import database_config, replica_configs
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -47,6 +49,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "eventmanagement.profiling.ProfilingMiddleware",
+    "eventmanagement.routers.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -79,22 +83,62 @@ WSGI_APPLICATION = "eventmanagement.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
+# Selected with DB_ENGINE (sqlite or postgresql), see eventmanagement/database.py.
+# DB_REPLICAS adds read replicas used by safe-method requests.
+DATABASES = {"default": database_config(BASE_DIR), **replica_configs(BASE_DIR)}
+DATABASE_ROUTERS = ["eventmanagement.routers.ReplicaRouter"]
+
+# Clients that just wrote read from the primary for STICKY_SECONDS, tracked in
+# CACHE_ALIAS (use a shared cache when running several workers).
+REPLICA_ROUTING = {
+    "ALIASES": [alias for alias in DATABASES if alias != "default"],
+    "STICKY_SECONDS": int(os.environ.get("REPLICA_STICKY_SECONDS", 5)),
+    "CACHE_ALIAS": os.environ.get("REPLICA_PIN_CACHE_ALIAS", "default"),
+}
+
+
+# Caches
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "events": {
+        "BACKEND": os.environ.get(
+            "EVENT_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("EVENT_CACHE_LOCATION", "events"),
+        "TIMEOUT": int(os.environ.get("EVENT_CACHE_TIMEOUT", 60)),
+        # Eviction options for the local-memory, file and database backends.
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.environ.get("EVENT_CACHE_MAX_ENTRIES", 1000)),
+            "CULL_FREQUENCY": int(os.environ.get("EVENT_CACHE_CULL_FREQUENCY", 3)),
+        },
+    },
+}
+
+# Read-through cache for event list/detail responses, see events/cache.py.
+EVENT_CACHE = {
+    "ENABLED": os.environ.get("EVENT_CACHE_ENABLED", "1") == "1",
+    "ALIAS": "events",
+}
+
+# Days ahead for which recurring event series have their occurrences created.
+EVENT_SERIES_HORIZON_DAYS = int(os.environ.get("EVENT_SERIES_HORIZON_DAYS", 90))
+
+# Live seat count streams, see events/availability.py. Use CacheBackend with
+# a shared cache (e.g. Redis) when running more than one worker process.
+EVENT_AVAILABILITY = {
+    "BACKEND": os.environ.get(
+        "EVENT_AVAILABILITY_BACKEND", "events.availability.LocalBackend"
+    ),
+    "CACHE_ALIAS": "events",
+    # Seconds between fan-outs; changes within a tick are sent once.
+    "TICK": float(os.environ.get("EVENT_AVAILABILITY_TICK", 0.5)),
+    # Seconds of silence before a keepalive comment is sent.
+    "HEARTBEAT": float(os.environ.get("EVENT_AVAILABILITY_HEARTBEAT", 15)),
 }
-# DATABASES = {
-#     "default": {
-#         "ENGINE": "django.db.backends.postgresql",
-#         "NAME": os.environ.get("POSTGRES_DB", "test_db"),
-#         "USER": os.environ.get("POSTGRES_USER", "postgres"),
-#         "PASSWORD": os.environ.get("POSTGRES_PASSWORD", "postgres"),
-#         "HOST": os.environ.get("POSTGRES_HOST", "localhost"),
-#         "PORT": os.environ.get("POSTGRES_PORT", "5432"),
-#     }
-# }
 
 
 # Password validation
@@ -120,13 +164,76 @@ REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "authentication.authentication.CachedTokenAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
 }
 
+# Token-bucket limits checked before authentication, see
+# eventmanagement/ratelimit.py. Rates are "<requests>/<s|min|hour|day>"; the
+# number is also the burst size. Use CacheStore with a shared cache to apply
+# the limits across worker processes.
+RATE_LIMITS = {
+    "ENABLED": os.environ.get("RATE_LIMIT_ENABLED", "0") == "1",
+    "STORE": os.environ.get("RATE_LIMIT_STORE", "eventmanagement.ratelimit.LocalStore"),
+    "CACHE_ALIAS": "default",
+    "POLICIES": {
+        "reservation-create": {"user": "10/min", "ip": "60/min", "event": "50/s"},
+        "signup": {"ip": "5/hour"},
+    },
+}
+
+# Token -> user lookups cached by CachedTokenAuthentication. Set
+# TOKEN_AUTH_CACHE_ALIAS to a shared cache (e.g. Redis) to share entries and
+# revocations between workers. Without it, other workers accept a revoked
+# token until their own LRU entry expires after TTL seconds.
+TOKEN_AUTH_CACHE = {
+    "MAX_SIZE": int(os.environ.get("TOKEN_AUTH_CACHE_MAX_SIZE", 10000)),
+    "TTL": int(os.environ.get("TOKEN_AUTH_CACHE_TTL", 60)),
+    "CACHE_ALIAS": os.environ.get("TOKEN_AUTH_CACHE_ALIAS") or None,
+}
+
+# How long responses to requests with an Idempotency-Key are replayed.
+IDEMPOTENCY_KEY_TTL = int(os.environ.get("IDEMPOTENCY_KEY_TTL", 24 * 60 * 60))
+
+# Opt-in per-request timings (wall, DB, serializer) for a sample of requests,
+# see eventmanagement/profiling.py.
+REQUEST_PROFILING = {
+    "ENABLED": os.environ.get("REQUEST_PROFILING_ENABLED", "0") == "1",
+    "SAMPLE_RATE": float(os.environ.get("REQUEST_PROFILING_SAMPLE_RATE", 0.01)),
+    "SERVER_TIMING": os.environ.get("REQUEST_PROFILING_SERVER_TIMING", "1") == "1",
+    "LOG": os.environ.get("REQUEST_PROFILING_LOG", "0") == "1",
+}
+
+# How long a seat hold lasts before the sweeper returns the seat.
+RESERVATION_HOLD_SECONDS = int(os.environ.get("RESERVATION_HOLD_SECONDS", 600))
+
+# Side effects of reservation changes, written to the outbox in the booking
+# transaction and delivered by `python manage.py drain_outbox`, see
+# reservations/outbox.py. Each topic maps to handler paths. Setting
+# OUTBOX_WEBHOOK_URL also POSTs every message there.
+OUTBOX_WEBHOOK_URL = os.environ.get("OUTBOX_WEBHOOK_URL")
+OUTBOX_HANDLERS = ["reservations.outbox.log_message"]
+if OUTBOX_WEBHOOK_URL:
+    OUTBOX_HANDLERS.append("reservations.outbox.post_webhook")
+OUTBOX = {
+    "HANDLERS": {
+        "reservation.created": OUTBOX_HANDLERS,
+        "reservation.cancelled": OUTBOX_HANDLERS,
+    },
+    "BATCH_SIZE": int(os.environ.get("OUTBOX_BATCH_SIZE", 100)),
+    "MAX_ATTEMPTS": int(os.environ.get("OUTBOX_MAX_ATTEMPTS", 10)),
+    # Seconds before the first retry, doubling up to MAX_BACKOFF.
+    "BACKOFF": float(os.environ.get("OUTBOX_BACKOFF", 5)),
+    "MAX_BACKOFF": float(os.environ.get("OUTBOX_MAX_BACKOFF", 3600)),
+    # Seconds a worker owns a claimed batch before others may redeliver it.
+    "LEASE": float(os.environ.get("OUTBOX_LEASE", 300)),
+    "WEBHOOK_URL": OUTBOX_WEBHOOK_URL,
+    "TIMEOUT": float(os.environ.get("OUTBOX_WEBHOOK_TIMEOUT", 10)),
+}
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
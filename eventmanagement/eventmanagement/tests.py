@@ -0,0 +1,368 @@
+import os
+from pathlib import Path
+from unittest import mock
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from events import cache as event_cache
+from events.models import Event
+from eventmanagement import profiling, ratelimit
+from eventmanagement.database import database_config, replica_configs
+from eventmanagement.routers import ReplicaRouter, ReplicaRoutingMiddleware
+
+User = get_user_model()
+
+PROFILE_ALL = {"ENABLED": True, "SAMPLE_RATE": 1.0, "SERVER_TIMING": True, "LOG": True}
+
+
+@override_settings(REQUEST_PROFILING=PROFILE_ALL)
+class ProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        profiling.stats.reset()
+        self.user = User.objects.create_user(username="user", password="pass")
+        self.event = Event.objects.create(
+            organizer=self.user,
+            title="Profiled Event",
+            start_time="2030-01-01T10:00:00Z",
+            end_time="2030-01-01T12:00:00Z",
+            show_time="2030-01-01T09:00:00Z",
+            capacity=5,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_server_timing_and_aggregates(self):
+        with self.assertLogs("eventmanagement.profiling", "INFO") as logs:
+            response = self.client.post(
+                reverse("reservation-list"), {"event_id": self.event.id}
+            )
+        self.assertEqual(response.status_code, 201)
+        timing = response["Server-Timing"]
+        self.assertRegex(timing, r"total;dur=[\d.]+")
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="[1-9]\d* queries"')
+        self.assertRegex(timing, r"serializer;dur=[\d.]+")
+        self.assertIn("reservation-list 201", logs.output[0])
+
+        stats = profiling.stats.as_dict()["reservation-list"]
+        self.assertEqual(stats["count"], 1)
+        self.assertGreater(stats["avg_queries"], 0)
+        self.assertGreater(stats["avg_serializer_ms"], 0)
+        self.assertEqual(sum(stats["wall_ms_histogram"].values()), 1)
+
+    def test_disabled_and_unsampled_requests_are_untouched(self):
+        url = reverse("event-detail", args=[self.event.id])
+        for config in [
+            {**PROFILE_ALL, "ENABLED": False},
+            {**PROFILE_ALL, "SAMPLE_RATE": 0.0},
+        ]:
+            with self.settings(REQUEST_PROFILING=config):
+                response = self.client.get(url)
+            self.assertNotIn("Server-Timing", response)
+        self.assertEqual(profiling.stats.as_dict(), {})
+
+    async def test_async_view(self):
+        response = await self.async_client.get(
+            reverse("async-event-detail", args=[self.event.id])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Server-Timing", response)
+
+    def test_stats_endpoint_is_staff_only(self):
+        url = reverse("ops-profile")
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["enabled"])
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        # Only the DELETE itself, recorded after the reset.
+        self.assertEqual(list(profiling.stats.as_dict()), ["ops-profile"])
+
+
+class DatabaseConfigTests(SimpleTestCase):
+    def config(self, **env):
+        with mock.patch.dict(os.environ, env, clear=True):
+            return database_config(Path("/app"))
+
+    def test_sqlite_default(self):
+        config = self.config()
+        self.assertEqual(config["ENGINE"], "django.db.backends.sqlite3")
+        self.assertEqual(config["OPTIONS"]["transaction_mode"], "IMMEDIATE")
+        self.assertIn("journal_mode=WAL", config["OPTIONS"]["init_command"])
+        self.assertEqual(config["TEST"]["NAME"], Path("/app/test_db.sqlite3"))
+
+    def test_postgresql_persistent_connections_and_pool(self):
+        config = self.config(DB_ENGINE="postgresql", POSTGRES_HOST="db")
+        self.assertEqual(config["HOST"], "db")
+        self.assertEqual(config["CONN_MAX_AGE"], 60)
+        self.assertNotIn("pool", config["OPTIONS"])
+
+        with mock.patch("eventmanagement.database.find_spec", return_value=True):
+            config = self.config(
+                DB_ENGINE="postgresql", DB_POOL="1", DB_POOL_MAX_SIZE="20"
+            )
+        self.assertEqual(config["CONN_MAX_AGE"], 0)
+        self.assertEqual(config["OPTIONS"]["pool"]["max_size"], 20)
+
+    def test_pool_requires_psycopg3(self):
+        with mock.patch("eventmanagement.database.find_spec", return_value=None):
+            with self.assertRaises(ImproperlyConfigured):
+                self.config(DB_ENGINE="postgresql", DB_POOL="1")
+
+    def test_replicas(self):
+        with mock.patch.dict(
+            os.environ, {"DB_REPLICAS": "/tmp/r1.sqlite3, /tmp/r2.sqlite3"}, clear=True
+        ):
+            replicas = replica_configs(Path("/app"))
+        self.assertEqual(list(replicas), ["replica0", "replica1"])
+        self.assertEqual(replicas["replica1"]["NAME"], "/tmp/r2.sqlite3")
+        self.assertEqual(replicas["replica0"]["TEST"], {"MIRROR": "default"})
+
+        with mock.patch.dict(
+            os.environ,
+            {"DB_ENGINE": "postgresql", "DB_REPLICAS": "replica-host:6432"},
+            clear=True,
+        ):
+            replica = replica_configs(Path("/app"))["replica0"]
+        self.assertEqual((replica["HOST"], replica["PORT"]), ("replica-host", "6432"))
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            self.config(DB_ENGINE="mysql")
+
+
+@override_settings(
+    REPLICA_ROUTING={
+        "ALIASES": ["replica0"],
+        "STICKY_SECONDS": 5,
+        "CACHE_ALIAS": "default",
+    }
+)
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.factory = RequestFactory()
+        self.router = ReplicaRouter()
+
+    def request(self, method, token=None, status=200):
+        """Run a request through the middleware; return the alias reads used."""
+        used = []
+
+        def view(request):
+            used.append(self.router.db_for_read(Event) or "default")
+            return HttpResponse(status=status)
+
+        headers = {"Authorization": f"Token {token}"} if token else {}
+        request = getattr(self.factory, method)("/api/event/events/", headers=headers)
+        ReplicaRoutingMiddleware(view)(request)
+        return used[0]
+
+    def test_safe_reads_use_replica_and_writes_primary(self):
+        self.assertEqual(self.request("get"), "replica0")
+        self.assertEqual(self.request("post", token="abc"), "default")
+        self.assertEqual(self.router.db_for_write(Event), "default")
+        self.assertIsNone(self.router.db_for_read(Event))
+
+    def test_reads_stick_to_primary_after_a_write(self):
+        self.assertEqual(self.request("get", token="abc"), "replica0")
+        self.request("delete", token="abc", status=204)
+        self.assertEqual(self.request("get", token="abc"), "default")
+        self.assertEqual(self.request("get", token="other"), "replica0")
+
+    def test_failed_write_does_not_pin(self):
+        self.request("post", token="abc", status=400)
+        self.assertEqual(self.request("get", token="abc"), "replica0")
+
+    def test_cache_entries_are_built_from_primary(self):
+        used = []
+
+        def build():
+            used.append(self.router.db_for_read(Event) or "default")
+            return {}
+
+        def view(request):
+            event_cache.read_through("test:entry", build)
+            event_cache.read_state("test:entry", build)
+            used.append(self.router.db_for_read(Event))
+            return HttpResponse()
+
+        event_cache.get_cache().clear()
+        ReplicaRoutingMiddleware(view)(self.factory.get("/api/event/events/"))
+        self.assertEqual(used, ["default", "default", "replica0"])
+
+    @override_settings(
+        REPLICA_ROUTING={"ALIASES": [], "STICKY_SECONDS": 5, "CACHE_ALIAS": "default"}
+    )
+    def test_no_replicas(self):
+        self.assertEqual(self.request("get"), "default")
+
+
+RATE_LIMITS = {
+    "ENABLED": True,
+    "STORE": "eventmanagement.ratelimit.LocalStore",
+    "CACHE_ALIAS": "default",
+    "POLICIES": {
+        "reservation-create": {"user": "2/min", "event": "3/min"},
+        "signup": {"ip": "1/hour"},
+    },
+}
+
+
+@override_settings(RATE_LIMITS=RATE_LIMITS)
+class RateLimitTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        ratelimit._stores.clear()
+        ratelimit.stats.reset()
+        self.organizer = User.objects.create_user(username="organizer", password="pass")
+        self.events = [
+            Event.objects.create(
+                organizer=self.organizer,
+                title=f"Event {i}",
+                start_time="2030-01-01T10:00:00Z",
+                end_time="2030-01-01T12:00:00Z",
+                show_time="2030-01-01T09:00:00Z",
+                capacity=10,
+            )
+            for i in range(3)
+        ]
+
+    def client_for(self, username):
+        user = User.objects.create_user(username=username, password="pass")
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user)}"
+        )
+        return client
+
+    def reserve(self, client, event):
+        return client.post(reverse("reservation-list"), {"event_id": event.id})
+
+    def test_user_limit_rejects_before_any_query(self):
+        client = self.client_for("bot")
+        self.assertEqual(self.reserve(client, self.events[0]).status_code, 201)
+        self.assertEqual(self.reserve(client, self.events[1]).status_code, 201)
+        with self.assertNumQueries(0):
+            response = self.reserve(client, self.events[2])
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+        # Other endpoints of the viewset are not limited.
+        self.assertEqual(client.get(reverse("reservation-list")).status_code, 200)
+
+    def test_user_bucket_ignores_token_keyword_case(self):
+        client = self.client_for("bot")
+        key = Token.objects.get(user__username="bot").key
+        statuses = []
+        for keyword, event in zip(["Token", "token", "TOKEN"], self.events):
+            client.credentials(HTTP_AUTHORIZATION=f"{keyword}  {key}")
+            statuses.append(self.reserve(client, event).status_code)
+        self.assertEqual(statuses, [201, 201, 429])
+
+    def test_rejection_by_one_scope_does_not_drain_the_others(self):
+        client = self.client_for("bot")
+        self.assertEqual(self.reserve(client, self.events[1]).status_code, 201)
+        for i in range(3):
+            self.reserve(self.client_for(f"user{i}"), self.events[0])
+        self.assertEqual(self.reserve(client, self.events[0]).status_code, 429)
+        # The event bucket rejected it, so the user's last token is still there.
+        self.assertEqual(self.reserve(client, self.events[2]).status_code, 201)
+        self.assertEqual(
+            ratelimit.stats.as_dict()["reservation-create:user"],
+            {"allowed": 5, "rejected": 0},
+        )
+
+    def test_async_endpoint_is_limited(self):
+        client = self.client_for("bot")
+        statuses = [
+            client.post(
+                reverse("async-reservation-create"),
+                {"event_id": event.id},
+                format="json",
+            )
+            for event in self.events
+        ]
+        self.assertEqual([r.status_code for r in statuses], [201, 201, 429])
+        self.assertIn("Retry-After", statuses[2])
+
+    def test_event_limit_applies_across_users(self):
+        statuses = [
+            self.reserve(self.client_for(f"user{i}"), self.events[0]).status_code
+            for i in range(4)
+        ]
+        self.assertEqual(statuses, [201, 201, 201, 429])
+        self.assertEqual(
+            self.reserve(self.client_for("late"), self.events[1]).status_code, 201
+        )
+        self.assertEqual(
+            ratelimit.stats.as_dict()["reservation-create:event"],
+            {"allowed": 4, "rejected": 1},
+        )
+
+    def test_signup_limited_by_ip(self):
+        url = reverse("signup")
+        response = self.client.post(url, {"username": "a", "password": "pass"})
+        self.assertEqual(response.status_code, 201)
+        response = self.client.post(url, {"username": "b", "password": "pass"})
+        self.assertEqual(response.status_code, 429)
+
+    @override_settings(RATE_LIMITS={**RATE_LIMITS, "ENABLED": False})
+    def test_disabled(self):
+        client = self.client_for("user")
+        for event in self.events:
+            self.assertEqual(self.reserve(client, event).status_code, 201)
+
+    def test_stats_endpoint_is_staff_only(self):
+        url = reverse("ops-rate-limits")
+        client = APIClient()
+        client.force_authenticate(user=self.organizer)
+        self.assertEqual(client.get(url).status_code, 403)
+
+        self.organizer.is_staff = True
+        self.organizer.save()
+        self.assertEqual(client.get(url).data, {"enabled": True, "limits": {}})
+        self.assertEqual(client.delete(url).status_code, 204)
+
+
+@override_settings(RATE_LIMITS=RATE_LIMITS)
+class TokenBucketTests(SimpleTestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+
+    def test_stores_refill_at_the_rate_up_to_the_bucket_size(self):
+        for store in [ratelimit.LocalStore(), ratelimit.CacheStore()]:
+            waits = [store.consume("bucket", 2, 10, now) for now in [0, 0, 1, 5, 5]]
+            self.assertEqual(waits[:2], [0, 0])
+            self.assertAlmostEqual(waits[2], 4.0)
+            self.assertEqual(waits[3], 0)
+            self.assertGreater(waits[4], 0)
+            # A long idle period refills the bucket, but only to its size.
+            waits = [store.consume("bucket", 2, 10, 100) for _ in range(3)]
+            self.assertEqual(waits[:2], [0, 0])
+            self.assertGreater(waits[2], 0)
+
+    def test_peek_and_refund(self):
+        for store in [ratelimit.LocalStore(), ratelimit.CacheStore()]:
+            self.assertEqual(store.peek("bucket", 1, 10, 0), 0)
+            self.assertEqual(store.consume("bucket", 1, 10, 0), 0)
+            self.assertAlmostEqual(store.peek("bucket", 1, 10, 1), 9.0)
+            # Peeking takes nothing, refunding gives the token back.
+            self.assertAlmostEqual(store.peek("bucket", 1, 10, 1), 9.0)
+            store.refund("bucket", 1, 10, 1)
+            self.assertEqual(store.consume("bucket", 1, 10, 1), 0)
+
+    def test_parse_rate(self):
+        self.assertEqual(ratelimit.parse_rate("10/min"), (10, 60))
+        self.assertEqual(ratelimit.parse_rate("5/hour"), (5, 3600))
+        self.assertEqual(ratelimit.parse_rate("50/s"), (50, 1))
@@ -17,6 +17,8 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from drf_spectacular.views import SpectacularSwaggerView, SpectacularAPIView
+from .profiling import ProfileStatsView
+from .ratelimit import RateLimitStatsView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -29,4 +31,6 @@ urlpatterns = [
     path("api/reservation/", include("reservations.urls")),
     path("api/event/", include("events.urls")),
     path("api/authentication/", include("authentication.urls")),
+    path("api/ops/profile/", ProfileStatsView.as_view(), name="ops-profile"),
+    path("api/ops/rate-limits/", RateLimitStatsView.as_view(), name="ops-rate-limits"),
 ]
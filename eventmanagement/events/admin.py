@@ -1,7 +1,80 @@
 from django.contrib import admin
-from .models import Event
+from django.db.models import IntegerField, OuterRef, Subquery, Sum
+from django.urls import reverse
+from django.utils.html import format_html
+
+from eventmanagement.paginators import EstimatedCountPaginator
+from reservations.bulk import cancel_in_bulk
+from reservations.models import Reservation
+from .models import Event, EventSeatShard
+from .search import MAX_QUERY_TERMS, matching_event_ids, tokenize
 
 
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
-    list_display = ("title", "seats_remaining", "organizer")
+    list_display = (
+        "title",
+        "start_time",
+        "event_type",
+        "seats_left",
+        "capacity",
+        "organizer",
+        "reservations",
+    )
+    list_select_related = ("organizer",)
+    list_filter = ("event_type", ("start_time", admin.DateFieldListFilter))
+    # Sorting by other columns would sort the whole table.
+    sortable_by = ("start_time",)
+    search_fields = ("title",)
+    search_help_text = "Events with all of these words in the title or description."
+    raw_id_fields = ("organizer", "series")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ["cancel_all_reservations"]
+
+    def get_queryset(self, request):
+        shard_seats = (
+            EventSeatShard.objects.filter(event_id=OuterRef("pk"))
+            .values("event_id")
+            .annotate(total=Sum("seats_remaining"))
+            .values("total")
+        )
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(shard_seats=Subquery(shard_seats, output_field=IntegerField()))
+        )
+
+    def get_search_results(self, request, queryset, search_term):
+        # The word index instead of a LIKE scan over every title.
+        terms = sorted(tokenize(search_term))[:MAX_QUERY_TERMS]
+        if not terms:
+            return queryset, False
+        return queryset.filter(pk__in=matching_event_ids(terms)), False
+
+    @admin.display(description="seats left")
+    def seats_left(self, event):
+        if event.inventory_shards:
+            return event.shard_seats or 0
+        return event.seats_remaining
+
+    @admin.display(description="reservations")
+    def reservations(self, event):
+        url = reverse("admin:reservations_reservation_changelist")
+        return format_html('<a href="{}?event={}">View</a>', url, event.pk)
+
+    def has_cancel_permission(self, request):
+        return request.user.has_perm("reservations.delete_reservation")
+
+    @admin.action(
+        description="Cancel all reservations and waitlist entries of selected events",
+        permissions=["cancel"],
+    )
+    def cancel_all_reservations(self, request, queryset):
+        # Seats go back on sale; the waitlists are dropped rather than
+        # promoted into cancelled events or overtaken by walk-up buyers.
+        cancelled = cancel_in_bulk(
+            Reservation.objects.filter(event__in=queryset.values("pk")),
+            drop_waitlist=True,
+        )
+        self.message_user(request, f"Cancelled {cancelled} reservation(s).")
@@ -0,0 +1,46 @@
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from . import availability
+from . import cache as event_cache
+from .models import Event
+from .serializers import EventRowSerializer
+
+
+@require_GET
+async def event_detail(request, pk):
+    """Async event detail for ASGI deployments, sharing the event read cache."""
+    enabled = event_cache.is_enabled()
+    key = event_cache.detail_key(pk)
+    if enabled:
+        data = await event_cache.get_cache().aget(key)
+        event_cache.stats.record(hit=data is not None)
+        if data is not None:
+            return JsonResponse(data)
+
+    try:
+        event = await Event.objects.prefetch_related("seat_shards").aget(pk=pk)
+    except Event.DoesNotExist:
+        return JsonResponse({"detail": "No Event matches the given query."}, status=404)
+
+    rows = EventRowSerializer()
+    data = rows.one(rows.instance_row(event))
+    if enabled:
+        await event_cache.get_cache().aset(key, data)
+    return JsonResponse(data)
+
+
+@require_GET
+async def event_availability(request, pk):
+    """
+    Server-sent events stream of the event's remaining seats. Needs an ASGI
+    server; under WSGI the stream would hold a worker thread forever.
+    """
+    if not await Event.objects.filter(pk=pk).aexists():
+        return JsonResponse({"detail": "No Event matches the given query."}, status=404)
+    return StreamingHttpResponse(
+        availability.stream(pk),
+        content_type="text/event-stream",
+        # Stop proxies such as nginx from buffering the stream.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,213 @@
+"""
+Live seat counts pushed to clients watching an event.
+
+Inventory writes ``publish`` the event id once they commit. Backends only
+record that an event changed. Each process runs one ``AvailabilityHub`` task
+which, once per ``EVENT_AVAILABILITY["TICK"]`` seconds, asks the backend
+which watched events changed, reads their seat counts in one query and hands
+the new counts to every watcher. A tick costs one query however many
+reservations and watchers it covers.
+
+- ``LocalBackend`` keeps changed ids in process memory. It only sees writes
+  made by the process serving the stream.
+- ``CacheBackend`` bumps a version counter per event in a shared cache, so
+  writes made by any worker reach watchers in every worker.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils.module_loading import import_string
+
+from .models import Event
+
+logger = logging.getLogger(__name__)
+
+
+class LocalBackend:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._changed = set()
+
+    def publish(self, event_id):
+        # Nobody in this process can receive it, don't let the set grow.
+        if event_id not in hub.watchers:
+            return
+        with self._lock:
+            self._changed.add(event_id)
+
+    async def apublish(self, event_id):
+        self.publish(event_id)
+
+    async def changed(self, event_ids):
+        with self._lock:
+            changed, self._changed = self._changed, set()
+        return changed & set(event_ids)
+
+
+def version_key(event_id):
+    return f"events:availability:{event_id}"
+
+
+class CacheBackend:
+    def __init__(self):
+        self._seen = {}
+
+    def get_cache(self):
+        return caches[settings.EVENT_AVAILABILITY["CACHE_ALIAS"]]
+
+    def publish(self, event_id):
+        cache = self.get_cache()
+        try:
+            cache.incr(version_key(event_id))
+        except ValueError:
+            # Seed from the clock so an evicted counter never reuses an old version.
+            cache.add(version_key(event_id), time.time_ns(), timeout=None)
+
+    async def apublish(self, event_id):
+        cache = self.get_cache()
+        try:
+            await cache.aincr(version_key(event_id))
+        except ValueError:
+            await cache.aadd(version_key(event_id), time.time_ns(), timeout=None)
+
+    async def changed(self, event_ids):
+        keys = {version_key(event_id): event_id for event_id in event_ids}
+        versions = await self.get_cache().aget_many(keys)
+        seen, self._seen = self._seen, {}
+        changed = set()
+        for key, event_id in keys.items():
+            version = versions.get(key)
+            # An event seen for the first time may have changed since the
+            # watcher read its count; the hub drops unchanged counts anyway.
+            if event_id not in seen or seen[event_id] != version:
+                changed.add(event_id)
+            self._seen[event_id] = version
+        return changed
+
+
+_backends = {}
+
+
+def get_backend():
+    path = settings.EVENT_AVAILABILITY["BACKEND"]
+    if path not in _backends:
+        _backends[path] = import_string(path)()
+    return _backends[path]
+
+
+def publish(event_id):
+    """Announce a seat count change once the current transaction commits."""
+    transaction.on_commit(lambda: get_backend().publish(event_id))
+
+
+async def apublish(event_id):
+    """Async counterpart of ``publish``; async ORM writes are already committed."""
+    await get_backend().apublish(event_id)
+
+
+async def seat_counts(event_ids):
+    """Seats left per event id, sharded or not, in one query."""
+    # Sharded events keep seats_remaining at zero, so the sum covers both.
+    rows = (
+        Event.objects.filter(pk__in=event_ids)
+        .annotate(
+            seats=F("seats_remaining")
+            + Coalesce(Sum("seat_shards__seats_remaining"), Value(0))
+        )
+        .values_list("pk", "seats")
+    )
+    return {pk: seats async for pk, seats in rows}
+
+
+def offer(queue, seats):
+    """Replace any count the watcher has not read yet with the newest one."""
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(seats)
+
+
+class AvailabilityHub:
+    """Per-process fan-out of seat counts to the watchers of each event."""
+
+    def __init__(self):
+        self.watchers = {}
+        self.latest = {}
+        self._task = None
+
+    def watch(self, event_id):
+        queue = asyncio.Queue(maxsize=1)
+        self.watchers.setdefault(event_id, set()).add(queue)
+        return queue
+
+    def unwatch(self, event_id, queue):
+        queues = self.watchers.get(event_id, set())
+        queues.discard(queue)
+        if not queues:
+            self.watchers.pop(event_id, None)
+            self.latest.pop(event_id, None)
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self.run())
+
+    async def run(self):
+        while self.watchers:
+            await asyncio.sleep(settings.EVENT_AVAILABILITY["TICK"])
+            try:
+                await self.tick()
+            except Exception:
+                logger.exception("Availability tick failed")
+
+    async def tick(self):
+        changed = await get_backend().changed(list(self.watchers))
+        if not changed:
+            return
+        for event_id, seats in (await seat_counts(changed)).items():
+            if self.latest.get(event_id) == seats:
+                continue
+            self.latest[event_id] = seats
+            for queue in self.watchers.get(event_id, ()):
+                offer(queue, seats)
+
+    async def current(self, event_id):
+        if event_id not in self.latest:
+            counts = await seat_counts([event_id])
+            self.latest[event_id] = counts.get(event_id, 0)
+        return self.latest[event_id]
+
+
+hub = AvailabilityHub()
+
+
+def message(event_id, seats):
+    data = json.dumps({"event": event_id, "seats_remaining": seats})
+    return f"event: seats\ndata: {data}\n\n"
+
+
+async def stream(event_id):
+    """Server-sent events: the current count, then every change, plus keepalives."""
+    queue = hub.watch(event_id)
+    try:
+        hub.start()
+        yield message(event_id, await hub.current(event_id))
+        while True:
+            try:
+                seats = await asyncio.wait_for(
+                    queue.get(), settings.EVENT_AVAILABILITY["HEARTBEAT"]
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield message(event_id, seats)
+    finally:
+        hub.unwatch(event_id, queue)
@@ -0,0 +1,150 @@
+"""
+Read-through cache for event list and detail responses.
+
+Detail entries are keyed by event id and deleted when that event changes.
+List entries embed a generation number that is bumped on any event change,
+so one write invalidates every cached page without tracking page keys.
+The backend, TTL and eviction come from ``CACHES[EVENT_CACHE["ALIAS"]]``.
+Entries are built from the primary database, never from a replica.
+"""
+
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from eventmanagement.routers import use_primary
+
+LIST_GENERATION_KEY = "events:list:generation"
+
+
+class CacheStats:
+    """Per-process hit/miss counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def as_dict(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else None,
+        }
+
+
+stats = CacheStats()
+
+
+def is_enabled():
+    return settings.EVENT_CACHE["ENABLED"]
+
+
+def get_cache():
+    return caches[settings.EVENT_CACHE["ALIAS"]]
+
+
+def detail_key(event_id):
+    return f"events:detail:{event_id}"
+
+
+def list_key(request):
+    cache = get_cache()
+    generation = cache.get(LIST_GENERATION_KEY)
+    if generation is None:
+        # Seed from the clock so an evicted counter never reuses an old generation.
+        cache.add(LIST_GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(LIST_GENERATION_KEY)
+    # Pagination links are absolute, so the host is part of the key.
+    url = hashlib.sha1(request.build_absolute_uri().encode()).hexdigest()
+    return f"events:list:{generation}:{url}"
+
+
+def read_through(key, build):
+    """Return the cached value for ``key``, calling ``build()`` on a miss."""
+    cache = get_cache()
+    data = cache.get(key)
+    if data is not None:
+        stats.record(hit=True)
+        return data
+    stats.record(hit=False)
+    # A lagging replica's copy would stay cached until the next write.
+    with use_primary():
+        data = build()
+    cache.set(key, data)
+    return data
+
+
+def state_key(key):
+    """Where the conditional GET state of the response at ``key`` is kept."""
+    return f"{key}:state"
+
+
+def read_state(key, build):
+    """
+    Like ``read_through`` for the state behind a response's validators.
+    Not counted in the stats, which describe response bodies.
+    """
+    cache = get_cache()
+    state = cache.get(state_key(key))
+    if state is None:
+        with use_primary():
+            state = build()
+        cache.set(state_key(key), state)
+    return state
+
+
+def invalidate_event(event_id):
+    """Drop cached data for the event and every cached list page."""
+    invalidate_events([event_id])
+
+
+def invalidate_events(event_ids):
+    """Drop cached data for several events at once, and every cached list page."""
+    if not is_enabled():
+        return
+
+    def invalidate():
+        cache = get_cache()
+        keys = [detail_key(event_id) for event_id in event_ids]
+        cache.delete_many(keys + [state_key(key) for key in keys])
+        try:
+            cache.incr(LIST_GENERATION_KEY)
+        except ValueError:
+            pass  # No generation yet, the next list read starts a fresh one.
+
+    # Invalidate now and again after commit, so a read that repopulates the
+    # cache from pre-commit data in between is not served afterwards.
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+async def ainvalidate_event(event_id):
+    """
+    Async counterpart of ``invalidate_event``. Async ORM writes run in
+    autocommit mode, so they are already committed when this is called.
+    """
+    if not is_enabled():
+        return
+    cache = get_cache()
+    key = detail_key(event_id)
+    await cache.adelete_many([key, state_key(key)])
+    try:
+        await cache.aincr(LIST_GENERATION_KEY)
+    except ValueError:
+        pass
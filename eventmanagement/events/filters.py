@@ -0,0 +1,77 @@
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.filters import BaseFilterBackend
+
+from .models import EventSeatShard, EventType
+
+
+def has_seats_q():
+    """Events with seats left, in the event row or in any seat shard."""
+    return Q(seats_remaining__gt=0) | Q(
+        Exists(
+            EventSeatShard.objects.filter(event=OuterRef("pk"), seats_remaining__gt=0)
+        ),
+        inventory_shards__gt=0,
+    )
+
+
+class EventFilterParams(serializers.Serializer):
+    upcoming = serializers.BooleanField(required=False)
+    start_after = serializers.DateTimeField(required=False)
+    start_before = serializers.DateTimeField(required=False)
+    event_type = serializers.ChoiceField(choices=EventType.choices, required=False)
+    has_seats = serializers.BooleanField(required=False)
+
+
+class EventFilterBackend(BaseFilterBackend):
+    """
+    Time-window and availability filters for event listings.
+    The time-window and type filters are backed by the composite indexes on
+    Event; ``has_seats`` is checked on the rows they select, since seats can
+    also be counted in the seat shards.
+
+    Only listings are filtered. Detail responses are cached by event id
+    alone, so a filter there would cache a 404 for every other caller.
+    """
+
+    actions = ("list", "feed", "search")
+
+    def filter_queryset(self, request, queryset, view):
+        if getattr(view, "action", None) not in self.actions:
+            return queryset
+        params = EventFilterParams(data=request.query_params.dict())
+        params.is_valid(raise_exception=True)
+        filters = params.validated_data
+
+        if filters.get("upcoming"):
+            queryset = queryset.filter(start_time__gte=timezone.now())
+        if "start_after" in filters:
+            queryset = queryset.filter(start_time__gte=filters["start_after"])
+        if "start_before" in filters:
+            queryset = queryset.filter(start_time__lt=filters["start_before"])
+        if "event_type" in filters:
+            queryset = queryset.filter(event_type=filters["event_type"])
+        if "has_seats" in filters:
+            has_seats = has_seats_q()
+            queryset = queryset.filter(
+                has_seats if filters["has_seats"] else ~has_seats
+            )
+        return queryset
+
+    def get_schema_operation_parameters(self, view):
+        if getattr(view, "action", None) not in self.actions:
+            return []
+        boolean = {"type": "boolean"}
+        date_time = {"type": "string", "format": "date-time"}
+        choices = {"type": "string", "enum": EventType.values}
+        return [
+            {"name": name, "required": False, "in": "query", "schema": schema}
+            for name, schema in [
+                ("upcoming", boolean),
+                ("start_after", date_time),
+                ("start_before", date_time),
+                ("event_type", choices),
+                ("has_seats", boolean),
+            ]
+        ]
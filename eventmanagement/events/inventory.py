@@ -0,0 +1,203 @@
+"""
+Seat inventory operations for events.
+
+Unsharded events keep their counter in ``Event.seats_remaining``. Sharded
+events (``inventory_shards > 0``) split the counter across ``EventSeatShard``
+rows and keep ``Event.seats_remaining`` at zero, so every read of the total
+should go through ``available_seats``.
+"""
+
+import random
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Now
+
+from . import availability
+from .cache import ainvalidate_event, invalidate_event
+from .models import Event, EventSeatShard
+
+MAX_INVENTORY_SHARDS = 64
+
+
+def seats_changed(event_id):
+    """Drop cached copies of the event and notify availability watchers."""
+    invalidate_event(event_id)
+    availability.publish(event_id)
+
+
+async def aseats_changed(event_id):
+    await ainvalidate_event(event_id)
+    await availability.apublish(event_id)
+
+
+def available_seats(event):
+    """
+    Exact number of seats left for the event.
+    For sharded events this reuses prefetched ``seat_shards`` when available.
+    """
+    if not event.inventory_shards:
+        return event.seats_remaining
+    return sum(shard.seats_remaining for shard in event.seat_shards.all())
+
+
+def claim_seat(event):
+    """
+    Atomically take one seat. Returns False when the event is sold out.
+    Each attempt is a conditional UPDATE, so the counter never goes negative.
+    """
+    if not event.inventory_shards:
+        claimed = Event.objects.filter(pk=event.pk, seats_remaining__gt=0).update(
+            seats_remaining=F("seats_remaining") - 1, updated_at=Now()
+        )
+        if claimed:
+            seats_changed(event.pk)
+        return bool(claimed)
+
+    indexes = list(
+        EventSeatShard.objects.filter(
+            event_id=event.pk, seats_remaining__gt=0
+        ).values_list("index", flat=True)
+    )
+    # Random order spreads concurrent buyers over different shard rows.
+    random.shuffle(indexes)
+    for index in indexes:
+        claimed = EventSeatShard.objects.filter(
+            event_id=event.pk, index=index, seats_remaining__gt=0
+        ).update(seats_remaining=F("seats_remaining") - 1, updated_at=Now())
+        if claimed:
+            seats_changed(event.pk)
+            return True
+    return False
+
+
+async def aclaim_seat(event):
+    """Async counterpart of ``claim_seat`` for the ASGI booking path."""
+    if not event.inventory_shards:
+        claimed = await Event.objects.filter(
+            pk=event.pk, seats_remaining__gt=0
+        ).aupdate(seats_remaining=F("seats_remaining") - 1, updated_at=Now())
+        if claimed:
+            await aseats_changed(event.pk)
+        return bool(claimed)
+
+    indexes = [
+        index
+        async for index in EventSeatShard.objects.filter(
+            event_id=event.pk, seats_remaining__gt=0
+        ).values_list("index", flat=True)
+    ]
+    random.shuffle(indexes)
+    for index in indexes:
+        claimed = await EventSeatShard.objects.filter(
+            event_id=event.pk, index=index, seats_remaining__gt=0
+        ).aupdate(seats_remaining=F("seats_remaining") - 1, updated_at=Now())
+        if claimed:
+            await aseats_changed(event.pk)
+            return True
+    return False
+
+
+def claim_seats(event, count):
+    """
+    Take up to ``count`` seats with one UPDATE per counter row and return how
+    many were claimed. Locks the counter rows, so call it inside a transaction.
+    """
+    if not event.inventory_shards:
+        remaining = (
+            Event.objects.select_for_update()
+            .filter(pk=event.pk)
+            .values_list("seats_remaining", flat=True)
+            .first()
+        )
+        granted = max(0, min(count, remaining or 0))
+        if granted:
+            Event.objects.filter(pk=event.pk).update(
+                seats_remaining=F("seats_remaining") - granted, updated_at=Now()
+            )
+            seats_changed(event.pk)
+        return granted
+
+    claimed = 0
+    shards = EventSeatShard.objects.select_for_update().filter(
+        event_id=event.pk, seats_remaining__gt=0
+    )
+    for shard in shards.order_by("index"):
+        take = min(count - claimed, shard.seats_remaining)
+        EventSeatShard.objects.filter(pk=shard.pk).update(
+            seats_remaining=F("seats_remaining") - take, updated_at=Now()
+        )
+        claimed += take
+        if claimed == count:
+            break
+    if claimed:
+        seats_changed(event.pk)
+    return claimed
+
+
+def release_seat(event):
+    """Give one seat back to the event's inventory."""
+    release_seats(event, 1)
+
+
+def release_seats(event, count):
+    """Give ``count`` seats back to the event's inventory in one UPDATE."""
+    if not event.inventory_shards:
+        Event.objects.filter(pk=event.pk).update(
+            seats_remaining=F("seats_remaining") + count, updated_at=Now()
+        )
+    else:
+        EventSeatShard.objects.filter(
+            event_id=event.pk, index=random.randrange(event.inventory_shards)
+        ).update(seats_remaining=F("seats_remaining") + count, updated_at=Now())
+    seats_changed(event.pk)
+
+
+async def arelease_seat(event):
+    """Async counterpart of ``release_seat``."""
+    if not event.inventory_shards:
+        await Event.objects.filter(pk=event.pk).aupdate(
+            seats_remaining=F("seats_remaining") + 1, updated_at=Now()
+        )
+    else:
+        await EventSeatShard.objects.filter(
+            event_id=event.pk, index=random.randrange(event.inventory_shards)
+        ).aupdate(seats_remaining=F("seats_remaining") + 1, updated_at=Now())
+    await aseats_changed(event.pk)
+
+
+def shard_inventory(event, shards):
+    """
+    Redistribute the event's remaining seats over ``shards`` counter rows.
+    Passing 0 folds the shards back into ``Event.seats_remaining``.
+    """
+    if not 0 <= shards <= MAX_INVENTORY_SHARDS:
+        raise ValueError(f"shards must be between 0 and {MAX_INVENTORY_SHARDS}.")
+
+    with transaction.atomic():
+        event = Event.objects.select_for_update().get(pk=event.pk)
+        # Seat claims of seated events update Event.seats_remaining directly.
+        if event.assigned_seating:
+            raise ValueError("Assigned-seating events cannot be sharded.")
+        current = list(
+            EventSeatShard.objects.select_for_update().filter(event_id=event.pk)
+        )
+        total = event.seats_remaining + sum(s.seats_remaining for s in current)
+        EventSeatShard.objects.filter(event_id=event.pk).delete()
+
+        if shards:
+            per_shard, extra = divmod(total, shards)
+            EventSeatShard.objects.bulk_create(
+                EventSeatShard(
+                    event=event,
+                    index=index,
+                    seats_remaining=per_shard + (1 if index < extra else 0),
+                )
+                for index in range(shards)
+            )
+            event.seats_remaining = 0
+        else:
+            event.seats_remaining = total
+        event.inventory_shards = shards
+        event.save(update_fields=["seats_remaining", "inventory_shards", "updated_at"])
+    return event
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from events.models import EventSeries
+from events.recurrence import extend, horizon
+
+
+class Command(BaseCommand):
+    help = (
+        "Create occurrences of recurring event series up to "
+        "EVENT_SERIES_HORIZON_DAYS ahead. Run it daily."
+    )
+
+    def handle(self, *args, **options):
+        until = horizon()
+        created = 0
+        pending = EventSeries.objects.filter(
+            Q(generated_until__isnull=True) | Q(generated_until__lt=until)
+        )
+        for series in pending.iterator():
+            created += len(extend(series, until))
+        self.stdout.write(f"Created {created} occurrences.")
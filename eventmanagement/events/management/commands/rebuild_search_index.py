@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from events.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the event search index from event titles and descriptions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rebuild_index(batch_size=options["batch_size"])
+        self.stdout.write("Event search index rebuilt.")
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from events.inventory import MAX_INVENTORY_SHARDS, available_seats, shard_inventory
+from events.models import Event
+
+
+class Command(BaseCommand):
+    help = (
+        "Split an event's seat inventory across N counter rows so bookings for "
+        "hot events do not all queue on one row lock. Use 0 shards to undo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("event_id", type=int)
+        parser.add_argument(
+            "shards",
+            type=int,
+            help=f"Number of counter rows (0-{MAX_INVENTORY_SHARDS}).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            event = Event.objects.get(pk=options["event_id"])
+        except Event.DoesNotExist:
+            raise CommandError(f"Event {options['event_id']} does not exist.")
+        try:
+            event = shard_inventory(event, options["shards"])
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Event {event.pk} now uses {event.inventory_shards} shard(s) "
+                f"with {available_seats(event)} seat(s) remaining."
+            )
+        )
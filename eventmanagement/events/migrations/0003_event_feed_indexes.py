@@ -0,0 +1,38 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0002_event_seat_shards"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="event",
+            name="events_even_start_t_c2d277_idx",
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(fields=["start_time", "id"], name="event_start_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["event_type", "start_time", "id"],
+                name="event_type_start_id_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                condition=models.Q(("seats_remaining__gt", 0)),
+                fields=["start_time", "id"],
+                name="event_with_seats_idx",
+            ),
+        ),
+    ]
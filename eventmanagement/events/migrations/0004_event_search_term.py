@@ -0,0 +1,40 @@
+# Generated by Django 5.2.6 on 2026-10-18 20:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0003_event_feed_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventSearchTerm",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("term", models.CharField(max_length=64)),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_terms",
+                        to="events.event",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("term", "event")},
+            },
+        ),
+    ]
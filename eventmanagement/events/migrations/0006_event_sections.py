@@ -0,0 +1,48 @@
+# Generated by Django 5.2.6 on 2026-10-18 20:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0005_event_series"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="assigned_seating",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name="EventSection",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=50)),
+                ("rows", models.PositiveSmallIntegerField()),
+                ("seats_per_row", models.PositiveSmallIntegerField()),
+                ("taken", models.BinaryField()),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sections",
+                        to="events.event",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("event", "name")},
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.6 on 2026-10-18 23:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0006_event_sections"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="eventseatshard",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-18 23:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0007_eventseatshard_updated_at"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="event",
+            name="event_with_seats_idx",
+        ),
+    ]
@@ -12,6 +12,40 @@ class EventType(models.TextChoices):
     OTHER = "OTHER", "Other"
 
 
+class Frequency(models.TextChoices):
+    DAILY = "DAILY", "Daily"
+    WEEKLY = "WEEKLY", "Weekly"
+
+
+class EventSeries(models.Model):
+    """
+    Template for a recurring event. The first occurrence runs at
+    ``start_time``/``end_time``/``show_time``; later ones repeat every
+    ``interval`` days or weeks at the same local time, until ``count``
+    occurrences or ``until`` if either is set. Occurrences are ``Event`` rows
+    with their own seat inventory, created in bulk up to ``generated_until``.
+    """
+
+    organizer = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="event_series"
+    )
+    title = models.CharField(max_length=255)
+    description = models.TextField(blank=True)
+    event_type = models.CharField(max_length=100, blank=True, choices=EventType.choices)
+    capacity = models.PositiveIntegerField()
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+    show_time = models.DateTimeField()
+    frequency = models.CharField(max_length=10, choices=Frequency.choices)
+    interval = models.PositiveSmallIntegerField(default=1)
+    count = models.PositiveIntegerField(null=True, blank=True)
+    until = models.DateTimeField(null=True, blank=True)
+    # Every occurrence starting before this time has been created.
+    generated_until = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
 class Event(models.Model):
     organizer = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name="created_events"
@@ -26,13 +60,86 @@ class Event(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     event_type = models.CharField(max_length=100, blank=True, choices=EventType.choices)
+    # When > 0, seats_remaining lives in EventSeatShard rows instead of this row.
+    inventory_shards = models.PositiveSmallIntegerField(default=0)
+    # Set once the event has sections: seats are then booked by row and number.
+    assigned_seating = models.BooleanField(default=False)
+    series = models.ForeignKey(
+        EventSeries,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="occurrences",
+    )
 
     class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["series", "start_time"], name="event_series_start_uniq"
+            ),
+        ]
         indexes = [
-            models.Index(fields=["start_time"]),
+            # Keyset pagination and the time-window filters of the events feed.
+            models.Index(fields=["start_time", "id"], name="event_start_id_idx"),
+            models.Index(
+                fields=["event_type", "start_time", "id"],
+                name="event_type_start_id_idx",
+            ),
         ]
 
     def save(self, *args, **kwargs):
         if self.pk is None and self.seats_remaining is None:
             self.seats_remaining = self.capacity
         super().save(*args, **kwargs)
+
+
+class EventSeatShard(models.Model):
+    """
+    One slice of a sharded event's seat inventory.
+    Bookings for hot events claim seats from any shard with seats left, so
+    concurrent buyers spread their row locks over several rows instead of
+    queueing on the single Event row.
+    """
+
+    event = models.ForeignKey(
+        Event, on_delete=models.CASCADE, related_name="seat_shards"
+    )
+    index = models.PositiveSmallIntegerField()
+    seats_remaining = models.IntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("event", "index")
+
+
+class EventSection(models.Model):
+    """
+    A block of ``rows`` x ``seats_per_row`` numbered seats. Availability is a
+    bitmap with one bit per seat (set = taken), so reading the free seats of
+    a section loads one row, however many seats it has.
+    """
+
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="sections")
+    name = models.CharField(max_length=50)
+    rows = models.PositiveSmallIntegerField()
+    seats_per_row = models.PositiveSmallIntegerField()
+    taken = models.BinaryField()
+
+    class Meta:
+        unique_together = ("event", "name")
+
+
+class EventSearchTerm(models.Model):
+    """
+    One word of an event's title or description: the inverted index behind
+    event search. It works the same on SQLite and PostgreSQL, and a search
+    reads the (term, event) index instead of scanning event text.
+    """
+
+    event = models.ForeignKey(
+        Event, on_delete=models.CASCADE, related_name="search_terms"
+    )
+    term = models.CharField(max_length=64)
+
+    class Meta:
+        unique_together = ("term", "event")
@@ -0,0 +1,97 @@
+"""
+Word search over event titles and descriptions.
+
+Every word of two or more characters is stored in ``EventSearchTerm``. The
+terms are updated when an event is saved and can be rebuilt in bulk. A query
+matches events containing all of its words, found through the
+(term, event) index.
+"""
+
+import re
+
+from django.db import transaction
+from django.db.models import Count
+
+from .filters import has_seats_q
+from .models import Event, EventSearchTerm
+
+WORD_RE = re.compile(r"\w+")
+MAX_TERM_LENGTH = 64
+MAX_QUERY_TERMS = 10
+
+
+def tokenize(text):
+    return {
+        word[:MAX_TERM_LENGTH]
+        for word in WORD_RE.findall(text.lower())
+        if len(word) > 1
+    }
+
+
+def index_event(event):
+    """Bring the event's terms up to date, touching only the words that changed."""
+    terms = tokenize(f"{event.title} {event.description}")
+    existing = set(
+        EventSearchTerm.objects.filter(event=event).values_list("term", flat=True)
+    )
+    if existing - terms:
+        EventSearchTerm.objects.filter(event=event, term__in=existing - terms).delete()
+    EventSearchTerm.objects.bulk_create(
+        [EventSearchTerm(event=event, term=term) for term in terms - existing],
+        ignore_conflicts=True,
+    )
+
+
+def index_new_events(events, batch_size=1000):
+    """Index events created with ``bulk_create``, which sends no post_save."""
+    terms = {}
+    batch = []
+    for event in events:
+        text = f"{event.title} {event.description}"
+        if text not in terms:
+            terms[text] = tokenize(text)
+        batch.extend(EventSearchTerm(event=event, term=term) for term in terms[text])
+    EventSearchTerm.objects.bulk_create(batch, batch_size=batch_size)
+
+
+def rebuild_index(event_ids=None, batch_size=1000):
+    """Re-index all events, or only ``event_ids``, in bulk."""
+    events = Event.objects.all()
+    if event_ids is not None:
+        events = events.filter(pk__in=event_ids)
+    rows = events.values_list("pk", "title", "description").iterator(
+        chunk_size=batch_size
+    )
+    with transaction.atomic():
+        EventSearchTerm.objects.filter(event__in=events).delete()
+        batch = []
+        for pk, title, description in rows:
+            batch.extend(
+                EventSearchTerm(event_id=pk, term=term)
+                for term in tokenize(f"{title} {description}")
+            )
+            if len(batch) >= batch_size:
+                EventSearchTerm.objects.bulk_create(batch)
+                batch = []
+        EventSearchTerm.objects.bulk_create(batch)
+
+
+def matching_event_ids(terms):
+    """Subquery of ids of events containing every term."""
+    return (
+        EventSearchTerm.objects.filter(term__in=terms)
+        .values("event_id")
+        .annotate(matched=Count("term"))
+        .filter(matched=len(terms))
+        .values("event_id")
+    )
+
+
+def facets(queryset):
+    """Match counts per event type and by seat availability."""
+    by_type = queryset.order_by().values_list("event_type").annotate(count=Count("id"))
+    availability = queryset.aggregate(
+        available=Count("id", filter=has_seats_q()),
+        sold_out=Count("id", filter=~has_seats_q()),
+    )
+    return {"event_type": dict(by_type), "availability": availability}
@@ -0,0 +1,191 @@
+"""
+Assigned seating.
+
+Each ``EventSection`` keeps one bit per seat, row by row, in ``taken``. Seat
+maps and best-available searches decode that bitmap in memory, so they read
+one row per section instead of one row per seat. Claims lock the section
+rows in id order (concurrent claims cannot deadlock), check and set the
+bits and take the same number of seats off ``Event.seats_remaining``, all in
+the caller's transaction. Seats are ``(section_id, row, seat)`` tuples with
+rows and seats numbered from 1.
+"""
+
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Now
+
+from .inventory import seats_changed
+from .models import Event, EventSection
+
+MAX_ROWS = 200
+MAX_SEATS_PER_ROW = 200
+MAX_SEATS_PER_RESERVATION = 10
+
+
+def seat_bit(section, row, seat):
+    index = (row - 1) * section.seats_per_row + seat - 1
+    return index >> 3, 1 << (index & 7)
+
+
+def layout(section):
+    """The section's seats as one string, ``"1"`` for taken and ``"0"`` for free."""
+    size = section.rows * section.seats_per_row
+    return "".join(f"{byte:08b}"[::-1] for byte in bytes(section.taken))[:size]
+
+
+def row_layouts(section):
+    seats = layout(section)
+    width = section.seats_per_row
+    return [seats[start : start + width] for start in range(0, len(seats), width)]
+
+
+def best_block(section, count):
+    """
+    ``count`` adjacent free seats in the front-most row that has them, as
+    close to the middle of the row as possible, or None.
+    """
+    block = "0" * count
+    width = section.seats_per_row
+    for row, seats in enumerate(row_layouts(section), start=1):
+        best = None
+        start = seats.find(block)
+        while start != -1:
+            # Twice the distance between the block's and the row's centres.
+            offset = abs(2 * start + count - width)
+            if best is None or offset < best[0]:
+                best = (offset, start)
+            start = seats.find(block, start + 1)
+        if best is not None:
+            return [(section.pk, row, best[1] + 1 + i) for i in range(count)]
+    return None
+
+
+def mark(section, positions, taken):
+    """
+    The section's bitmap with ``positions`` (row, seat) set to ``taken``, or
+    None if one of them does not exist or is already in that state.
+    """
+    bits = bytearray(section.taken)
+    for row, seat in positions:
+        if not (1 <= row <= section.rows and 1 <= seat <= section.seats_per_row):
+            return None
+        byte, mask = seat_bit(section, row, seat)
+        if bool(bits[byte] & mask) == taken:
+            return None
+        bits[byte] ^= mask
+    return bytes(bits)
+
+
+def update_seats(event, seats, taken):
+    by_section = defaultdict(list)
+    for section_id, row, seat in seats:
+        by_section[section_id].append((row, seat))
+    sections = EventSection.objects.select_for_update().filter(
+        event_id=event.pk, pk__in=by_section
+    )
+    bitmaps = {}
+    for section in sections.order_by("pk"):
+        bitmaps[section.pk] = mark(section, by_section[section.pk], taken)
+        if bitmaps[section.pk] is None:
+            return False
+    if len(bitmaps) != len(by_section):
+        return False
+
+    for section_id, bits in bitmaps.items():
+        EventSection.objects.filter(pk=section_id).update(taken=bits)
+    change = -len(seats) if taken else len(seats)
+    Event.objects.filter(pk=event.pk).update(
+        seats_remaining=F("seats_remaining") + change, updated_at=Now()
+    )
+    seats_changed(event.pk)
+    return True
+
+
+def claim(event, seats):
+    """
+    Take all of ``seats`` or none. Returns False if any is taken or does not
+    exist; the caller then rolls its transaction back.
+    """
+    if len(set(seats)) != len(seats):
+        return False
+    return update_seats(event, seats, taken=True)
+
+
+def claim_best_block(event, count):
+    """Take the best block of ``count`` adjacent seats. Returns the seats or None."""
+    sections = EventSection.objects.select_for_update().filter(event_id=event.pk)
+    for section in sections.order_by("pk"):
+        seats = best_block(section, count)
+        if seats is not None:
+            update_seats(event, seats, taken=True)
+            return seats
+    return None
+
+
+def release(event, seats):
+    """Free seats of a cancelled reservation."""
+    return update_seats(event, seats, taken=False)
+
+
+def add_section(event, name, rows, seats_per_row):
+    """
+    Add a section of free seats. The first section turns a general admission
+    event into an assigned-seating one, whose capacity is then the total of
+    its sections. That is only possible before any seat is sold or held.
+    """
+    with transaction.atomic():
+        event = Event.objects.select_for_update().get(pk=event.pk)
+        if event.inventory_shards:
+            raise ValueError("Sharded events cannot have assigned seating.")
+        if not event.assigned_seating:
+            if event.seats_remaining != event.capacity:
+                raise ValueError("Add sections before any seats are sold or held.")
+            event.capacity = event.seats_remaining = 0
+            event.assigned_seating = True
+
+        size = rows * seats_per_row
+        section = EventSection.objects.create(
+            event=event,
+            name=name,
+            rows=rows,
+            seats_per_row=seats_per_row,
+            taken=bytes((size + 7) // 8),
+        )
+        event.capacity += size
+        event.seats_remaining += size
+        event.save(
+            update_fields=[
+                "capacity",
+                "seats_remaining",
+                "assigned_seating",
+                "updated_at",
+            ]
+        )
+        seats_changed(event.pk)
+    return section
+
+
+def seat_map(event, block=None):
+    """Free and taken seats of every section; with ``block``, its best block."""
+    result = []
+    for section in event.sections.order_by("pk"):
+        rows = row_layouts(section)
+        entry = {
+            "id": section.pk,
+            "name": section.name,
+            "rows": section.rows,
+            "seats_per_row": section.seats_per_row,
+            "available": sum(row.count("0") for row in rows),
+            "seat_map": rows,
+        }
+        if block:
+            seats = best_block(section, block)
+            entry["best_block"] = (
+                [{"row": row, "seat": seat} for _, row, seat in seats]
+                if seats
+                else None
+            )
+        result.append(entry)
+    return result
@@ -1,9 +1,105 @@
+from django.db.models import Sum
 from rest_framework import serializers
-from .models import Event
+from eventmanagement.rows import RowSerializer
+from .inventory import available_seats
+from .models import Event, EventSeatShard, EventSection, EventSeries
+from .recurrence import SERIES_WIDE_FIELDS
+from .seating import MAX_ROWS, MAX_SEATS_PER_ROW
 
 
 class EventSerializer(serializers.ModelSerializer):
     class Meta:
         model = Event
         fields = "__all__"
-        read_only_fields = ["organizer", "seats_remaining", "created_at", "updated_at"]
+        read_only_fields = [
+            "organizer",
+            "seats_remaining",
+            "inventory_shards",
+            "assigned_seating",
+            "series",
+            "created_at",
+            "updated_at",
+        ]
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if instance.inventory_shards:
+            data["seats_remaining"] = available_seats(instance)
+        return data
+
+
+class EventRowSerializer(RowSerializer):
+    """
+    ``EventSerializer`` output from ``.values()`` rows. Seats of sharded
+    events on the page are summed in one extra query.
+    """
+
+    serializer_class = EventSerializer
+
+    def prepare(self, rows):
+        key = f"{self.prefix}shard_seats"
+        sharded = {
+            row[f"{self.prefix}id"]
+            for row in rows
+            if row[f"{self.prefix}inventory_shards"] and key not in row
+        }
+        if sharded:
+            seats = dict(
+                EventSeatShard.objects.filter(event_id__in=sharded)
+                .order_by()
+                .values("event_id")
+                .annotate(seats=Sum("seats_remaining"))
+                .values_list("event_id", "seats")
+            )
+            for row in rows:
+                if row[f"{self.prefix}id"] in sharded:
+                    row[key] = seats.get(row[f"{self.prefix}id"], 0)
+        super().prepare(rows)
+
+    def represent(self, row, plan):
+        data = super().represent(row, plan)
+        if row[f"{self.prefix}inventory_shards"]:
+            data["seats_remaining"] = row[f"{self.prefix}shard_seats"]
+        return data
+
+    def instance_row(self, instance, row=None):
+        row = super().instance_row(instance, row)
+        if instance.inventory_shards:
+            row[f"{self.prefix}shard_seats"] = available_seats(instance)
+        return row
+
+
+class EventSectionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = EventSection
+        fields = ["id", "name", "rows", "seats_per_row"]
+        extra_kwargs = {
+            "rows": {"min_value": 1, "max_value": MAX_ROWS},
+            "seats_per_row": {"min_value": 1, "max_value": MAX_SEATS_PER_ROW},
+        }
+
+
+class EventSeriesSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = EventSeries
+        fields = "__all__"
+        read_only_fields = ["organizer", "generated_until", "created_at", "updated_at"]
+        extra_kwargs = {"interval": {"min_value": 1}, "count": {"min_value": 1}}
+
+    def validate(self, attrs):
+        if attrs["end_time"] <= attrs["start_time"]:
+            raise serializers.ValidationError({"end_time": "Must be after start_time."})
+        return attrs
+
+
+class EventSeriesUpdateSerializer(serializers.ModelSerializer):
+    """Series-wide edits. The schedule and capacity are fixed once created."""
+
+    class Meta:
+        model = EventSeries
+        fields = "__all__"
+        read_only_fields = [
+            field.name
+            for field in EventSeries._meta.fields
+            if field.name not in SERIES_WIDE_FIELDS
+        ]
@@ -1,7 +1,35 @@
+import asyncio
+import csv
+import io
+import json
+import os
+import random
+import string
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock, skipUnless
+from asgiref.sync import async_to_sync
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APITestCase, APIClient
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase, override_settings
 from django.urls import reverse
-from events.models import Event
+from django.utils import timezone
+from eventmanagement.rows import RowSerializer
+from events import availability, seating
+from events import cache as event_cache
+from events.inventory import aclaim_seat, claim_seat, shard_inventory
+from events.models import Event, EventSearchTerm, EventSeries
+from events.pagination import EventKeysetPagination
+from events.recurrence import extend, occurrence_starts
+from events.search import matching_event_ids, rebuild_index
+from events.serializers import EventRowSerializer, EventSerializer
 from reservations.models import Reservation
+from reservations.serializers import ReservationRowSerializer, ReservationSerializer
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -76,5 +104,859 @@ class EventAPITestCase(APITestCase):
         self.client.force_authenticate(user=self.organizer)
         resp = self.client.get(url)
         self.assertEqual(resp.status_code, 200)
-        self.assertEqual(len(resp.data), 1)
-        self.assertEqual(resp.data[0]["user"], str(self.user))
+        self.assertEqual(resp.data["count"], 1)
+        self.assertEqual(resp.data["results"][0]["user"], str(self.user))
+
+
+class AttendeeExportTestCase(APITestCase):
+    def setUp(self):
+        self.organizer = User.objects.create_user(username="organizer", password="pass")
+        self.event = Event.objects.create(
+            title="Big Event",
+            organizer=self.organizer,
+            start_time="2030-01-01T10:00:00Z",
+            end_time="2030-01-01T12:00:00Z",
+            show_time="2030-01-01T09:00:00Z",
+            capacity=1200,
+        )
+        attendees = User.objects.bulk_create(
+            User(username=f"attendee{i}") for i in range(1100)
+        )
+        Reservation.objects.bulk_create(
+            Reservation(user=user, event=self.event) for user in attendees
+        )
+        self.url = reverse("event-export-attendees", args=[self.event.id])
+        self.client.force_authenticate(user=self.organizer)
+
+    def test_csv_export_streams_every_attendee(self):
+        # The event and its seat shards, then one streamed query.
+        with self.assertNumQueries(3):
+            resp = self.client.get(self.url)
+            self.assertTrue(resp.streaming)
+            body = b"".join(resp.streaming_content).decode()
+        self.assertEqual(resp["Content-Type"], "text/csv")
+        self.assertIn("event-", resp["Content-Disposition"])
+        rows = list(csv.reader(io.StringIO(body)))
+        self.assertEqual(rows[0], ["id", "user_id", "user", "created_at"])
+        self.assertEqual(len(rows), 1101)
+        self.assertEqual(rows[1][2], "attendee0")
+
+    def test_ndjson_export(self):
+        resp = self.client.get(self.url, {"output": "ndjson"})
+        lines = b"".join(resp.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 1100)
+        first = json.loads(lines[0])
+        self.assertEqual(first["user"], "attendee0")
+        self.assertTrue(first["created_at"].endswith("Z"))
+
+    def test_only_organizer_and_valid_output(self):
+        self.assertEqual(self.client.get(self.url, {"output": "xml"}).status_code, 400)
+        other = User.objects.create_user(username="other", password="pass")
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class EventCacheTestCase(APITestCase):
+    def setUp(self):
+        event_cache.get_cache().clear()
+        event_cache.stats.reset()
+        self.organizer = User.objects.create_user(
+            username="organizer", password="pass123"
+        )
+        self.event = Event.objects.create(
+            title="Cached Event",
+            organizer=self.organizer,
+            start_time="2030-01-01T10:00:00Z",
+            end_time="2030-01-01T12:00:00Z",
+            show_time="2030-01-01T09:00:00Z",
+            capacity=10,
+        )
+        self.detail_url = reverse("event-detail", args=[self.event.id])
+
+    def test_repeated_reads_are_served_from_cache(self):
+        self.client.get(reverse("event-list"))
+        self.client.get(self.detail_url)
+        with self.assertNumQueries(0):
+            resp = self.client.get(reverse("event-list"))
+            self.assertEqual(resp.data["results"][0]["title"], "Cached Event")
+            resp = self.client.get(self.detail_url)
+            self.assertEqual(resp.data["title"], "Cached Event")
+        self.assertEqual(event_cache.stats.as_dict()["hits"], 2)
+        self.assertEqual(event_cache.stats.as_dict()["misses"], 2)
+
+    def test_event_update_invalidates_list_and_detail(self):
+        self.client.get(reverse("event-list"))
+        self.client.get(self.detail_url)
+
+        self.client.force_authenticate(user=self.organizer)
+        self.client.patch(self.detail_url, {"title": "Renamed"}, format="json")
+
+        self.assertEqual(self.client.get(self.detail_url).data["title"], "Renamed")
+        resp = self.client.get(reverse("event-list"))
+        self.assertEqual(resp.data["results"][0]["title"], "Renamed")
+
+    def test_reservation_invalidates_seats_remaining(self):
+        self.client.get(self.detail_url)
+        user = User.objects.create_user(username="user", password="pass123")
+        self.client.force_authenticate(user=user)
+        self.client.post(reverse("reservation-list"), {"event_id": self.event.id})
+
+        self.assertEqual(self.client.get(self.detail_url).data["seats_remaining"], 9)
+
+    def test_event_delete_invalidates_detail(self):
+        self.client.get(self.detail_url)
+        self.client.force_authenticate(user=self.organizer)
+        self.client.delete(self.detail_url)
+
+        self.assertEqual(self.client.get(self.detail_url).status_code, 404)
+
+    def test_cache_stats_are_staff_only(self):
+        url = reverse("event-cache-stats")
+        self.client.force_authenticate(user=self.organizer)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.organizer.is_staff = True
+        self.organizer.save()
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("hit_rate", resp.data)
+
+
+class EventFeedTestCase(APITestCase):
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            username="organizer", password="pass123"
+        )
+        # Several events share a start time, so the cursor must break ties by id.
+        for i in range(7):
+            self.create_event(
+                f"Event {i}",
+                start_time=f"2030-01-0{1 + i // 3}T10:00:00Z",
+                event_type="CONCERT" if i % 2 else "MEETUP",
+            )
+
+    def create_event(self, title, start_time, **kwargs):
+        return Event.objects.create(
+            title=title,
+            organizer=self.organizer,
+            start_time=start_time,
+            end_time=start_time,
+            show_time=start_time,
+            capacity=10,
+            **kwargs,
+        )
+
+    def test_feed_walks_every_event_once_in_order(self):
+        url = reverse("event-feed") + "?page_size=3"
+        titles = []
+        while url:
+            resp = self.client.get(url)
+            self.assertEqual(resp.status_code, 200)
+            self.assertNotIn("count", resp.data)
+            titles.extend(e["title"] for e in resp.data["results"])
+            url = resp.data["next"]
+        self.assertEqual(titles, [f"Event {i}" for i in range(7)])
+
+    def test_filters(self):
+        sold_out = self.create_event("Sold Out", "2030-01-02T12:00:00Z")
+        sold_out.seats_remaining = 0
+        sold_out.save()
+        Event.objects.filter(title="Event 0").update(start_time="2020-01-01T10:00:00Z")
+
+        def titles(query):
+            resp = self.client.get(reverse("event-feed") + query)
+            self.assertEqual(resp.status_code, 200)
+            return [e["title"] for e in resp.data["results"]]
+
+        self.assertNotIn("Event 0", titles("?upcoming=true"))
+        self.assertEqual(
+            titles("?event_type=CONCERT"), ["Event 1", "Event 3", "Event 5"]
+        )
+        self.assertEqual(
+            titles(
+                "?start_after=2030-01-02T00:00:00Z&start_before=2030-01-03T00:00:00Z"
+            ),
+            ["Event 3", "Event 4", "Event 5", "Sold Out"],
+        )
+        self.assertNotIn("Sold Out", titles("?has_seats=true"))
+        self.assertEqual(titles("?has_seats=false"), ["Sold Out"])
+
+    def test_detail_ignores_list_filters(self):
+        event = Event.objects.get(title="Event 1")
+        url = reverse("event-detail", args=[event.pk])
+        resp = self.client.get(url + "?event_type=MEETUP&has_seats=false")
+        self.assertEqual(resp.status_code, 200)
+        resp = self.client.get(url + "?start_after=yesterday")
+        self.assertEqual(resp.status_code, 200)
+
+    def test_invalid_parameters(self):
+        resp = self.client.get(reverse("event-feed") + "?cursor=garbage")
+        self.assertEqual(resp.status_code, 404)
+        resp = self.client.get(reverse("event-list") + "?start_after=yesterday")
+        self.assertEqual(resp.status_code, 400)
+
+
+class EventSearchTestCase(APITestCase):
+    def setUp(self):
+        organizer = User.objects.create_user(username="organizer", password="pass")
+        self.events = [
+            Event.objects.create(
+                organizer=organizer,
+                title=title,
+                description=description,
+                event_type=event_type,
+                start_time=f"2030-01-0{i + 1}T10:00:00Z",
+                end_time=f"2030-01-0{i + 1}T12:00:00Z",
+                show_time=f"2030-01-0{i + 1}T09:00:00Z",
+                capacity=10,
+                seats_remaining=seats,
+            )
+            for i, (title, description, event_type, seats) in enumerate(
+                [
+                    ("Python Meetup", "Talks about Django.", "MEETUP", 10),
+                    ("Jazz Night", "Live jazz, no Python.", "CONCERT", 0),
+                    ("Django Workshop", "Hands-on python and Django.", "WORKSHOP", 5),
+                ]
+            )
+        ]
+        self.url = reverse("event-search")
+
+    def search(self, **params):
+        resp = self.client.get(self.url, params)
+        self.assertEqual(resp.status_code, 200)
+        return resp
+
+    def test_matches_every_word_with_facets(self):
+        resp = self.search(q="python")
+        self.assertEqual(
+            [e["title"] for e in resp.data["results"]],
+            ["Python Meetup", "Jazz Night", "Django Workshop"],
+        )
+        self.assertEqual(
+            resp.data["facets"],
+            {
+                "event_type": {"MEETUP": 1, "CONCERT": 1, "WORKSHOP": 1},
+                "availability": {"available": 2, "sold_out": 1},
+            },
+        )
+        resp = self.search(q="Python, DJANGO!")
+        self.assertEqual(resp.data["count"], 2)
+
+    def test_filters_apply_to_results_not_facets(self):
+        resp = self.search(q="python", has_seats="false")
+        self.assertEqual([e["title"] for e in resp.data["results"]], ["Jazz Night"])
+        self.assertEqual(resp.data["facets"]["availability"]["available"], 2)
+
+    def test_index_follows_saves(self):
+        event = self.events[1]
+        event.title = "Blues Night"
+        event.description = "Live blues."
+        event.save()
+        self.assertEqual(self.search(q="python").data["count"], 2)
+        self.assertEqual(self.search(q="blues").data["count"], 1)
+
+        event.delete()
+        self.assertEqual(self.search(q="blues").data["count"], 0)
+
+    def test_rebuild_and_invalid_queries(self):
+        EventSearchTerm.objects.all().delete()
+        call_command("rebuild_search_index", stdout=io.StringIO())
+        self.assertEqual(self.search(q="django").data["count"], 2)
+
+        for q in ["", "a", " ".join(f"word{i}" for i in range(11))]:
+            self.assertEqual(self.client.get(self.url, {"q": q}).status_code, 400)
+
+
+class EventSeriesTestCase(APITestCase):
+    def setUp(self):
+        self.organizer = User.objects.create_user(username="organizer", password="pass")
+        self.client.force_authenticate(user=self.organizer)
+        self.url = reverse("eventseries-list")
+
+    def create(self, start, **fields):
+        return self.client.post(
+            self.url,
+            {
+                "title": "Nightly Show",
+                "description": "Magic on stage.",
+                "capacity": 50,
+                "start_time": start.isoformat(),
+                "end_time": (start + timedelta(hours=2)).isoformat(),
+                "show_time": (start - timedelta(minutes=30)).isoformat(),
+                "frequency": "DAILY",
+                **fields,
+            },
+            format="json",
+        )
+
+    def test_create_generates_occurrences_in_bulk(self):
+        start = (timezone.now() + timedelta(days=1)).replace(microsecond=0)
+        # Series, occurrences, search terms and generated_until in one
+        # transaction (two savepoint pairs inside the test's transaction).
+        with self.assertNumQueries(9):
+            response = self.create(start, count=60)
+        self.assertEqual(response.status_code, 201)
+
+        events = Event.objects.filter(series_id=response.data["id"]).order_by(
+            "start_time"
+        )
+        self.assertEqual(events.count(), 60)
+        last = events.last()
+        self.assertEqual(last.start_time, start + timedelta(days=59))
+        self.assertEqual(last.end_time - last.start_time, timedelta(hours=2))
+        self.assertEqual(last.start_time - last.show_time, timedelta(minutes=30))
+        self.assertEqual(last.seats_remaining, 50)
+        self.assertEqual(EventSearchTerm.objects.filter(term="magic").count(), 60)
+
+        url = reverse("eventseries-occurrences", args=[response.data["id"]])
+        response = self.client.get(url)
+        self.assertEqual(response.data["count"], 60)
+        self.assertEqual(response.data["results"][0]["title"], "Nightly Show")
+
+    def test_failed_generation_leaves_no_series(self):
+        start = timezone.now() + timedelta(days=1)
+        with mock.patch(
+            "events.recurrence.extend", side_effect=RuntimeError("generation failed")
+        ):
+            with self.assertRaises(RuntimeError):
+                self.create(start, count=3)
+        self.assertFalse(EventSeries.objects.exists())
+
+    @override_settings(EVENT_SERIES_HORIZON_DAYS=30)
+    def test_far_future_occurrences_are_created_lazily(self):
+        start = timezone.now() + timedelta(days=1)
+        response = self.create(start, frequency="WEEKLY")
+        series = EventSeries.objects.get(pk=response.data["id"])
+        self.assertEqual(series.occurrences.count(), 5)
+
+        with self.settings(EVENT_SERIES_HORIZON_DAYS=60):
+            call_command("extend_event_series", stdout=io.StringIO())
+            call_command("extend_event_series", stdout=io.StringIO())
+        self.assertEqual(series.occurrences.count(), 9)
+        self.assertEqual(series.occurrences.values("start_time").distinct().count(), 9)
+
+    def test_series_wide_edit_updates_upcoming_occurrences_only(self):
+        start = timezone.now() - timedelta(days=2) + timedelta(hours=1)
+        series_id = self.create(start, count=5).data["id"]
+        url = reverse("eventseries-detail", args=[series_id])
+
+        response = self.client.patch(
+            url, {"title": "Late Show", "capacity": 5}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["capacity"], 50)
+        titles = list(
+            Event.objects.filter(series_id=series_id)
+            .order_by("start_time")
+            .values_list("title", flat=True)
+        )
+        self.assertEqual(titles, ["Nightly Show"] * 2 + ["Late Show"] * 3)
+        self.assertEqual(EventSearchTerm.objects.filter(term="late").count(), 3)
+
+        other = User.objects.create_user(username="other", password="pass")
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.patch(url, {"title": "Mine"}).status_code, 403)
+
+    @override_settings(TIME_ZONE="Europe/Amsterdam")
+    def test_occurrences_keep_local_time_across_dst(self):
+        series = EventSeries(
+            start_time=datetime(2030, 3, 30, 19, tzinfo=dt_timezone.utc),
+            frequency="DAILY",
+            interval=1,
+            count=2,
+        )
+        starts = list(occurrence_starts(series))
+        # 20:00 CET, then 20:00 CEST.
+        self.assertEqual(
+            [start.astimezone(dt_timezone.utc).hour for start in starts], [19, 18]
+        )
+
+    def test_invalid_series(self):
+        start = timezone.now() + timedelta(days=1)
+        response = self.create(start, interval=0)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("interval", response.data)
+        response = self.create(start, end_time=start.isoformat())
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("end_time", response.data)
+
+
+def availability_settings(backend):
+    return {
+        "BACKEND": f"events.availability.{backend}",
+        "CACHE_ALIAS": "events",
+        "TICK": 0.01,
+        "HEARTBEAT": 15,
+    }
+
+
+@override_settings(EVENT_AVAILABILITY=availability_settings("LocalBackend"))
+@override_settings(EVENT_CACHE={"ENABLED": False, "ALIAS": "events"})
+class EventRowSerializerTestCase(APITestCase):
+    def setUp(self):
+        self.organizer = User.objects.create_user(username="organizer", password="pass")
+        self.plain = self.create_event("Plain", event_type="CONCERT")
+        self.sharded = shard_inventory(self.create_event("Sharded ünïcode"), 3)
+        claim_seat(self.sharded)
+        self.seated = self.create_event("Seated")
+        seating.add_section(self.seated, "Stalls", 2, 5)
+        series = EventSeries.objects.create(
+            organizer=self.organizer,
+            title="Weekly",
+            capacity=20,
+            start_time=datetime(2030, 2, 1, 18, 30, 0, 123456, dt_timezone.utc),
+            end_time=datetime(2030, 2, 1, 20, tzinfo=dt_timezone.utc),
+            show_time=datetime(2030, 2, 1, 18, tzinfo=dt_timezone.utc),
+            frequency="WEEKLY",
+            count=2,
+        )
+        extend(series, datetime(2031, 1, 1, tzinfo=dt_timezone.utc))
+        self.rows = EventRowSerializer()
+
+    def create_event(self, title, **fields):
+        return Event.objects.create(
+            organizer=self.organizer,
+            title=title,
+            start_time="2030-01-01T10:00:00Z",
+            end_time="2030-01-01T12:00:00Z",
+            show_time="2030-01-01T09:00:00Z",
+            capacity=10,
+            **fields,
+        )
+
+    def assertSameJSON(self, fast, drf):
+        render = JSONRenderer().render
+        self.assertEqual(render(fast), render(drf))
+
+    def test_rows_render_byte_identical_json(self):
+        events = Event.objects.prefetch_related("seat_shards").order_by("id")
+        self.assertEqual(len(events), 5)
+        fast = self.rows.many(events.values(*self.rows.columns))
+        self.assertSameJSON(fast, EventSerializer(events, many=True).data)
+        self.assertEqual(fast[1]["seats_remaining"], 9)
+
+        for event in events:
+            self.assertSameJSON(
+                self.rows.one(self.rows.instance_row(event)),
+                EventSerializer(event).data,
+            )
+
+    def test_times_use_the_active_time_zone(self):
+        events = Event.objects.prefetch_related("seat_shards").order_by("id")
+        with timezone.override("Asia/Kolkata"):
+            fast = self.rows.many(events.values(*self.rows.columns))
+            self.assertSameJSON(fast, EventSerializer(events, many=True).data)
+        self.assertEqual(fast[0]["start_time"], "2030-01-01T15:30:00+05:30")
+
+    def test_endpoints_match_drf_output(self):
+        events = Event.objects.prefetch_related("seat_shards").order_by(
+            "start_time", "id"
+        )
+        expected = json.loads(
+            JSONRenderer().render(EventSerializer(events, many=True).data)
+        )
+        resp = self.client.get(reverse("event-list"))
+        self.assertEqual(resp.json()["results"], expected)
+        resp = self.client.get(reverse("event-feed"), {"page_size": 2})
+        self.assertEqual(resp.json()["results"], expected[:2])
+        resp = self.client.get(resp.json()["next"])
+        self.assertEqual(resp.json()["results"], expected[2:4])
+        resp = self.client.get(reverse("event-detail", args=[self.sharded.id]))
+        by_id = {event["id"]: event for event in expected}
+        self.assertEqual(resp.json(), by_id[self.sharded.id])
+
+    def test_list_costs_one_query_more_with_sharded_events(self):
+        # Validators, page count and rows, plus the sharded event's shard sums.
+        with self.assertNumQueries(4):
+            self.client.get(reverse("event-list"))
+        with self.assertNumQueries(3):
+            self.client.get(reverse("event-list"), {"event_type": "CONCERT"})
+
+    def test_fields_without_a_column_are_rejected(self):
+        class TitledSerializer(serializers.ModelSerializer):
+            shouting = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Event
+                fields = ["id", "shouting"]
+
+        class TitledRowSerializer(RowSerializer):
+            serializer_class = TitledSerializer
+
+        with self.assertRaises(ImproperlyConfigured):
+            TitledRowSerializer().columns
+
+
+@override_settings(EVENT_CACHE={"ENABLED": False, "ALIAS": "events"})
+class ConditionalGetTestCase(APITestCase):
+    def setUp(self):
+        event_cache.get_cache().clear()
+        self.organizer = User.objects.create_user(username="organizer", password="pass")
+        self.event = self.create_event("Polled Event")
+        self.detail_url = reverse("event-detail", args=[self.event.id])
+
+    def create_event(self, title):
+        return Event.objects.create(
+            organizer=self.organizer,
+            title=title,
+            start_time="2030-01-01T10:00:00Z",
+            end_time="2030-01-01T12:00:00Z",
+            show_time="2030-01-01T09:00:00Z",
+            capacity=10,
+        )
+
+    def test_detail_not_modified_until_seats_change(self):
+        resp = self.client.get(self.detail_url)
+        etag = resp["ETag"]
+        self.assertTrue(etag.startswith('"'))
+        self.assertIn("Last-Modified", resp)
+
+        # The event and its shards; nothing is serialized.
+        with mock.patch.object(EventRowSerializer, "many") as many:
+            with self.assertNumQueries(2):
+                resp = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        many.assert_not_called()
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp["ETag"], etag)
+        self.assertEqual(resp.content, b"")
+
+        claim_seat(self.event)
+        resp = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["seats_remaining"], 9)
+        self.assertNotEqual(resp["ETag"], etag)
+
+    def test_detail_ignores_if_modified_since(self):
+        last_modified = self.client.get(self.detail_url)["Last-Modified"]
+        # Usually within the same second as the read, which the header cannot tell.
+        claim_seat(self.event)
+        resp = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["seats_remaining"], self.event.capacity - 1)
+
+    def test_sharded_claims_change_the_etag(self):
+        event = shard_inventory(self.event, 2)
+        etag = self.client.get(self.detail_url)["ETag"]
+        list_etag = self.client.get(reverse("event-list"))["ETag"]
+        claim_seat(event)
+        resp = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        resp = self.client.get(reverse("event-list"), HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(resp.status_code, 200)
+
+    def test_list_pages(self):
+        url = reverse("event-list")
+        etag = self.client.get(url)["ETag"]
+        # One aggregate query, then no count, rows or serializer.
+        with self.assertNumQueries(1):
+            resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertNotEqual(self.client.get(url, {"page": 1})["ETag"], etag)
+        feed = self.client.get(reverse("event-feed"))["ETag"]
+        self.assertNotEqual(feed, etag)
+
+        other = self.create_event("Another Event")
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        etag = resp["ETag"]
+        # A deletion moves no timestamp, but the count changes the ETag...
+        other.delete()
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        # ...and If-Modified-Since alone is not trusted for lists.
+        resp = self.client.get(url, HTTP_IF_MODIFIED_SINCE=resp["Last-Modified"])
+        self.assertEqual(resp.status_code, 200)
+
+    def test_cached_responses_need_no_query_for_304(self):
+        with self.settings(EVENT_CACHE={"ENABLED": True, "ALIAS": "events"}):
+            list_etag = self.client.get(reverse("event-list"))["ETag"]
+            etag = self.client.get(self.detail_url)["ETag"]
+            with self.assertNumQueries(0):
+                resp = self.client.get(
+                    reverse("event-list"), HTTP_IF_NONE_MATCH=list_etag
+                )
+                self.assertEqual(resp.status_code, 304)
+                resp = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(resp.status_code, 304)
+
+            claim_seat(self.event)
+            resp = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(resp.status_code, 200)
+            resp = self.client.get(reverse("event-list"), HTTP_IF_NONE_MATCH=list_etag)
+            self.assertEqual(resp.status_code, 200)
+
+
+class AvailabilityStreamTestCase(TestCase):
+    def setUp(self):
+        availability._backends.clear()
+        availability.hub.watchers.clear()
+        availability.hub.latest.clear()
+        organizer = User.objects.create_user(username="organizer", password="pass")
+        self.event = Event.objects.create(
+            organizer=organizer,
+            title="On-sale",
+            start_time="2030-01-01T10:00:00Z",
+            end_time="2030-01-01T12:00:00Z",
+            show_time="2030-01-01T09:00:00Z",
+            capacity=10,
+        )
+
+    def test_tick_reads_each_changed_event_once_for_all_watchers(self):
+        self.event = shard_inventory(self.event, 2)
+        queues = [availability.hub.watch(self.event.id) for _ in range(3)]
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(4):
+                claim_seat(self.event)
+
+        with self.assertNumQueries(1):
+            async_to_sync(availability.hub.tick)()
+        self.assertEqual([queue.get_nowait() for queue in queues], [6, 6, 6])
+
+        with self.assertNumQueries(0):
+            async_to_sync(availability.hub.tick)()
+        self.assertTrue(all(queue.empty() for queue in queues))
+
+    @override_settings(EVENT_AVAILABILITY=availability_settings("CacheBackend"))
+    def test_cache_backend_sees_writes_from_other_processes(self):
+        event_cache.get_cache().clear()
+        queue = availability.hub.watch(self.event.id)
+        async_to_sync(availability.hub.tick)()
+        self.assertEqual(queue.get_nowait(), 10)
+
+        with self.assertNumQueries(0):
+            async_to_sync(availability.hub.tick)()
+
+        # Another worker's backend instance shares only the cache.
+        Event.objects.filter(pk=self.event.pk).update(seats_remaining=7)
+        availability.CacheBackend().publish(self.event.id)
+        async_to_sync(availability.hub.tick)()
+        self.assertEqual(queue.get_nowait(), 7)
+
+    def test_slow_watcher_only_gets_the_latest_count(self):
+        queue = availability.hub.watch(self.event.id)
+        availability.offer(queue, 9)
+        availability.offer(queue, 8)
+        self.assertEqual(queue.get_nowait(), 8)
+
+    async def test_stream_pushes_seat_changes(self):
+        url = reverse("async-event-availability", args=[self.event.id])
+        response = await self.async_client.get(url)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        content = response.streaming_content
+
+        first = await asyncio.wait_for(anext(content), 5)
+        self.assertEqual(
+            first,
+            b'event: seats\ndata: {"event": %d, "seats_remaining": 10}\n\n'
+            % self.event.id,
+        )
+        await aclaim_seat(self.event)
+        second = await asyncio.wait_for(anext(content), 5)
+        self.assertIn(b'"seats_remaining": 9', second)
+
+        await content.aclose()
+
+        stream = availability.stream(self.event.id)
+        self.assertIn('"seats_remaining": 9', await anext(stream))
+        self.assertEqual(len(availability.hub.watchers[self.event.id]), 2)
+        await stream.aclose()
+        self.assertEqual(len(availability.hub.watchers[self.event.id]), 1)
+
+        response = await self.async_client.get(
+            reverse("async-event-availability", args=[999])
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+@skipUnless(os.environ.get("RUN_BENCHMARKS"), "set RUN_BENCHMARKS=1 to run")
+@override_settings(EVENT_CACHE={"ENABLED": False, "ALIAS": "events"})
+class EventSearchBenchmark(APITestCase):
+    """
+    Compares indexed search with a naive icontains scan of title and
+    description on a large seeded catalogue.
+    """
+
+    events = int(os.environ.get("SEARCH_BENCHMARK_EVENTS", 50_000))
+
+    def setUp(self):
+        rng = random.Random(0)
+        words = [
+            "".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 9)))
+            for _ in range(5000)
+        ]
+        organizer = User.objects.create_user(username="organizer", password="pass")
+        when = datetime(2030, 1, 1, tzinfo=dt_timezone.utc)
+        Event.objects.bulk_create(
+            (
+                Event(
+                    organizer=organizer,
+                    title=" ".join(rng.choices(words, k=3)),
+                    description=" ".join(rng.choices(words, k=30)),
+                    start_time=when,
+                    end_time=when,
+                    show_time=when,
+                    capacity=100,
+                    seats_remaining=100,
+                )
+                for _ in range(self.events)
+            ),
+            batch_size=10_000,
+        )
+        rebuild_index(batch_size=10_000)
+        self.queries = rng.sample(words, 20)
+
+    def timed(self, search):
+        started = time.perf_counter()
+        for word in self.queries:
+            search(word)
+        return (time.perf_counter() - started) / len(self.queries) * 1000
+
+    def test_index_against_icontains_scan(self):
+        def first_page(queryset):
+            # What a paginated response needs: the total and the first rows.
+            queryset.count()
+            return list(queryset.order_by("start_time", "id").values_list("pk")[:10])
+
+        index_ms = self.timed(
+            lambda word: first_page(
+                Event.objects.filter(pk__in=matching_event_ids({word}))
+            )
+        )
+        scan_ms = self.timed(
+            lambda word: first_page(
+                Event.objects.filter(
+                    Q(title__icontains=word) | Q(description__icontains=word)
+                )
+            )
+        )
+        api_ms = self.timed(
+            lambda word: self.client.get(reverse("event-search"), {"q": word})
+        )
+        print(
+            f"\n[{connection.vendor}] {self.events} events, ms per query: "
+            f"index {index_ms:.1f}, icontains scan {scan_ms:.1f}, "
+            f"search endpoint with count and facets {api_ms:.1f}"
+        )
+
+
+@skipUnless(os.environ.get("RUN_BENCHMARKS"), "set RUN_BENCHMARKS=1 to run")
+@override_settings(EVENT_CACHE={"ENABLED": False, "ALIAS": "events"})
+class EventFeedBenchmark(APITestCase):
+    """
+    Seeds a large catalogue and compares the cost of a deep page with the
+    first page, for keyset (feed) and page-number (list) pagination.
+    """
+
+    events = int(os.environ.get("BENCHMARK_EVENTS", 1_000_000))
+
+    def setUp(self):
+        organizer = User.objects.create_user(username="organizer", password="pass")
+        start = datetime(2030, 1, 1, tzinfo=dt_timezone.utc)
+        batch = []
+        for i in range(self.events):
+            when = start + timedelta(minutes=i)
+            batch.append(
+                Event(
+                    organizer=organizer,
+                    title=f"Event {i}",
+                    start_time=when,
+                    end_time=when,
+                    show_time=when,
+                    capacity=100,
+                    seats_remaining=100,
+                )
+            )
+            if len(batch) == 10_000:
+                Event.objects.bulk_create(batch)
+                batch = []
+        Event.objects.bulk_create(batch)
+
+    def timed_get(self, url, repeat=5):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            resp = self.client.get(url)
+            self.assertEqual(resp.status_code, 200)
+        return (time.perf_counter() - started) / repeat * 1000
+
+    def test_deep_pages_cost_the_same_as_the_first(self):
+        deep = Event.objects.order_by("start_time", "id")[self.events - 20]
+        cursor = EventKeysetPagination().encode_cursor(deep.start_time, deep.pk)
+        feed_first = self.timed_get(reverse("event-feed"))
+        feed_deep = self.timed_get(reverse("event-feed") + f"?cursor={cursor}")
+        list_first = self.timed_get(reverse("event-list"))
+        list_deep = self.timed_get(reverse("event-list") + f"?page={self.events // 10}")
+        print(
+            f"\n[{connection.vendor}] {self.events} events, ms per request: "
+            f"feed first {feed_first:.1f}, feed deep {feed_deep:.1f}, "
+            f"list first {list_first:.1f}, list deep {list_deep:.1f}"
+        )
+
+
+@skipUnless(os.environ.get("RUN_BENCHMARKS"), "set RUN_BENCHMARKS=1 to run")
+class RowSerializerBenchmark(APITestCase):
+    """
+    Objects per second through the DRF serializers and the row fast paths,
+    for events and for reservations with their nested event. Each run
+    includes the query, as a list endpoint pays for both.
+    """
+
+    objects = int(os.environ.get("ROW_BENCHMARK_OBJECTS", 10_000))
+
+    def setUp(self):
+        organizer = User.objects.create_user(username="organizer", password="pass")
+        when = datetime(2030, 1, 1, tzinfo=dt_timezone.utc)
+        events = Event.objects.bulk_create(
+            Event(
+                organizer=organizer,
+                title=f"Event {i}",
+                description="A benchmark event",
+                event_type="CONCERT",
+                start_time=when + timedelta(minutes=i),
+                end_time=when + timedelta(minutes=i + 90),
+                show_time=when + timedelta(minutes=i - 30),
+                capacity=100,
+                seats_remaining=99,
+            )
+            for i in range(self.objects)
+        )
+        Reservation.objects.bulk_create(
+            Reservation(user=organizer, event=event) for event in events
+        )
+
+    def rate(self, serialize, repeat=3):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            serialize()
+        return self.objects * repeat / (time.perf_counter() - started)
+
+    def test_objects_per_second(self):
+        events = Event.objects.prefetch_related("seat_shards").order_by("id")
+        event_rows = EventRowSerializer()
+        reservations = (
+            Reservation.objects.select_related("user", "event")
+            .prefetch_related("event__seat_shards", "seats")
+            .order_by("id")
+        )
+        reservation_rows = ReservationRowSerializer()
+        results = {
+            "event drf": self.rate(
+                lambda: EventSerializer(events.all(), many=True).data
+            ),
+            "event rows": self.rate(
+                lambda: event_rows.many(events.values(*event_rows.columns))
+            ),
+            "reservation drf": self.rate(
+                lambda: ReservationSerializer(reservations.all(), many=True).data
+            ),
+            "reservation rows": self.rate(
+                lambda: reservation_rows.many(
+                    reservations.prefetch_related(None).values(
+                        *reservation_rows.columns
+                    )
+                )
+            ),
+        }
+        print(
+            f"\n[{connection.vendor}] {self.objects} objects, objects/s: "
+            + ", ".join(f"{name} {rate:,.0f}" for name, rate in results.items())
+        )
@@ -1,10 +1,22 @@
-from .views import EventViewSet
+from . import async_views
+from .views import EventSeriesViewSet, EventViewSet
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
 router = DefaultRouter()
 router.register(r"events", EventViewSet)
+router.register(r"series", EventSeriesViewSet)
 
 urlpatterns = [
+    path(
+        "async/events/<int:pk>/",
+        async_views.event_detail,
+        name="async-event-detail",
+    ),
+    path(
+        "async/events/<int:pk>/availability/",
+        async_views.event_availability,
+        name="async-event-availability",
+    ),
     path("", include(router.urls)),
 ]
@@ -1,10 +1,31 @@
+import functools
+
+from django.db.models import Count, Max, Sum
 from rest_framework import viewsets, permissions
-from .models import Event
-from .serializers import EventSerializer
+from eventmanagement import conditional
+from . import cache as event_cache
+from .filters import EventFilterBackend
+from .inventory import available_seats
+from .models import Event, EventSeries
+from .pagination import EventKeysetPagination
+from .serializers import (
+    EventRowSerializer,
+    EventSectionSerializer,
+    EventSerializer,
+    EventSeriesSerializer,
+    EventSeriesUpdateSerializer,
+)
+from . import recurrence, search, seating
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
+from reservations import export as attendee_export
 from reservations.models import Reservation
-from reservations.serializers import ReservationSerializer
+from reservations.serializers import EventReservationSerializer, OrganizerStatsParams
+from reservations.stats import organizer_stats
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework.exceptions import ValidationError
 
 
 class IsOrganizerOrReadOnly(permissions.BasePermission):
@@ -22,17 +43,234 @@ class EventViewSet(viewsets.ModelViewSet):
     Only the organizer can view all reservations for their events.
     """
 
-    queryset = Event.objects.all()
+    queryset = Event.objects.prefetch_related("seat_shards").order_by(
+        "start_time", "id"
+    )
     serializer_class = EventSerializer
+    # Read-only output of list and detail responses; writes use serializer_class.
+    rows = EventRowSerializer()
+    filter_backends = [EventFilterBackend]
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOrganizerOrReadOnly]
 
     def perform_create(self, serializer):
         serializer.save(organizer=self.request.user)
 
+    def list(self, request, *args, **kwargs):
+        return self.conditional_list(request)
+
+    def list_rows(self, queryset):
+        """A page of ``queryset`` serialized from ``.values()`` rows."""
+        rows = queryset.prefetch_related(None).values(*self.rows.columns)
+        return self.get_paginated_response(self.rows.many(self.paginate_queryset(rows)))
+
+    def list_state(self, queryset):
+        """What a page of ``queryset`` depends on, in one aggregate query."""
+        # Sharded events keep seats_remaining at zero, so joining their shards
+        # does not inflate the sum.
+        state = queryset.order_by().aggregate(
+            count=Count("id", distinct=True),
+            updated_at=Max("updated_at"),
+            shards_updated_at=Max("seat_shards__updated_at"),
+            seats=Sum("seats_remaining"),
+            shard_seats=Sum("seat_shards__seats_remaining"),
+        )
+        state["last_modified"] = conditional.newest(
+            state["updated_at"], state["shards_updated_at"]
+        )
+        return state
+
+    def conditional_list(self, request):
+        """
+        A list page with validators from ``list_state``, or a 304 for a
+        matching If-None-Match. Bodies and states are cached when enabled.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        if not event_cache.is_enabled():
+            return conditional.serve(
+                request,
+                self.list_state(queryset),
+                lambda: self.list_rows(queryset).data,
+            )
+        key = event_cache.list_key(request)
+        return conditional.serve(
+            request,
+            event_cache.read_state(key, lambda: self.list_state(queryset)),
+            lambda: event_cache.read_through(
+                key, lambda: self.list_rows(queryset).data
+            ),
+        )
+
+    @action(detail=False, methods=["get"], pagination_class=EventKeysetPagination)
+    def feed(self, request):
+        """
+        List events ordered by start time with cursor pagination.
+        Accepts the same filters as the list endpoint.
+        """
+        return self.conditional_list(request)
+
+    @extend_schema(parameters=[OpenApiParameter("q", str, required=True)])
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        """
+        Events whose title or description contains every word of `q`, with
+        the list filters and pagination. `facets` counts all matches of `q`
+        by event type and seat availability, before the other filters.
+        """
+        terms = search.tokenize(request.query_params.get("q", ""))
+        if not terms:
+            raise ValidationError(
+                {"q": "Enter at least one word of two or more letters."}
+            )
+        if len(terms) > search.MAX_QUERY_TERMS:
+            raise ValidationError({"q": f"Use at most {search.MAX_QUERY_TERMS} words."})
+        if not event_cache.is_enabled():
+            return self.list_search(request, terms)
+        data = event_cache.read_through(
+            event_cache.list_key(request),
+            lambda: self.list_search(request, terms).data,
+        )
+        return Response(data)
+
+    def list_search(self, request, terms):
+        matches = self.get_queryset().filter(pk__in=search.matching_event_ids(terms))
+        response = self.list_rows(self.filter_queryset(matches))
+        response.data["facets"] = search.facets(matches)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Event details with validators taken from the event row and its
+        seat shards. A matching If-None-Match gets a 304.
+        """
+        # Loaded at most once, and not at all when both come from the cache.
+        get_object = functools.cache(self.get_object)
+
+        def state():
+            event = get_object()
+            return {
+                "updated_at": event.updated_at,
+                "seats": available_seats(event),
+                "last_modified": conditional.newest(
+                    event.updated_at,
+                    *(shard.updated_at for shard in event.seat_shards.all()),
+                ),
+            }
+
+        def build():
+            return self.rows.one(self.rows.instance_row(get_object()))
+
+        if not event_cache.is_enabled():
+            return conditional.serve(request, state(), build)
+        key = event_cache.detail_key(kwargs["pk"])
+        return conditional.serve(
+            request,
+            event_cache.read_state(key, state),
+            lambda: event_cache.read_through(key, build),
+        )
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="cache-stats",
+        permission_classes=[permissions.IsAdminUser],
+    )
+    def cache_stats(self, request):
+        """
+        Hit/miss counters of the event cache for this process.
+        Only staff users can access this endpoint.
+        """
+        return Response(
+            {"enabled": event_cache.is_enabled(), **event_cache.stats.as_dict()}
+        )
+
+    @extend_schema(parameters=[OrganizerStatsParams])
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def stats(self, request):
+        """
+        Booking stats across the requesting organizer's events: totals,
+        per-event sold/cancelled/fill rate, and bookings per day, week or
+        month (`bucket`) between the optional `start` and `end` dates.
+        """
+        params = OrganizerStatsParams(data=request.query_params.dict())
+        params.is_valid(raise_exception=True)
+        return Response(organizer_stats(request.user, **params.validated_data))
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("output", enum=sorted(attendee_export.CONTENT_TYPES))
+        ],
+        responses={(200, "text/csv"): str, (200, "application/x-ndjson"): str},
+    )
+    @action(detail=True, methods=["get"], url_path="attendees/export")
+    def export_attendees(self, request, pk=None):
+        """
+        Stream the event's attendees as CSV (default) or NDJSON (`output=ndjson`).
+        Only the organizer can access this endpoint.
+        """
+        event = self.get_object()
+        if event.organizer_id != request.user.pk:
+            return Response(
+                {"detail": "Not authorized to access this event reservations details."},
+                status=403,
+            )
+        output = request.query_params.get("output", "csv")
+        if output not in attendee_export.CONTENT_TYPES:
+            raise ValidationError({"output": "Must be 'csv' or 'ndjson'."})
+        response = StreamingHttpResponse(
+            attendee_export.stream_attendees(event, output),
+            content_type=attendee_export.CONTENT_TYPES[output],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="event-{event.pk}-attendees.{output}"'
+        )
+        return response
+
+    @extend_schema(
+        request=EventSectionSerializer, responses={201: EventSectionSerializer}
+    )
+    @action(detail=True, methods=["post"])
+    def sections(self, request, pk=None):
+        """
+        Add a section of `rows` x `seats_per_row` numbered seats. The first
+        section switches the event to assigned seating, with a capacity of
+        all its sections' seats. Only the organizer can add sections.
+        """
+        event = self.get_object()
+        serializer = EventSectionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            section = seating.add_section(event, **serializer.validated_data)
+        except ValueError as e:
+            raise ValidationError(str(e))
+        except IntegrityError:
+            raise ValidationError({"name": "The event already has a section named so."})
+        return Response(EventSectionSerializer(section).data, status=201)
+
+    @extend_schema(parameters=[OpenApiParameter("block", int)])
+    @action(detail=True, methods=["get"])
+    def seats(self, request, pk=None):
+        """
+        Seat map of each section, one string per row with "0" for a free and
+        "1" for a taken seat. With `block`, each section also gets the best
+        block of that many adjacent free seats (front rows, then centre).
+        """
+        block = request.query_params.get("block")
+        max_block = seating.MAX_SEATS_PER_RESERVATION
+        if block is not None:
+            if not block.isdigit() or not 1 <= int(block) <= max_block:
+                raise ValidationError({"block": f"Must be between 1 and {max_block}."})
+            block = int(block)
+        event = self.get_object()
+        return Response({"event": event.pk, "sections": seating.seat_map(event, block)})
+
     @action(detail=True, methods=["get"], url_path="total-reservations")
     def reservations(self, request, pk=None):
         """
-        Retrieve the total number of reservations for the event.
+        Retrieve the reservations for the event, paginated, with the total in `count`.
         Only the organizer can access this endpoint.
         """
         event = self.get_object()
@@ -41,6 +279,50 @@ class EventViewSet(viewsets.ModelViewSet):
                 {"detail": "Not authorized to access this event reservations details."},
                 status=403,
             )
-        reservations = Reservation.objects.filter(event=event)
-        serializer = ReservationSerializer(reservations, many=True)
-        return Response(serializer.data)
+        reservations = (
+            Reservation.objects.filter(event=event)
+            .select_related("user")
+            .order_by("id")
+        )
+        page = self.paginate_queryset(reservations)
+        serializer = EventReservationSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class EventSeriesViewSet(viewsets.ModelViewSet):
+    """
+    API for recurring events.
+    Creating a series creates its occurrences for the next
+    EVENT_SERIES_HORIZON_DAYS in bulk; later ones are added by the
+    extend_event_series command. Changing the title, description or event
+    type of a series also changes every occurrence that has not started.
+    """
+
+    queryset = EventSeries.objects.order_by("id")
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOrganizerOrReadOnly]
+
+    def get_serializer_class(self):
+        if self.action in ("update", "partial_update"):
+            return EventSeriesUpdateSerializer
+        return EventSeriesSerializer
+
+    def perform_create(self, serializer):
+        # No series without its first occurrences if generating them fails.
+        with transaction.atomic():
+            series = serializer.save(organizer=self.request.user)
+            recurrence.extend(series, recurrence.horizon())
+
+    def perform_update(self, serializer):
+        recurrence.update_upcoming(serializer.save(), serializer.validated_data)
+
+    @action(detail=True, methods=["get"])
+    def occurrences(self, request, pk=None):
+        """Occurrences of the series created so far, by start time."""
+        rows = EventRowSerializer()
+        events = (
+            self.get_object()
+            .occurrences.order_by("start_time", "id")
+            .values(*rows.columns)
+        )
+        page = self.paginate_queryset(events)
+        return self.get_paginated_response(rows.many(page))
@@ -1,7 +1,77 @@
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+
+from eventmanagement.paginators import EstimatedCountPaginator
+from .bulk import cancel_in_bulk
 from .models import Event, Reservation
 
 
+class EventFilter(admin.SimpleListFilter):
+    """
+    Reservations of one event, linked from the event changelist. Unlike a
+    plain ``list_filter = ("event",)`` it does not load every event as a
+    choice.
+    """
+
+    title = "event"
+    parameter_name = "event"
+
+    def lookups(self, request, model_admin):
+        # Without a choice the filter is dropped and its parameter ignored.
+        value = self.value()
+        if value is None:
+            return []
+        title = value.isdigit() and (
+            Event.objects.filter(pk=value).values_list("title", flat=True).first()
+        )
+        return [(value, title or value)]
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if value is None:
+            return queryset
+        if not value.isdigit():
+            raise IncorrectLookupParameters(f"Invalid event id {value!r}.")
+        return queryset.filter(event_id=value)
+
+
 @admin.register(Reservation)
 class ReservationAdmin(admin.ModelAdmin):
-    list_display = ("user", "event")
+    list_display = ("id", "user", "event", "created_at")
+    list_select_related = ("user", "event")
+    list_filter = (
+        EventFilter,
+        ("created_at", admin.DateFieldListFilter),
+        "event__event_type",
+    )
+    sortable_by = ()
+    search_fields = ("user__username",)
+    search_help_text = "Exact username."
+    raw_id_fields = ("user", "event")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ["cancel_reservations"]
+
+    def get_actions(self, request):
+        # Deleting rows directly would not give their seats back.
+        actions = super().get_actions(request)
+        actions.pop("delete_selected", None)
+        return actions
+
+    def get_search_results(self, request, queryset, search_term):
+        # An exact match uses the username's unique index, icontains cannot.
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        return queryset.filter(user__username=search_term), False
+
+    def delete_model(self, request, obj):
+        cancel_in_bulk(Reservation.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        cancel_in_bulk(queryset)
+
+    @admin.action(description="Cancel selected reservations", permissions=["delete"])
+    def cancel_reservations(self, request, queryset):
+        cancelled = cancel_in_bulk(queryset)
+        self.message_user(request, f"Cancelled {cancelled} reservation(s).")
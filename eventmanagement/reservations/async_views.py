@@ -0,0 +1,98 @@
+"""
+Native async reservation endpoint for ASGI deployments (uvicorn/daphne).
+
+The seat is claimed with the same conditional UPDATE as ``perform_create``.
+Django cannot run ``transaction.atomic()`` in async code, so the insert, the
+stats and the outbox message are written together in one synchronous
+transaction, and the seat is given back if it fails. A crash between the
+claim and that transaction can leak a seat, never oversell.
+"""
+
+import json
+import logging
+import math
+
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, transaction
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework.exceptions import Throttled
+
+from authentication.authentication import aauthenticate
+from eventmanagement.ratelimit import check
+from events.inventory import aclaim_seat, arelease_seat
+from .models import Event, Reservation
+from .outbox import RESERVATION_CREATED, enqueue, payload
+from .serializers import ReservationSerializer
+from .stats import record
+
+logger = logging.getLogger(__name__)
+
+
+def error(detail, status):
+    return JsonResponse({"detail": detail}, status=status)
+
+
+@sync_to_async
+def book(user, event):
+    """Insert the reservation with its stats and outbox message."""
+    with transaction.atomic():
+        reservation = Reservation.objects.create(user=user, event=event)
+        record(event.pk, booked=1)
+        enqueue(RESERVATION_CREATED, payload(reservation, event))
+    return reservation
+
+
+# Token authentication only, so there is no session cookie to protect.
+@csrf_exempt
+@require_POST
+async def create_reservation(request):
+    # Same policy as the sync endpoint, checked before authentication. Off the
+    # event loop, since a shared store makes cache round trips.
+    try:
+        await sync_to_async(check, thread_sensitive=False)(
+            "reservation-create", request
+        )
+    except Throttled as e:
+        response = error(e.detail, 429)
+        response["Retry-After"] = str(math.ceil(e.wait))
+        return response
+
+    user = await aauthenticate(request)
+    if user is None:
+        return error("Authentication credentials were not provided.", 401)
+
+    try:
+        event_id = int(json.loads(request.body)["event_id"])
+    except (ValueError, KeyError, TypeError):
+        return error("event_id is required.", 400)
+
+    try:
+        event = await Event.objects.aget(pk=event_id)
+    except Event.DoesNotExist:
+        return error("Event not found.", 400)
+
+    if event.assigned_seating:
+        return error(
+            "Assigned-seating events are booked at /api/reservation/reservations/.", 400
+        )
+    if await Reservation.objects.filter(user=user, event=event).aexists():
+        return error("You have already made a reservation for this event.", 400)
+    if not await aclaim_seat(event):
+        return error("No seats remaining for this event.", 400)
+
+    try:
+        reservation = await book(user, event)
+    except IntegrityError:
+        await arelease_seat(event)
+        return error("You have already made a reservation for this event.", 400)
+    except Exception as e:
+        logger.error(f"Unexpected error creating reservation: {e}")
+        await arelease_seat(event)
+        return error("An unexpected error occurred. Please try again.", 400)
+
+    reservation.event = await Event.objects.prefetch_related("seat_shards").aget(
+        pk=event.pk
+    )
+    return JsonResponse(ReservationSerializer(reservation).data, status=201)
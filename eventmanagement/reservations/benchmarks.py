@@ -0,0 +1,301 @@
+"""
+In-process benchmark scenarios for the booking and browsing paths.
+
+Requests go through the real URL routing, viewsets and serializers via DRF's
+test client, from concurrent threads against the configured database. Data is
+created by ``seed`` with ``bulk_create`` and a fixed random seed, so runs are
+reproducible and comparable over time.
+"""
+
+import random
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, connections
+from django.db.models import Count
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from events.inventory import available_seats
+from events.search import rebuild_index as rebuild_search_index
+from events.models import Event, EventType
+from .loadtest import run_concurrently
+from .models import Reservation
+from .stats import rebuild as rebuild_stats
+
+User = get_user_model()
+
+PREFIX = "bench-"
+SCENARIOS = ["onsale", "browse", "churn"]
+
+
+def seed(users, events, reservations, random_seed=0, batch_size=1000):
+    """
+    Replace previously seeded benchmark data with ``users`` users, ``events``
+    events and up to ``reservations`` reservations.
+    """
+    rng = random.Random(random_seed)
+    User.objects.filter(username__startswith=PREFIX).delete()
+
+    organizer = User.objects.create(username=f"{PREFIX}organizer", password="!")
+    User.objects.bulk_create(
+        (User(username=f"{PREFIX}user{i}", password="!") for i in range(users)),
+        batch_size=batch_size,
+    )
+    user_ids = list(
+        User.objects.filter(username__startswith=f"{PREFIX}user").values_list(
+            "pk", flat=True
+        )
+    )
+
+    now = timezone.now()
+    new_events = []
+    for i in range(events):
+        start = now + timedelta(days=rng.randint(1, 365), hours=rng.randint(0, 23))
+        capacity = rng.randint(50, 500)
+        new_events.append(
+            Event(
+                organizer=organizer,
+                title=f"{PREFIX}event {i}",
+                start_time=start,
+                end_time=start + timedelta(hours=2),
+                show_time=start - timedelta(hours=1),
+                capacity=capacity,
+                seats_remaining=capacity,
+                event_type=rng.choice(EventType.values),
+            )
+        )
+    Event.objects.bulk_create(new_events, batch_size=batch_size)
+    seeded_events = list(Event.objects.filter(organizer=organizer))
+
+    booked = Counter()
+    pairs = set()
+    attempts = 0
+    while len(pairs) < reservations and attempts < reservations * 10:
+        attempts += 1
+        event = rng.choice(seeded_events)
+        if booked[event.pk] >= event.capacity:
+            continue
+        pair = (rng.choice(user_ids), event.pk)
+        if pair not in pairs:
+            pairs.add(pair)
+            booked[event.pk] += 1
+    Reservation.objects.bulk_create(
+        (Reservation(user_id=u, event_id=e) for u, e in sorted(pairs)),
+        batch_size=batch_size,
+    )
+    for event in seeded_events:
+        event.seats_remaining = event.capacity - booked[event.pk]
+    Event.objects.bulk_update(seeded_events, ["seats_remaining"], batch_size=batch_size)
+    rebuild_stats([event.pk for event in seeded_events])
+    rebuild_search_index([event.pk for event in seeded_events])
+
+    return {
+        "users": len(user_ids),
+        "events": len(seeded_events),
+        "reservations": len(pairs),
+    }
+
+
+def client_for(user=None):
+    # DEBUG with empty ALLOWED_HOSTS only accepts localhost.
+    hosts = [h for h in settings.ALLOWED_HOSTS if not h.startswith((".", "*"))]
+    client = APIClient(SERVER_NAME=hosts[0] if hosts else "localhost")
+    if user is not None:
+        client.force_authenticate(user=user)
+    return client
+
+
+def onsale_rush(requests, seats=None):
+    """Many buyers racing for one fresh event with fewer seats than buyers."""
+    buyers = list(User.objects.filter(username__startswith=f"{PREFIX}user")[:requests])
+    organizer = User.objects.get(username=f"{PREFIX}organizer")
+    start = timezone.now() + timedelta(days=30)
+    event = Event.objects.create(
+        organizer=organizer,
+        title=f"{PREFIX}on-sale {start.isoformat()}",
+        start_time=start,
+        end_time=start + timedelta(hours=2),
+        show_time=start - timedelta(hours=1),
+        capacity=seats or max(1, len(buyers) // 2),
+    )
+    url = reverse("reservation-list")
+
+    def book(user):
+        return lambda: client_for(user).post(url, {"event_id": event.pk}).status_code
+
+    return [book(user) for user in buyers], [event.pk]
+
+
+def browse(requests, random_seed=0):
+    """Anonymous list, feed and detail reads over the seeded catalogue."""
+    rng = random.Random(random_seed)
+    event_ids = list(
+        Event.objects.filter(title__startswith=PREFIX).values_list("pk", flat=True)
+    )
+    urls = []
+    for _ in range(requests):
+        kind = rng.random()
+        if kind < 0.5:
+            urls.append(reverse("event-detail", args=[rng.choice(event_ids)]))
+        elif kind < 0.8:
+            urls.append(f"{reverse('event-list')}?page={rng.randint(1, 5)}")
+        else:
+            urls.append(f"{reverse('event-feed')}?upcoming=true&has_seats=true")
+
+    def read(url):
+        return lambda: client_for().get(url).status_code
+
+    return [read(url) for url in urls], []
+
+
+def churn(requests):
+    """Seeded attendees cancelling and immediately rebooking their seat."""
+    reservations = list(
+        Reservation.objects.filter(user__username__startswith=PREFIX).select_related(
+            "user"
+        )[:requests]
+    )
+
+    def cancel_and_rebook(reservation):
+        def task():
+            client = client_for(reservation.user)
+            cancel = client.delete(reverse("reservation-detail", args=[reservation.pk]))
+            rebook = client.post(
+                reverse("reservation-list"), {"event_id": reservation.event_id}
+            )
+            return f"{cancel.status_code}/{rebook.status_code}"
+
+        return task
+
+    event_ids = {r.event_id for r in reservations}
+    return [cancel_and_rebook(r) for r in reservations], list(event_ids)
+
+
+def check_inventory(event_ids):
+    """
+    Confirm that every seat is accounted for: reservations plus holds plus
+    seats remaining must equal capacity, and nothing may go negative.
+    """
+    events = (
+        Event.objects.filter(pk__in=event_ids)
+        .annotate(
+            booked=Count("reservations", distinct=True),
+            held=Count("seat_holds", distinct=True),
+        )
+        .prefetch_related("seat_shards")
+    )
+    violations = []
+    for event in events:
+        remaining = available_seats(event)
+        if remaining < 0 or event.booked + event.held + remaining != event.capacity:
+            violations.append(
+                {
+                    "event_id": event.pk,
+                    "capacity": event.capacity,
+                    "reservations": event.booked,
+                    "holds": event.held,
+                    "seats_remaining": remaining,
+                }
+            )
+    return {"events_checked": len(event_ids), "violations": violations}
+
+
+class LockMonitor:
+    """
+    Counts lock waits during a run. On PostgreSQL a sampler thread polls
+    pg_locks for ungranted locks and the deadlock counter is diffed. Other
+    backends only report lock errors raised by requests (e.g. SQLite's
+    "database is locked").
+    """
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.samples = 0
+        self.waiting_samples = 0
+        self.max_waiting = 0
+        self.deadlocks = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        if connection.vendor == "postgresql":
+            self._deadlocks_before = self._deadlock_count()
+            self._thread = threading.Thread(target=self._sample)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._thread:
+            self._stop.set()
+            self._thread.join()
+            self.deadlocks = self._deadlock_count() - self._deadlocks_before
+
+    def _deadlock_count(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT deadlocks FROM pg_stat_database WHERE datname = current_database()"
+            )
+            return cursor.fetchone()[0]
+
+    def _sample(self):
+        try:
+            while not self._stop.is_set():
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT count(*) FROM pg_locks WHERE NOT granted")
+                    waiting = cursor.fetchone()[0]
+                self.samples += 1
+                self.waiting_samples += bool(waiting)
+                self.max_waiting = max(self.max_waiting, waiting)
+                time.sleep(self.interval)
+        finally:
+            connection.close()
+
+    def as_dict(self, statuses):
+        report = {
+            "lock_errors": sum(
+                count
+                for status, count in statuses.items()
+                if status == "OperationalError"
+            )
+        }
+        if self._thread:
+            report.update(
+                samples=self.samples,
+                samples_with_waiters=self.waiting_samples,
+                max_waiting=self.max_waiting,
+                deadlocks=self.deadlocks,
+            )
+        return report
+
+
+def run_scenario(name, concurrency, requests, seats=None, random_seed=0):
+    """Run one scenario and return its JSON-serialisable report."""
+    if name == "onsale":
+        tasks, event_ids = onsale_rush(requests, seats)
+    elif name == "browse":
+        tasks, event_ids = browse(requests, random_seed)
+    elif name == "churn":
+        tasks, event_ids = churn(requests)
+    else:
+        raise ValueError(f"Unknown scenario {name!r}.")
+
+    started_at = timezone.now()
+    with LockMonitor() as locks:
+        summary = run_concurrently(
+            tasks, concurrency, on_thread_exit=connections.close_all
+        )
+    return {
+        "scenario": name,
+        "started_at": started_at.isoformat(),
+        "database": connection.vendor,
+        "concurrency": concurrency,
+        **summary,
+        "lock_waits": locks.as_dict(summary["statuses"]),
+        "overbooking": check_inventory(event_ids),
+    }
@@ -0,0 +1,152 @@
+from collections import Counter, defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+
+from events import seating
+from events.inventory import claim_seats, release_seats
+from .holds import return_seats
+from .models import Event, Reservation, ReservedSeat, WaitlistEntry
+from .outbox import RESERVATION_CANCELLED, RESERVATION_CREATED, enqueue, payload
+from .stats import record
+
+User = get_user_model()
+
+RESERVED = "reserved"
+FAILED = "failed"
+
+
+def reserve_in_bulk(requester, pairs):
+    """
+    Reserve seats for a list of ``(user_id, event_id)`` pairs in one transaction.
+
+    Validation is set-based (one query each for events, users and existing
+    reservations), seats are claimed with one grouped UPDATE per event and
+    the rows are inserted with a single ``bulk_create``. Returns one result
+    dict per input pair, in input order.
+    """
+    event_ids = {event_id for _, event_id in pairs}
+    user_ids = {user_id for user_id, _ in pairs}
+
+    events = Event.objects.in_bulk(event_ids)
+    known_users = set(User.objects.filter(pk__in=user_ids).values_list("pk", flat=True))
+    existing = set(
+        Reservation.objects.filter(
+            user_id__in=user_ids, event_id__in=event_ids
+        ).values_list("user_id", "event_id")
+    )
+
+    results = [
+        {"user_id": user_id, "event_id": event_id, "status": FAILED}
+        for user_id, event_id in pairs
+    ]
+    pending = defaultdict(list)
+    seen = set()
+    for position, (user_id, event_id) in enumerate(pairs):
+        event = events.get(event_id)
+        if event is None:
+            error = "event_not_found"
+        elif user_id not in known_users:
+            error = "user_not_found"
+        elif user_id != requester.pk and event.organizer_id != requester.pk:
+            error = "not_organizer"
+        elif event.assigned_seating:
+            error = "assigned_seating"
+        elif (user_id, event_id) in existing or (user_id, event_id) in seen:
+            error = "duplicate"
+        else:
+            seen.add((user_id, event_id))
+            pending[event_id].append(position)
+            continue
+        results[position]["error"] = error
+
+    try:
+        with transaction.atomic():
+            to_create = []
+            # Lock counters in a stable order so concurrent batches cannot deadlock.
+            for event_id in sorted(pending):
+                positions = pending[event_id]
+                granted = claim_seats(events[event_id], len(positions))
+                for position in positions[granted:]:
+                    results[position]["error"] = "sold_out"
+                to_create.extend(positions[:granted])
+                record(event_id, booked=granted)
+
+            created = Reservation.objects.bulk_create(
+                Reservation(user_id=pairs[p][0], event_id=pairs[p][1])
+                for p in to_create
+            )
+            enqueue(
+                RESERVATION_CREATED,
+                *(payload(r, events[r.event_id]) for r in created),
+            )
+    except IntegrityError:
+        raise serializers.ValidationError(
+            "A conflicting reservation was made at the same time. Please retry."
+        )
+
+    for position, reservation in zip(to_create, created):
+        results[position]["status"] = RESERVED
+        results[position]["reservation_id"] = reservation.pk
+    return results
+
+
+def cancel_in_bulk(reservations, drop_waitlist=False, batch_size=1000):
+    """
+    Cancel the reservations in ``reservations`` in batches and return how
+    many were cancelled. Each batch is one locked read, one DELETE and one
+    counter UPDATE per event (per section for assigned seating). Freed
+    general admission seats go to waiters first, as on a user's cancellation.
+    With ``drop_waitlist`` the events' waitlists are deleted in the same
+    batch instead and the seats go back on sale, so walk-up buyers never get
+    ahead of queued waiters.
+    """
+    # Reservations made while this runs, e.g. promoted waiters, are left alone.
+    upto = reservations.order_by("-pk").values_list("pk", flat=True).first()
+    cancelled = last = 0
+    while upto is not None:
+        with transaction.atomic():
+            # A concurrent cancellation of a locked row waits, then deletes nothing.
+            batch = list(
+                reservations.select_for_update(of=("self",))
+                .filter(pk__gt=last, pk__lte=upto)
+                .order_by("pk")
+                .values_list("pk", "user_id", "event_id")[:batch_size]
+            )
+            if not batch:
+                break
+            last = batch[-1][0]
+            ids = [pk for pk, _, _ in batch]
+            seats = defaultdict(list)
+            for event_id, *seat in ReservedSeat.objects.filter(
+                reservation_id__in=ids
+            ).values_list("reservation__event_id", "section_id", "row", "seat"):
+                seats[event_id].append(tuple(seat))
+            Reservation.objects.filter(pk__in=ids).delete()
+
+            per_event = Counter(event_id for _, _, event_id in batch)
+            events = Event.objects.in_bulk(per_event)
+            if drop_waitlist:
+                WaitlistEntry.objects.filter(event_id__in=per_event).delete()
+            # Lock counters in a stable order so concurrent batches cannot deadlock.
+            for event_id in sorted(per_event):
+                event, count = events[event_id], per_event[event_id]
+                record(event_id, cancelled=count)
+                if event.assigned_seating:
+                    seating.release(event, seats[event_id])
+                elif drop_waitlist:
+                    release_seats(event, count)
+                else:
+                    return_seats(event, count)
+            enqueue(
+                RESERVATION_CANCELLED,
+                *(
+                    payload(Reservation(pk=pk, user_id=user_id), events[event_id])
+                    for pk, user_id, event_id in batch
+                ),
+            )
+        cancelled += len(batch)
+        if len(batch) < batch_size:
+            break
+    return cancelled
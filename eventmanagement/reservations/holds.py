@@ -0,0 +1,53 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from events.inventory import release_seats
+from .models import Event, SeatHold
+from .waitlist import promote_waiters
+
+
+def hold_expiry():
+    return timezone.now() + timedelta(seconds=settings.RESERVATION_HOLD_SECONDS)
+
+
+def return_seats(event, count):
+    """Give seats freed by holds to waiters first, then to the public counter."""
+    handed = promote_waiters(event, count)
+    if count > handed:
+        release_seats(event, count - handed)
+
+
+def sweep_expired_holds(batch_size=500, now=None):
+    """
+    Release expired holds in batches. Each batch is one indexed range read on
+    expires_at, one DELETE and one counter UPDATE per affected event.
+    Returns the number of holds released.
+    """
+    now = now or timezone.now()
+    released = 0
+    while True:
+        with transaction.atomic():
+            # Locked rows are being confirmed or released right now, leave them.
+            expired = list(
+                SeatHold.objects.select_for_update(
+                    skip_locked=connection.features.has_select_for_update_skip_locked
+                )
+                .filter(expires_at__lte=now)
+                .order_by("expires_at")
+                .values_list("id", "event_id")[:batch_size]
+            )
+            if not expired:
+                break
+            SeatHold.objects.filter(pk__in=[pk for pk, _ in expired]).delete()
+            per_event = Counter(event_id for _, event_id in expired)
+            events = Event.objects.in_bulk(per_event)
+            for event_id, count in per_event.items():
+                return_seats(events[event_id], count)
+        released += len(expired)
+        if len(expired) < batch_size:
+            break
+    return released
@@ -0,0 +1,112 @@
+"""
+Idempotency-Key support for reservation endpoints.
+
+The first request with a key inserts its record in the same transaction as
+the work it does and stores the response before committing. A retry with the
+same key gets that response back after one indexed lookup. A concurrent
+duplicate blocks on the (user, key) unique index until the first request
+commits, then replays its response. If the first request fails, its record
+is rolled back with it and the retry runs normally.
+"""
+
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from .models import IdempotencyRecord
+
+HEADER = "Idempotency-Key"
+
+IDEMPOTENCY_KEY_PARAMETER = OpenApiParameter(
+    HEADER,
+    str,
+    OpenApiParameter.HEADER,
+    description="Unique key per logical request. Retries with the same key replay the first response.",
+)
+
+
+def fingerprint(request):
+    payload = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(
+        f"{request.method} {request.path} {payload}".encode()
+    ).hexdigest()
+
+
+def replay(record, request_fingerprint):
+    if record.fingerprint != request_fingerprint:
+        return Response(
+            {
+                "detail": "This Idempotency-Key was already used for a different request."
+            },
+            status=422,
+        )
+    return Response(
+        record.body, status=record.status_code, headers={"Idempotent-Replayed": "true"}
+    )
+
+
+def idempotent(action):
+    """
+    Decorate a viewset action so requests carrying an Idempotency-Key header
+    run once per user and key. Only successful responses are stored.
+    """
+
+    @wraps(action)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None:
+            return action(self, request, *args, **kwargs)
+        if not key or len(key) > 255:
+            raise serializers.ValidationError(
+                {HEADER: "Must be between 1 and 255 characters."}
+            )
+
+        request_fingerprint = fingerprint(request)
+        records = IdempotencyRecord.objects.filter(user=request.user, key=key)
+        now = timezone.now()
+        record = records.first()
+        if record is not None:
+            if record.expires_at > now:
+                return replay(record, request_fingerprint)
+            record.delete()
+
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    record = IdempotencyRecord.objects.create(
+                        user=request.user,
+                        key=key,
+                        fingerprint=request_fingerprint,
+                        expires_at=now
+                        + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+                    )
+            except IntegrityError:
+                # A concurrent request with this key committed first.
+                return replay(records.get(), request_fingerprint)
+
+            response = action(self, request, *args, **kwargs)
+            if 200 <= response.status_code < 300:
+                record.status_code = response.status_code
+                record.body = response.data
+                record.save(update_fields=["status_code", "body"])
+            else:
+                record.delete()
+        return response
+
+    return wrapper
+
+
+def purge_expired_keys(now=None):
+    """Delete expired records; returns how many were removed."""
+    deleted, _ = IdempotencyRecord.objects.filter(
+        expires_at__lte=now or timezone.now()
+    ).delete()
+    return deleted
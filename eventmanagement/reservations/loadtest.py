@@ -0,0 +1,71 @@
+"""Helpers for driving concurrent load and summarising latencies."""
+
+import math
+import queue
+import threading
+import time
+from collections import Counter
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies, statuses, elapsed):
+    """Throughput and latency percentiles (ms) for one run."""
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "latency_ms": {
+            name: round(percentile(latencies, pct) * 1000, 2) if latencies else None
+            for name, pct in [("p50", 50), ("p95", 95), ("p99", 99)]
+        },
+        "statuses": dict(Counter(statuses)),
+    }
+
+
+def run_concurrently(tasks, concurrency, on_thread_exit=None):
+    """
+    Run callables returning a status code on ``concurrency`` threads and
+    summarise the run. Exceptions are counted under their class name.
+    ``on_thread_exit`` runs in each worker thread once it is done, e.g. to
+    close that thread's database connection.
+    """
+    pending = queue.SimpleQueue()
+    for task in tasks:
+        pending.put(task)
+    outcomes = []
+    lock = threading.Lock()
+
+    def worker():
+        try:
+            while True:
+                try:
+                    task = pending.get_nowait()
+                except queue.Empty:
+                    return
+                started = time.perf_counter()
+                try:
+                    status = task()
+                except Exception as e:
+                    status = type(e).__name__
+                with lock:
+                    outcomes.append((time.perf_counter() - started, status))
+        finally:
+            if on_thread_exit:
+                on_thread_exit()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    return summarize([o[0] for o in outcomes], [o[1] for o in outcomes], elapsed)
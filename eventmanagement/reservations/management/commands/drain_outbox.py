@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reservations.outbox import drain, retry_failed
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver outbox messages in batches. Run it from cron, or with --loop "
+        "as a background worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument(
+            "--loop", action="store_true", help="Keep draining until interrupted."
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait when no messages are due.",
+        )
+        parser.add_argument(
+            "--retry-failed",
+            action="store_true",
+            help="Retry messages that ran out of attempts first.",
+        )
+
+    def handle(self, *args, **options):
+        if options["retry_failed"]:
+            self.stdout.write(f"Retrying {retry_failed()} failed message(s).")
+        while True:
+            delivered = failed = 0
+            # Keep going while batches come back non-empty.
+            while True:
+                ok, errors = drain(batch_size=options["batch_size"])
+                delivered += ok
+                failed += errors
+                if not ok and not errors:
+                    break
+            if delivered or failed or not options["loop"]:
+                self.stdout.write(f"Delivered {delivered} message(s), {failed} failed.")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
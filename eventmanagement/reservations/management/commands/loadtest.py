@@ -0,0 +1,116 @@
+import json
+import urllib.error
+import urllib.request
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.authtoken.models import Token
+
+from events.models import Event
+from reservations.loadtest import run_concurrently
+
+User = get_user_model()
+
+SYNC_PATHS = {
+    "detail": "/api/event/events/{event_id}/",
+    "reserve": "/api/reservation/reservations/",
+}
+ASYNC_PATHS = {
+    "detail": "/api/event/async/events/{event_id}/",
+    "reserve": "/api/reservation/async/reservations/",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test running deployments over HTTP and report requests per second "
+        "and latency percentiles, e.g. a WSGI server against the ASGI one. "
+        "Must use the same database as the servers under test."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target",
+            action="append",
+            default=[],
+            metavar="NAME=URL",
+            help="Deployment served through the DRF (sync) endpoints.",
+        )
+        parser.add_argument(
+            "--async-target",
+            action="append",
+            default=[],
+            metavar="NAME=URL",
+            help="Deployment served through the native async endpoints.",
+        )
+        parser.add_argument(
+            "--scenario", choices=["detail", "reserve"], default="reserve"
+        )
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--timeout", type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        targets = [(t, SYNC_PATHS) for t in options["target"]]
+        targets += [(t, ASYNC_PATHS) for t in options["async_target"]]
+        if not targets:
+            raise CommandError("Give at least one --target or --async-target.")
+
+        report = {}
+        for spec, paths in targets:
+            name, sep, base_url = spec.partition("=")
+            if not sep:
+                raise CommandError(f"Expected NAME=URL, got {spec!r}.")
+            tokens = self.create_buyers(name, options["requests"])
+            event = self.create_event(name, options["requests"])
+            url = base_url.rstrip("/") + paths[options["scenario"]].format(
+                event_id=event.pk
+            )
+            tasks = [
+                self.make_request(url, token, options, event.pk) for token in tokens
+            ]
+            report[name] = run_concurrently(tasks, options["concurrency"])
+            report[name]["url"] = url
+
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def create_buyers(self, name, count):
+        # One buyer per request, since a user can only reserve an event once.
+        prefix = f"loadtest-{name}-"
+        User.objects.filter(username__startswith=prefix).delete()
+        users = User.objects.bulk_create(
+            User(username=f"{prefix}{i}") for i in range(count)
+        )
+        tokens = Token.objects.bulk_create(
+            Token(key=Token.generate_key(), user=user) for user in users
+        )
+        return [token.key for token in tokens]
+
+    def create_event(self, name, seats):
+        organizer, _ = User.objects.get_or_create(username="loadtest-organizer")
+        return Event.objects.create(
+            organizer=organizer,
+            title=f"Load test ({name})",
+            start_time="2030-01-01T10:00:00Z",
+            end_time="2030-01-01T12:00:00Z",
+            show_time="2030-01-01T09:00:00Z",
+            capacity=seats,
+        )
+
+    def make_request(self, url, token, options, event_id):
+        headers = {"Authorization": f"Token {token}"}
+        data = None
+        if options["scenario"] == "reserve":
+            headers["Content-Type"] = "application/json"
+            data = json.dumps({"event_id": event_id}).encode()
+
+        def task():
+            request = urllib.request.Request(url, data=data, headers=headers)
+            try:
+                with urllib.request.urlopen(request, timeout=options["timeout"]) as r:
+                    r.read()
+                    return r.status
+            except urllib.error.HTTPError as e:
+                return e.code
+
+        return task
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from reservations.stats import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-day reservation stats from the reservations table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--event", type=int, action="append", help="Only rebuild these event ids."
+        )
+
+    def handle(self, *args, **options):
+        rebuild(options["event"])
+        self.stdout.write("Reservation stats rebuilt.")
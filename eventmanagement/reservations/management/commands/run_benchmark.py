@@ -0,0 +1,42 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from reservations.benchmarks import SCENARIOS, run_scenario
+
+
+class Command(BaseCommand):
+    help = (
+        "Run concurrent booking/browsing scenarios against the seeded data "
+        "(see seed_data) and report throughput, latency percentiles, lock waits "
+        "and overbooking checks as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scenario", choices=SCENARIOS + ["all"], default="all")
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument(
+            "--seats",
+            type=int,
+            help="Seats for the on-sale event (default half the buyers).",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--output", help="Append each report as one JSON line to this file."
+        )
+
+    def handle(self, *args, **options):
+        names = SCENARIOS if options["scenario"] == "all" else [options["scenario"]]
+        for name in names:
+            report = run_scenario(
+                name,
+                concurrency=options["concurrency"],
+                requests=options["requests"],
+                seats=options["seats"],
+                random_seed=options["seed"],
+            )
+            self.stdout.write(json.dumps(report, indent=2))
+            if options["output"]:
+                with open(options["output"], "a") as f:
+                    f.write(json.dumps(report) + "\n")
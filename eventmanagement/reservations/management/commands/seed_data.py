@@ -0,0 +1,27 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from reservations.benchmarks import seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Replace benchmark data (users named 'bench-*' and their events) with a "
+        "reproducible set of users, events and reservations."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--events", type=int, default=100)
+        parser.add_argument("--reservations", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        counts = seed(
+            users=options["users"],
+            events=options["events"],
+            reservations=options["reservations"],
+            random_seed=options["seed"],
+        )
+        self.stdout.write(json.dumps(counts))
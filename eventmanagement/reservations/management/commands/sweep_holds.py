@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reservations.holds import sweep_expired_holds
+
+
+class Command(BaseCommand):
+    help = (
+        "Release expired seat holds in batches. Run it from cron, or with "
+        "--loop as a background sweeper."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--loop", action="store_true", help="Keep sweeping until interrupted."
+        )
+        parser.add_argument(
+            "--interval", type=float, default=5.0, help="Seconds between sweeps."
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            released = sweep_expired_holds(batch_size=options["batch_size"])
+            if released or not options["loop"]:
+                self.stdout.write(f"Released {released} expired hold(s).")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.6 on 2026-10-18 20:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0003_event_feed_indexes"),
+        ("reservations", "0003_seat_hold"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReservationDailyStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("shard", models.PositiveSmallIntegerField(default=0)),
+                ("booked", models.PositiveIntegerField(default=0)),
+                ("cancelled", models.PositiveIntegerField(default=0)),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_stats",
+                        to="events.event",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("event", "day", "shard")},
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.6 on 2026-10-18 20:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0006_event_sections"),
+        ("reservations", "0005_idempotency_record"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReservedSeat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("row", models.PositiveSmallIntegerField()),
+                ("seat", models.PositiveSmallIntegerField()),
+                (
+                    "reservation",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="seats",
+                        to="reservations.reservation",
+                    ),
+                ),
+                (
+                    "section",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reserved_seats",
+                        to="events.eventsection",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("section", "row", "seat")},
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-18 21:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0007_eventseatshard_updated_at"),
+        ("reservations", "0007_outbox_message"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="reservation",
+            index=models.Index(fields=["created_at"], name="reservation_created_idx"),
+        ),
+    ]
@@ -1,7 +1,8 @@
 # models.py
 from django.db import models
 from django.conf import settings
-from events.models import Event
+from django.utils import timezone
+from events.models import Event, EventSection
 
 User = settings.AUTH_USER_MODEL
 
@@ -17,4 +18,134 @@ class Reservation(models.Model):
 
     class Meta:
         unique_together = ("user", "event")
-        indexes = [models.Index(fields=["event"])]
+        indexes = [
+            models.Index(fields=["event"]),
+            # Date range filter of the admin changelist.
+            models.Index(fields=["created_at"], name="reservation_created_idx"),
+        ]
+
+
+class ReservedSeat(models.Model):
+    """
+    A seat of an assigned-seating reservation. The section bitmap is what
+    bookings check; the unique constraint is a second guard against selling
+    a seat twice.
+    """
+
+    reservation = models.ForeignKey(
+        Reservation, on_delete=models.CASCADE, related_name="seats"
+    )
+    section = models.ForeignKey(
+        EventSection, on_delete=models.CASCADE, related_name="reserved_seats"
+    )
+    row = models.PositiveSmallIntegerField()
+    seat = models.PositiveSmallIntegerField()
+
+    class Meta:
+        unique_together = ("section", "row", "seat")
+
+
+class WaitlistEntry(models.Model):
+    """
+    A user queued for a sold-out event. The queue is FIFO by id, so a user's
+    position is one indexed count over (event, id).
+    """
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="waitlist_entries"
+    )
+    event = models.ForeignKey(
+        Event, on_delete=models.CASCADE, related_name="waitlist_entries"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("user", "event")
+        indexes = [models.Index(fields=["event", "id"])]
+
+
+class SeatHold(models.Model):
+    """
+    A seat taken out of the event's inventory for a limited time while the
+    user checks out. It is either confirmed into a Reservation or released,
+    explicitly or by the expiry sweeper.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="seat_holds")
+    event = models.ForeignKey(
+        Event, on_delete=models.CASCADE, related_name="seat_holds"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("user", "event")
+        indexes = [models.Index(fields=["expires_at"])]
+
+
+class ReservationDailyStats(models.Model):
+    """
+    Bookings and cancellations per event and day, kept up to date in the
+    transactions that create and delete reservations. Each (event, day) is
+    split over a few shard rows so concurrent bookings of one event do not
+    all wait on the same row; readers sum the shards.
+    """
+
+    event = models.ForeignKey(
+        Event, on_delete=models.CASCADE, related_name="daily_stats"
+    )
+    day = models.DateField()
+    shard = models.PositiveSmallIntegerField(default=0)
+    booked = models.PositiveIntegerField(default=0)
+    cancelled = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("event", "day", "shard")
+
+
+class IdempotencyRecord(models.Model):
+    """
+    The response to a request sent with an Idempotency-Key, replayed when
+    the same user retries with that key until ``expires_at``.
+    ``status_code`` is empty while the first request is still running.
+    """
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="idempotency_records"
+    )
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    body = models.JSONField(null=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("user", "key")
+        indexes = [models.Index(fields=["expires_at"])]
+
+
+class OutboxMessage(models.Model):
+    """
+    A side effect of a reservation change for one handler, written in the
+    same transaction as the change and delivered later by ``drain_outbox``.
+    Delivered messages are deleted; ``failed_at`` marks messages that ran
+    out of attempts.
+    """
+
+    topic = models.CharField(max_length=100)
+    handler = models.CharField(max_length=255)
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    failed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["available_at"],
+                condition=models.Q(failed_at__isnull=True),
+                name="outbox_pending_idx",
+            )
+        ]
@@ -0,0 +1,159 @@
+"""
+Transactional outbox for side effects of reservation changes.
+
+Booking and cancellation paths call ``enqueue`` inside the transaction that
+writes the reservation, so a message exists exactly when the change
+committed and the request only pays for one INSERT. ``python manage.py
+drain_outbox`` delivers the messages afterwards. ``OUTBOX["HANDLERS"]`` maps
+each topic to handler paths, and every handler gets its own row, so a
+failing webhook is retried without sending the other handlers' work again.
+
+Delivery is at least once. A worker leases a batch by pushing its
+``available_at`` forward, calls the handlers outside any transaction and
+deletes the delivered rows. If it dies before that, the lease runs out and
+another worker delivers them again, so handlers must be idempotent; the
+message id is a stable key for that. Failures are retried with exponential
+backoff until ``MAX_ATTEMPTS``, then kept with ``failed_at`` set.
+"""
+
+import json
+import logging
+import random
+import urllib.request
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+RESERVATION_CREATED = "reservation.created"
+RESERVATION_CANCELLED = "reservation.cancelled"
+
+
+def payload(reservation, event):
+    return {
+        "reservation_id": reservation.pk,
+        "user_id": reservation.user_id,
+        "event_id": event.pk,
+        "organizer_id": event.organizer_id,
+    }
+
+
+def messages(topic, payloads):
+    handlers = settings.OUTBOX["HANDLERS"].get(topic, ())
+    return [
+        OutboxMessage(topic=topic, handler=handler, payload=data)
+        for data in payloads
+        for handler in handlers
+    ]
+
+
+def enqueue(topic, *payloads):
+    """Queue ``payloads`` for every handler of ``topic`` in one INSERT."""
+    OutboxMessage.objects.bulk_create(messages(topic, payloads))
+
+
+_handlers = {}
+
+
+def get_handler(path):
+    if path not in _handlers:
+        _handlers[path] = import_string(path)
+    return _handlers[path]
+
+
+def backoff(attempts):
+    """Delay before the next attempt: doubling per failure, with jitter."""
+    config = settings.OUTBOX
+    delay = min(config["MAX_BACKOFF"], config["BACKOFF"] * 2 ** (attempts - 1))
+    return timedelta(seconds=delay * random.uniform(0.5, 1))
+
+
+def claim(batch_size, now):
+    """Lease up to ``batch_size`` due messages to this worker."""
+    with transaction.atomic():
+        # Rows locked by another worker's claim are skipped, not waited for.
+        batch = list(
+            OutboxMessage.objects.select_for_update(
+                skip_locked=connection.features.has_select_for_update_skip_locked
+            )
+            .filter(failed_at__isnull=True, available_at__lte=now)
+            .order_by("available_at", "id")[:batch_size]
+        )
+        lease = now + timedelta(seconds=settings.OUTBOX["LEASE"])
+        OutboxMessage.objects.filter(pk__in=[m.pk for m in batch]).update(
+            available_at=lease
+        )
+    return batch
+
+
+def drain(batch_size=None, now=None):
+    """
+    Deliver one batch of due messages. Returns the number delivered and the
+    number that failed; fewer than ``batch_size`` in total means none are due.
+    """
+    config = settings.OUTBOX
+    now = now or timezone.now()
+    delivered, failed = [], []
+    for message in claim(batch_size or config["BATCH_SIZE"], now):
+        try:
+            get_handler(message.handler)(message)
+        except Exception as e:
+            message.attempts += 1
+            message.last_error = f"{type(e).__name__}: {e}"
+            if message.attempts >= config["MAX_ATTEMPTS"]:
+                message.failed_at = now
+                logger.error(
+                    f"Outbox message {message.pk} to {message.handler} failed "
+                    f"for good after {message.attempts} attempts: {e}"
+                )
+            else:
+                message.available_at = now + backoff(message.attempts)
+                logger.warning(
+                    f"Outbox message {message.pk} to {message.handler} failed: {e}"
+                )
+            failed.append(message)
+        else:
+            delivered.append(message.pk)
+
+    OutboxMessage.objects.filter(pk__in=delivered).delete()
+    OutboxMessage.objects.bulk_update(
+        failed, ["attempts", "last_error", "available_at", "failed_at"]
+    )
+    return len(delivered), len(failed)
+
+
+def retry_failed():
+    """Give messages that ran out of attempts a fresh set. Returns how many."""
+    return OutboxMessage.objects.filter(failed_at__isnull=False).update(
+        failed_at=None, attempts=0, available_at=timezone.now()
+    )
+
+
+def log_message(message):
+    logger.info(f"{message.topic} {json.dumps(message.payload)}")
+
+
+def post_webhook(message):
+    """POST the message as JSON to ``OUTBOX["WEBHOOK_URL"]``."""
+    body = json.dumps(
+        {"id": message.pk, "topic": message.topic, "payload": message.payload}
+    ).encode()
+    request = urllib.request.Request(
+        settings.OUTBOX["WEBHOOK_URL"],
+        data=body,
+        headers={
+            "Content-Type": "application/json",
+            # Lets the receiver drop repeated deliveries of one message.
+            "Idempotency-Key": f"outbox-{message.pk}",
+        },
+        method="POST",
+    )
+    # Non-2xx responses raise HTTPError, so the message is retried.
+    with urllib.request.urlopen(request, timeout=settings.OUTBOX["TIMEOUT"]):
+        pass
@@ -1,6 +1,17 @@
-from .models import Event, Reservation
+from collections import defaultdict
+from django.contrib.auth import get_user_model
+from .models import Event, Reservation, ReservedSeat, SeatHold, WaitlistEntry
 from rest_framework import serializers
-from events.serializers import EventSerializer
+from eventmanagement.rows import RowSerializer
+from events.inventory import available_seats
+from events.seating import MAX_SEATS_PER_RESERVATION
+from events.serializers import EventRowSerializer, EventSerializer
+
+
+class SeatSerializer(serializers.Serializer):
+    section = serializers.IntegerField()
+    row = serializers.IntegerField(min_value=1)
+    seat = serializers.IntegerField(min_value=1)
 
 
 class ReservationSerializer(serializers.ModelSerializer):
@@ -9,10 +20,32 @@ class ReservationSerializer(serializers.ModelSerializer):
     event_id = serializers.PrimaryKeyRelatedField(
         queryset=Event.objects.all(), write_only=True
     )  # for post ony
+    # Assigned-seating events take specific seats or the best available block.
+    seats = SeatSerializer(
+        many=True,
+        write_only=True,
+        required=False,
+        allow_empty=False,
+        max_length=MAX_SEATS_PER_RESERVATION,
+    )
+    best_available = serializers.IntegerField(
+        write_only=True,
+        required=False,
+        min_value=1,
+        max_value=MAX_SEATS_PER_RESERVATION,
+    )
 
     class Meta:
         model = Reservation
-        fields = ["id", "event", "event_id", "user", "created_at"]
+        fields = [
+            "id",
+            "event",
+            "event_id",
+            "user",
+            "seats",
+            "best_available",
+            "created_at",
+        ]
         read_only_fields = ["id", "user", "event", "created_at"]
 
     def validate(self, attrs):
@@ -23,11 +56,218 @@ class ReservationSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 "You have already made a reservation for this event."
             )
-        if event.seats_remaining <= 0:
+        if available_seats(event) <= 0:
             raise serializers.ValidationError("No seats remaining for this event.")
+        choices = ("seats" in attrs) + ("best_available" in attrs)
+        if event.assigned_seating and choices != 1:
+            raise serializers.ValidationError(
+                "This event has assigned seating. Provide either 'seats' or 'best_available'."
+            )
+        if not event.assigned_seating and choices:
+            raise serializers.ValidationError("This event has no assigned seating.")
         return attrs
 
     def create(self, validated_data):
         return Reservation.objects.create(
             user=self.context["request"].user, event=validated_data["event_id"]
         )
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if instance.event.assigned_seating:
+            data["seats"] = [
+                {"section": seat.section_id, "row": seat.row, "seat": seat.seat}
+                for seat in instance.seats.all()
+            ]
+        return data
+
+
+class ReservationRowSerializer(RowSerializer):
+    """
+    ``ReservationSerializer`` output from ``.values()`` rows. Seats of
+    assigned-seating reservations on the page are read in one extra query.
+    """
+
+    serializer_class = ReservationSerializer
+    # str(user) is the username for Django's user models.
+    sources = {"user": f"user__{get_user_model().USERNAME_FIELD}"}
+    nested = {"event": EventRowSerializer}
+
+    def prepare(self, rows):
+        seated = {
+            row[f"{self.prefix}id"]
+            for row in rows
+            if row[f"{self.prefix}event__assigned_seating"] and "seats" not in row
+        }
+        if seated:
+            seats = defaultdict(list)
+            for reservation_id, section, row, seat in (
+                ReservedSeat.objects.filter(reservation_id__in=seated)
+                .order_by("id")
+                .values_list("reservation_id", "section_id", "row", "seat")
+            ):
+                seats[reservation_id].append(
+                    {"section": section, "row": row, "seat": seat}
+                )
+            for row in rows:
+                if row[f"{self.prefix}id"] in seated:
+                    row["seats"] = seats[row[f"{self.prefix}id"]]
+        super().prepare(rows)
+
+    def represent(self, row, plan):
+        data = super().represent(row, plan)
+        if row[f"{self.prefix}event__assigned_seating"]:
+            data["seats"] = row["seats"]
+        return data
+
+    def instance_row(self, instance, row=None):
+        row = super().instance_row(instance, row)
+        if instance.event.assigned_seating:
+            row["seats"] = [
+                {"section": seat.section_id, "row": seat.row, "seat": seat.seat}
+                for seat in instance.seats.all()
+            ]
+        return row
+
+
+class EventReservationSerializer(serializers.ModelSerializer):
+    """
+    Reservation row for an event's attendee listing. The event itself is
+    already known to the caller, so it is not embedded again on every row.
+    """
+
+    user = serializers.StringRelatedField(read_only=True)
+
+    class Meta:
+        model = Reservation
+        fields = ["id", "user", "created_at"]
+
+
+class BulkReservationItemSerializer(serializers.Serializer):
+    user_id = serializers.IntegerField()
+    event_id = serializers.IntegerField()
+
+
+class BulkReservationSerializer(serializers.Serializer):
+    """
+    Either ``event_ids`` to book the requesting user onto several events, or
+    ``items`` of user/event pairs for organizers importing attendees.
+    """
+
+    MAX_ITEMS = 500
+
+    event_ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, max_length=MAX_ITEMS
+    )
+    items = BulkReservationItemSerializer(
+        many=True, required=False, max_length=MAX_ITEMS
+    )
+
+    def validate(self, attrs):
+        if ("event_ids" in attrs) == ("items" in attrs):
+            raise serializers.ValidationError(
+                "Provide exactly one of 'event_ids' or 'items'."
+            )
+        if not attrs.get("event_ids", attrs.get("items")):
+            raise serializers.ValidationError("Nothing to reserve.")
+        return attrs
+
+    def get_pairs(self):
+        user = self.context["request"].user
+        if "event_ids" in self.validated_data:
+            return [
+                (user.pk, event_id) for event_id in self.validated_data["event_ids"]
+            ]
+        return [(i["user_id"], i["event_id"]) for i in self.validated_data["items"]]
+
+
+class WaitlistEntrySerializer(serializers.ModelSerializer):
+    event_id = serializers.PrimaryKeyRelatedField(
+        queryset=Event.objects.all(), source="event"
+    )
+    position = serializers.SerializerMethodField()
+
+    class Meta:
+        model = WaitlistEntry
+        fields = ["id", "event_id", "position", "created_at"]
+        read_only_fields = ["id", "created_at"]
+
+    def get_position(self, obj) -> int:
+        if hasattr(obj, "position"):
+            return obj.position
+        return (
+            WaitlistEntry.objects.filter(event_id=obj.event_id, id__lt=obj.id).count()
+            + 1
+        )
+
+    def validate(self, attrs):
+        user = self.context["request"].user
+        event = attrs["event"]
+
+        if event.assigned_seating:
+            raise serializers.ValidationError(
+                "Assigned-seating events have no waitlist."
+            )
+        if Reservation.objects.filter(user=user, event=event).exists():
+            raise serializers.ValidationError(
+                "You have already made a reservation for this event."
+            )
+        if WaitlistEntry.objects.filter(user=user, event=event).exists():
+            raise serializers.ValidationError(
+                "You are already on the waitlist for this event."
+            )
+        if SeatHold.objects.filter(user=user, event=event).exists():
+            raise serializers.ValidationError(
+                "You are already holding a seat for this event."
+            )
+        if available_seats(event) > 0:
+            raise serializers.ValidationError(
+                "Seats are still available for this event."
+            )
+        return attrs
+
+
+class SeatHoldSerializer(serializers.ModelSerializer):
+    event_id = serializers.PrimaryKeyRelatedField(
+        queryset=Event.objects.all(), source="event"
+    )
+
+    class Meta:
+        model = SeatHold
+        fields = ["id", "event_id", "created_at", "expires_at"]
+        read_only_fields = ["id", "created_at", "expires_at"]
+
+    def validate(self, attrs):
+        user = self.context["request"].user
+        event = attrs["event"]
+
+        if event.assigned_seating:
+            raise serializers.ValidationError(
+                "Assigned-seating events cannot be held; reserve seats instead."
+            )
+        if Reservation.objects.filter(user=user, event=event).exists():
+            raise serializers.ValidationError(
+                "You have already made a reservation for this event."
+            )
+        if SeatHold.objects.filter(user=user, event=event).exists():
+            raise serializers.ValidationError(
+                "You are already holding a seat for this event."
+            )
+        if available_seats(event) <= 0:
+            raise serializers.ValidationError("No seats remaining for this event.")
+        return attrs
+
+
+class OrganizerStatsParams(serializers.Serializer):
+    """Query parameters of the organizer stats endpoint."""
+
+    bucket = serializers.ChoiceField(
+        choices=["day", "week", "month"], default="day", required=False
+    )
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if attrs.get("start") and attrs.get("end") and attrs["start"] > attrs["end"]:
+            raise serializers.ValidationError("start must not be after end.")
+        return attrs
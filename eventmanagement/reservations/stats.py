@@ -0,0 +1,136 @@
+"""
+Maintained booking aggregates for organizer dashboards.
+
+``record`` adds to the per-day counters in the same transaction as the
+reservation change, so ``organizer_stats`` reads one row per event and day
+instead of counting reservations.
+"""
+
+import random
+from itertools import chain
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from events.models import Event
+from .models import Reservation, ReservationDailyStats, ReservedSeat
+
+STATS_SHARDS = 4
+BUCKETS = {"day": None, "week": TruncWeek, "month": TruncMonth}
+
+
+def record(event_id, booked=0, cancelled=0):
+    """Add bookings/cancellations for the event to today's counters."""
+    if not booked and not cancelled:
+        return
+    row = dict(
+        event_id=event_id,
+        day=timezone.localdate(),
+        shard=random.randrange(STATS_SHARDS),
+    )
+    changes = dict(booked=F("booked") + booked, cancelled=F("cancelled") + cancelled)
+    if ReservationDailyStats.objects.filter(**row).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            ReservationDailyStats.objects.create(
+                **row, booked=booked, cancelled=cancelled
+            )
+    except IntegrityError:
+        # A concurrent request created the row first.
+        ReservationDailyStats.objects.filter(**row).update(**changes)
+
+
+def rebuild(event_ids=None):
+    """
+    Recompute the counters from the reservations table, for all events or
+    only ``event_ids``. Cancelled reservations are gone, so afterwards each
+    day's ``booked`` is the number of live reservations made that day and
+    ``cancelled`` is zero; the net sold figures are unchanged. Bookings of
+    assigned-seating events count one per seat, as they are recorded.
+    """
+    stats = ReservationDailyStats.objects.all()
+    reservations = Reservation.objects.filter(event__assigned_seating=False)
+    seats = ReservedSeat.objects.all()
+    if event_ids is not None:
+        stats = stats.filter(event_id__in=event_ids)
+        reservations = reservations.filter(event_id__in=event_ids)
+        seats = seats.filter(reservation__event_id__in=event_ids)
+    rows = (
+        reservations.annotate(day=TruncDate("created_at"))
+        .values("event_id", "day")
+        .annotate(booked=Count("id"))
+        .order_by()
+    )
+    seat_rows = (
+        seats.annotate(
+            event_id=F("reservation__event_id"),
+            day=TruncDate("reservation__created_at"),
+        )
+        .values("event_id", "day")
+        .annotate(booked=Count("id"))
+        .order_by()
+    )
+    with transaction.atomic():
+        stats.delete()
+        ReservationDailyStats.objects.bulk_create(
+            (
+                ReservationDailyStats(**row)
+                for row in chain(rows.iterator(), seat_rows.iterator())
+            ),
+            batch_size=1000,
+        )
+
+
+def organizer_stats(organizer, bucket="day", start=None, end=None):
+    """
+    Totals, per-event figures and time buckets for the organizer's events.
+    Per-event and total figures are all-time; ``start``/``end`` (inclusive
+    dates) only limit the buckets.
+    """
+    events = list(
+        Event.objects.filter(organizer=organizer)
+        .annotate(
+            booked=Coalesce(Sum("daily_stats__booked"), 0),
+            cancelled=Coalesce(Sum("daily_stats__cancelled"), 0),
+        )
+        .order_by("start_time", "id")
+        .values("id", "title", "start_time", "capacity", "booked", "cancelled")
+    )
+    for event in events:
+        event["sold"] = event["booked"] - event["cancelled"]
+        event["fill_rate"] = fill_rate(event["sold"], event["capacity"])
+
+    window = Q(event__organizer=organizer)
+    if start:
+        window &= Q(day__gte=start)
+    if end:
+        window &= Q(day__lte=end)
+    trunc = BUCKETS[bucket]
+    buckets = (
+        ReservationDailyStats.objects.filter(window)
+        .annotate(period=trunc("day") if trunc else F("day"))
+        .values("period")
+        .annotate(booked=Sum("booked"), cancelled=Sum("cancelled"))
+        .order_by("period")
+    )
+
+    totals = {
+        key: sum(event[key] for event in events)
+        for key in ["capacity", "booked", "cancelled", "sold"]
+    }
+    return {
+        "totals": {
+            "events": len(events),
+            **totals,
+            "fill_rate": fill_rate(totals["sold"], totals["capacity"]),
+        },
+        "buckets": list(buckets),
+        "events": events,
+    }
+
+
+def fill_rate(sold, capacity):
+    return round(sold / capacity, 4) if capacity else None
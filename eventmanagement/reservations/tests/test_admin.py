@@ -0,0 +1,227 @@
+from django.contrib.admin.sites import AdminSite
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from events import seating
+from events.admin import EventAdmin
+from events.inventory import available_seats, shard_inventory
+from events.models import Event
+from eventmanagement.paginators import EstimatedCountPaginator
+from reservations.admin import ReservationAdmin
+from reservations.bulk import cancel_in_bulk
+from reservations.models import (
+    OutboxMessage,
+    Reservation,
+    ReservationDailyStats,
+    ReservedSeat,
+    WaitlistEntry,
+)
+
+User = get_user_model()
+
+
+class AdminTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username="admin", password="pass")
+        self.client.force_login(self.admin)
+        self.users = [
+            User.objects.create_user(username=f"user{i}", password="pass")
+            for i in range(5)
+        ]
+
+    def make_event(self, title="Admin Event", capacity=10, **kwargs):
+        return Event.objects.create(
+            organizer=self.admin,
+            title=title,
+            start_time="2030-01-01T10:00:00Z",
+            end_time="2030-01-01T12:00:00Z",
+            show_time="2030-01-01T09:00:00Z",
+            capacity=capacity,
+            **kwargs,
+        )
+
+    def book(self, event, users):
+        Reservation.objects.bulk_create(
+            Reservation(user=user, event=event) for user in users
+        )
+        Event.objects.filter(pk=event.pk).update(
+            seats_remaining=event.capacity - len(users)
+        )
+
+    def changelist(self, model, **params):
+        url = reverse(
+            f"admin:{model._meta.app_label}_{model._meta.model_name}_changelist"
+        )
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        for i in range(3):
+            self.book(self.make_event(title=f"Event {i}"), self.users[:2])
+        shard_inventory(Event.objects.first(), 2)
+        # Session, user, the bounded count and one joined page read.
+        with self.assertNumQueries(4):
+            self.changelist(Event)
+        with self.assertNumQueries(4):
+            self.changelist(Reservation)
+
+        for i in range(3, 20):
+            self.book(self.make_event(title=f"Event {i}"), self.users)
+        with self.assertNumQueries(4):
+            self.changelist(Event)
+        with self.assertNumQueries(4):
+            response = self.changelist(Reservation)
+        self.assertEqual(response.context["cl"].result_count, 91)
+
+    def test_event_filters_and_indexed_search(self):
+        self.make_event(title="Jazz night", event_type="concert")
+        self.make_event(title="Chess club")
+        response = self.changelist(Event, q="NIGHT jazz")
+        self.assertEqual(
+            [e.title for e in response.context["cl"].result_list], ["Jazz night"]
+        )
+        response = self.changelist(Event, event_type__exact="concert")
+        self.assertEqual(response.context["cl"].result_count, 1)
+        response = self.changelist(
+            Event,
+            start_time__gte="2029-12-01T00:00:00Z",
+            start_time__lt="2030-02-01T00:00:00Z",
+        )
+        self.assertEqual(response.context["cl"].result_count, 2)
+
+    def test_reservation_filters_and_search(self):
+        first, second = self.make_event(), self.make_event(event_type="concert")
+        self.book(first, self.users[:3])
+        self.book(second, self.users[3:])
+
+        response = self.changelist(Reservation, event=first.pk)
+        self.assertEqual(response.context["cl"].result_count, 3)
+        self.assertContains(response, first.title)
+        response = self.changelist(Reservation, event__event_type__exact="concert")
+        self.assertEqual(response.context["cl"].result_count, 2)
+        response = self.changelist(Reservation, q="user4")
+        self.assertEqual(response.context["cl"].result_count, 1)
+        # Exact usernames only, a prefix matches nothing.
+        response = self.changelist(Reservation, q="user")
+        self.assertEqual(response.context["cl"].result_count, 0)
+
+        response = self.changelist(Reservation, event=second.pk + 1)
+        self.assertEqual(response.context["cl"].result_count, 0)
+        url = reverse("admin:reservations_reservation_changelist")
+        response = self.client.get(url, {"event": "abc"})
+        self.assertRedirects(response, f"{url}?e=1")
+
+    def test_cancel_all_reservations_restores_seats(self):
+        event, sharded, other = self.make_event(), self.make_event(), self.make_event()
+        for e in (event, sharded, other):
+            self.book(e, self.users[:4])
+        shard_inventory(sharded, 3)
+        WaitlistEntry.objects.create(user=self.users[4], event=event)
+
+        response = self.client.post(
+            reverse("admin:events_event_changelist"),
+            {
+                "action": "cancel_all_reservations",
+                "_selected_action": [event.pk, sharded.pk],
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Reservation.objects.filter(event=other).count(), 4)
+        self.assertFalse(Reservation.objects.exclude(event=other).exists())
+        event.refresh_from_db()
+        self.assertEqual(event.seats_remaining, 10)
+        self.assertEqual(available_seats(Event.objects.get(pk=sharded.pk)), 10)
+        # Waiters are neither moved into a cancelled event nor left queued
+        # behind seats that are back on sale.
+        self.assertFalse(WaitlistEntry.objects.filter(event=event).exists())
+        self.assertFalse(Reservation.objects.filter(user=self.users[4]).exists())
+        self.assertEqual(
+            OutboxMessage.objects.filter(topic="reservation.cancelled").count(), 8
+        )
+        self.assertEqual(
+            sum(ReservationDailyStats.objects.values_list("cancelled", flat=True)), 8
+        )
+
+    def test_cancel_action_requires_delete_permission(self):
+        staff = User.objects.create_user(
+            username="staff", password="pass", is_staff=True
+        )
+        staff.user_permissions.add(
+            *staff.user_permissions.model.objects.filter(codename="change_event")
+        )
+        request = self.client.get("/").wsgi_request
+        request.user = staff
+        model_admin = EventAdmin(Event, AdminSite())
+        self.assertNotIn("cancel_all_reservations", model_admin.get_actions(request))
+        request.user = self.admin
+        self.assertIn("cancel_all_reservations", model_admin.get_actions(request))
+
+    def test_cancel_selected_promotes_waiters(self):
+        event = self.make_event(capacity=3)
+        self.book(event, self.users[:3])
+        WaitlistEntry.objects.create(user=self.users[3], event=event)
+        selected = Reservation.objects.filter(user__in=self.users[:2])
+
+        response = self.client.post(
+            reverse("admin:reservations_reservation_changelist"),
+            {
+                "action": "cancel_reservations",
+                "_selected_action": list(selected.values_list("pk", flat=True)),
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            set(Reservation.objects.values_list("user__username", flat=True)),
+            {"user2", "user3"},
+        )
+        event.refresh_from_db()
+        self.assertEqual(event.seats_remaining, 1)
+
+        request = self.client.get("/").wsgi_request
+        request.user = self.admin
+        actions = ReservationAdmin(Reservation, AdminSite()).get_actions(request)
+        self.assertNotIn("delete_selected", actions)
+
+    def test_delete_from_change_page_releases_seat(self):
+        event = self.make_event()
+        self.book(event, self.users[:1])
+        reservation = Reservation.objects.get()
+        url = reverse("admin:reservations_reservation_delete", args=[reservation.pk])
+        response = self.client.post(url, {"post": "yes"})
+        self.assertEqual(response.status_code, 302)
+        event.refresh_from_db()
+        self.assertEqual(event.seats_remaining, 10)
+
+    def test_cancel_in_bulk_batches_and_frees_assigned_seats(self):
+        event = self.make_event(capacity=0)
+        section = seating.add_section(event, "Floor", rows=1, seats_per_row=4)
+        event.refresh_from_db()
+        for n, user in enumerate(self.users[:3], start=1):
+            reservation = Reservation.objects.create(user=user, event=event)
+            seating.claim(event, [(section.pk, 1, n)])
+            ReservedSeat.objects.create(
+                reservation=reservation, section=section, row=1, seat=n
+            )
+        plain = self.make_event()
+        self.book(plain, self.users)
+
+        cancelled = cancel_in_bulk(Reservation.objects.all(), batch_size=2)
+        self.assertEqual(cancelled, 8)
+        self.assertFalse(Reservation.objects.exists())
+        self.assertFalse(ReservedSeat.objects.exists())
+        event.refresh_from_db()
+        self.assertEqual(event.seats_remaining, 4)
+        self.assertEqual(seating.seat_map(event)[0]["seat_map"], ["0000"])
+        plain.refresh_from_db()
+        self.assertEqual(plain.seats_remaining, 10)
+
+    def test_paginator_stops_counting_at_limit(self):
+        for i in range(5):
+            self.make_event(title=f"Event {i}")
+        paginator = EstimatedCountPaginator(Event.objects.order_by("pk"), 2)
+        paginator.limit = 3
+        self.assertEqual(paginator.count, 3)
+        self.assertEqual(paginator.num_pages, 2)
+        paginator = EstimatedCountPaginator(Event.objects.order_by("pk"), 2)
+        self.assertEqual(paginator.count, 5)
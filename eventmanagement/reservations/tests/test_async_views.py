@@ -0,0 +1,115 @@
+import json
+from unittest import mock
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework.authtoken.models import Token
+from events.inventory import shard_inventory
+from events.models import Event
+from reservations.loadtest import percentile
+from reservations.models import OutboxMessage, Reservation, ReservationDailyStats
+
+User = get_user_model()
+
+
+class AsyncReservationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.token = Token.objects.create(user=self.user)
+        self.event = Event.objects.create(
+            organizer=self.user,
+            title="Async Event",
+            start_time="2030-01-01T10:00:00Z",
+            end_time="2030-01-01T12:00:00Z",
+            show_time="2030-01-01T09:00:00Z",
+            capacity=1,
+        )
+        self.url = reverse("async-reservation-create")
+
+    async def reserve(self, token=None):
+        return await self.async_client.post(
+            self.url,
+            json.dumps({"event_id": self.event.id}),
+            content_type="application/json",
+            headers={"Authorization": f"Token {token or self.token.key}"},
+        )
+
+    async def test_reserve_decrements_seats(self):
+        response = await self.reserve()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["event"]["seats_remaining"], 0)
+        self.assertEqual(response.json()["user"], "testuser")
+        await self.event.arefresh_from_db()
+        self.assertEqual(self.event.seats_remaining, 0)
+
+    async def test_duplicate_and_sold_out_are_rejected(self):
+        await self.reserve()
+        response = await self.reserve()
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("already made a reservation", response.json()["detail"])
+
+        other = await User.objects.acreate(username="other")
+        token = await Token.objects.acreate(user=other)
+        response = await self.reserve(token.key)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()["detail"], "No seats remaining for this event."
+        )
+        self.assertEqual(await Reservation.objects.acount(), 1)
+
+    async def assert_nothing_booked(self):
+        await self.event.arefresh_from_db()
+        self.assertEqual(self.event.seats_remaining, 1)
+        self.assertEqual(await Reservation.objects.acount(), 0)
+        self.assertEqual(await OutboxMessage.objects.acount(), 0)
+
+    async def test_stats_failure_rolls_back_and_releases_seat(self):
+        with mock.patch(
+            "reservations.async_views.record", side_effect=RuntimeError("stats down")
+        ):
+            response = await self.reserve()
+        self.assertEqual(response.status_code, 400)
+        await self.assert_nothing_booked()
+
+    async def test_outbox_failure_rolls_back_and_releases_seat(self):
+        with mock.patch(
+            "reservations.async_views.enqueue", side_effect=RuntimeError("db error")
+        ):
+            response = await self.reserve()
+        self.assertEqual(response.status_code, 400)
+        await self.assert_nothing_booked()
+        self.assertFalse(await ReservationDailyStats.objects.aexists())
+
+    async def test_requires_token(self):
+        response = await self.reserve(token="bogus")
+        self.assertEqual(response.status_code, 401)
+
+    def test_sharded_event(self):
+        shard_inventory(self.event, 2)
+        response = self.client.post(
+            self.url,
+            {"event_id": self.event.id},
+            content_type="application/json",
+            headers={"Authorization": f"Token {self.token.key}"},
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["event"]["seats_remaining"], 0)
+
+    async def test_event_detail(self):
+        url = reverse("async-event-detail", args=[self.event.id])
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["title"], "Async Event")
+
+        response = await self.async_client.get(
+            reverse("async-event-detail", args=[999])
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class LoadTestHelperTests(TestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertIsNone(percentile([], 99))
@@ -0,0 +1,56 @@
+import json
+from io import StringIO
+from django.core.management import call_command
+from django.test import TransactionTestCase
+from django.contrib.auth import get_user_model
+from events.models import Event
+from reservations.models import Reservation
+
+User = get_user_model()
+
+
+class BenchmarkCommandTests(TransactionTestCase):
+    def test_seed_is_reproducible(self):
+        call_command(
+            "seed_data", users=30, events=5, reservations=40, stdout=StringIO()
+        )
+        first = sorted(
+            Reservation.objects.values_list("user__username", "event__title")
+        )
+        call_command(
+            "seed_data", users=30, events=5, reservations=40, stdout=StringIO()
+        )
+        second = sorted(
+            Reservation.objects.values_list("user__username", "event__title")
+        )
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(first), 40)
+        self.assertEqual(Event.objects.count(), 5)
+        for event in Event.objects.all():
+            self.assertEqual(
+                event.seats_remaining, event.capacity - event.reservations.count()
+            )
+
+    def test_scenarios_report_json(self):
+        call_command(
+            "seed_data", users=20, events=3, reservations=10, stdout=StringIO()
+        )
+        for scenario in ["onsale", "browse", "churn"]:
+            out = StringIO()
+            call_command(
+                "run_benchmark",
+                scenario=scenario,
+                concurrency=1,
+                requests=6,
+                stdout=out,
+            )
+            report = json.loads(out.getvalue())
+            self.assertEqual(report["scenario"], scenario)
+            self.assertEqual(report["requests"], 6)
+            self.assertIn("p99", report["latency_ms"])
+            self.assertEqual(report["overbooking"]["violations"], [])
+
+        self.assertEqual(
+            Reservation.objects.filter(event__title__contains="on-sale").count(), 3
+        )
@@ -0,0 +1,101 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from events.inventory import available_seats, shard_inventory
+from events.models import Event
+from reservations.models import Reservation
+
+User = get_user_model()
+
+
+class BulkReservationTests(APITestCase):
+    def setUp(self):
+        self.organizer = User.objects.create_user(username="organizer", password="pass")
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.event = self.create_event("Big Event", seats=3)
+        self.other_event = self.create_event("Other Event", seats=1)
+        self.url = reverse("reservation-bulk")
+
+    def create_event(self, title, seats):
+        return Event.objects.create(
+            organizer=self.organizer,
+            title=title,
+            start_time="2030-01-01T10:00:00Z",
+            end_time="2030-01-01T12:00:00Z",
+            show_time="2030-01-01T09:00:00Z",
+            capacity=seats,
+        )
+
+    def test_reserve_many_events_for_self(self):
+        Reservation.objects.create(user=self.user, event=self.other_event)
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            self.url,
+            {"event_ids": [self.event.id, self.other_event.id, 999]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual(results[0]["status"], "reserved")
+        self.assertTrue(
+            Reservation.objects.filter(pk=results[0]["reservation_id"]).exists()
+        )
+        self.assertEqual(results[1]["error"], "duplicate")
+        self.assertEqual(results[2]["error"], "event_not_found")
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_remaining, 2)
+
+    def test_organizer_import_reports_sold_out_items(self):
+        attendees = [
+            User.objects.create_user(username=f"attendee{i}", password="pass")
+            for i in range(5)
+        ]
+        items = [{"user_id": u.id, "event_id": self.event.id} for u in attendees]
+        items.append(items[0])
+        self.client.force_authenticate(user=self.organizer)
+
+        with self.assertNumQueries(13):
+            response = self.client.post(self.url, {"items": items}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        statuses = [r.get("error", r["status"]) for r in response.data["results"]]
+        self.assertEqual(
+            statuses,
+            ["reserved", "reserved", "reserved", "sold_out", "sold_out", "duplicate"],
+        )
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_remaining, 0)
+        self.assertEqual(Reservation.objects.filter(event=self.event).count(), 3)
+
+    def test_only_organizer_can_import_other_users(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            self.url,
+            {"items": [{"user_id": self.organizer.id, "event_id": self.event.id}]},
+            format="json",
+        )
+        self.assertEqual(response.data["results"][0]["error"], "not_organizer")
+        self.assertFalse(Reservation.objects.exists())
+
+    def test_sharded_event_is_claimed_across_shards(self):
+        event = shard_inventory(self.event, 2)
+        attendees = [
+            User.objects.create_user(username=f"attendee{i}", password="pass")
+            for i in range(4)
+        ]
+        self.client.force_authenticate(user=self.organizer)
+        response = self.client.post(
+            self.url,
+            {"items": [{"user_id": u.id, "event_id": event.id} for u in attendees]},
+            format="json",
+        )
+        statuses = [r["status"] for r in response.data["results"]]
+        self.assertEqual(statuses.count("reserved"), 3)
+        event.refresh_from_db()
+        self.assertEqual(available_seats(event), 0)
+
+    def test_requires_exactly_one_input_list(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.url, {}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
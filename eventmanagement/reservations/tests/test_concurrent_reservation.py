@@ -1,9 +1,17 @@
+import os
 import threading
+import time
+from unittest import skipUnless
 from rest_framework.test import APIClient
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from django.db import connection
+from events import seating
+from events.inventory import available_seats, shard_inventory
 from events.models import Event
-from reservations.models import Reservation
+from reservations.holds import sweep_expired_holds
+from reservations.models import Reservation, ReservedSeat, SeatHold
+from django.utils import timezone
 from django.test import TransactionTestCase
 
 User = get_user_model()
@@ -45,3 +53,224 @@ class ConcurrencyThreadTest(TransactionTestCase):
         self.assertIn(201, results.values())
         self.assertIn(400, results.values())
         self.assertEqual(Reservation.objects.count(), 1)
+
+
+class HoldConcurrencyThreadTest(TransactionTestCase):
+    """
+    Same last-seat race as above, with one buyer going through a hold and
+    the expiry sweeper running at the same time.
+    """
+
+    setUp = ConcurrencyThreadTest.setUp
+    reserve = ConcurrencyThreadTest.reserve
+
+    def hold_and_confirm(self, user, results, idx):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        resp = client.post(reverse("hold-list"), {"event_id": self.event.id})
+        if resp.status_code == 201:
+            url = reverse("hold-confirm", args=[resp.data["id"]])
+            resp = client.post(url)
+        results[idx] = resp.status_code
+
+    def test_threaded_hold_and_reservation(self):
+        results = {}
+        threads = [
+            threading.Thread(
+                target=self.hold_and_confirm, args=(self.user1, results, 1)
+            ),
+            threading.Thread(target=self.reserve, args=(self.user2, results, 2)),
+            threading.Thread(target=sweep_expired_holds),
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertIn(201, results.values())
+        self.assertIn(400, results.values())
+        self.assertEqual(Reservation.objects.count(), 1)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_expired_hold_is_resold_once(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user1)
+        client.post(reverse("hold-list"), {"event_id": self.event.id})
+        SeatHold.objects.update(expires_at=timezone.now())
+
+        results = {}
+        threads = [
+            threading.Thread(target=self.reserve, args=(self.user2, results, 2)),
+            threading.Thread(target=sweep_expired_holds),
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.event.refresh_from_db()
+        booked = Reservation.objects.count()
+        self.assertLessEqual(booked, 1, "Overbooking occurred!")
+        self.assertEqual(booked + self.event.seats_remaining, 1)
+
+
+class IdempotentRetryThreadTest(TransactionTestCase):
+    """A request and its retry with the same Idempotency-Key racing each other."""
+
+    setUp = ConcurrencyThreadTest.setUp
+
+    def reserve_with_key(self, results, idx):
+        client = APIClient()
+        client.force_authenticate(user=self.user1)
+        resp = client.post(
+            self.url,
+            {"event_id": self.event.id},
+            headers={"Idempotency-Key": "retry"},
+        )
+        results[idx] = resp.status_code
+
+    def test_threaded_retries(self):
+        results = {}
+        threads = [
+            threading.Thread(target=self.reserve_with_key, args=(results, i))
+            for i in range(2)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(list(results.values()), [201, 201])
+        self.assertEqual(Reservation.objects.count(), 1)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_remaining, 0)
+
+
+class SeatConcurrencyThreadTest(TransactionTestCase):
+    """Buyers racing for the same assigned seat, and for best-available blocks."""
+
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(username=f"user{i}", password="pass")
+            for i in range(4)
+        ]
+        self.event = Event.objects.create(
+            title="Seated Event",
+            organizer=self.users[0],
+            start_time="2030-01-01T10:00:00Z",
+            end_time="2030-01-01T12:00:00Z",
+            show_time="2030-01-01T09:00:00Z",
+            capacity=8,
+        )
+        self.section = seating.add_section(self.event, "Front", 1, 8)
+        self.url = reverse("reservation-list")
+
+    def reserve(self, user, payload, results, idx):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        resp = client.post(
+            self.url, {"event_id": self.event.id, **payload}, format="json"
+        )
+        results[idx] = resp.status_code
+
+    def run_buyers(self, payload):
+        results = {}
+        threads = [
+            threading.Thread(target=self.reserve, args=(user, payload, results, i))
+            for i, user in enumerate(self.users)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return sorted(results.values())
+
+    def test_same_seat(self):
+        seat = {"section": self.section.pk, "row": 1, "seat": 4}
+        self.assertEqual(self.run_buyers({"seats": [seat]}), [201, 400, 400, 400])
+        self.assertEqual(ReservedSeat.objects.count(), 1)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_remaining, 7)
+
+    def test_best_available_blocks_do_not_overlap(self):
+        results = self.run_buyers({"best_available": 2})
+        # Centred blocks leave single seats behind, so not everyone may fit.
+        self.assertGreaterEqual(results.count(201), 3)
+        seats = list(ReservedSeat.objects.values_list("seat", flat=True))
+        self.assertEqual(len(seats), 2 * results.count(201))
+        self.assertEqual(len(set(seats)), len(seats))
+        self.section.refresh_from_db()
+        self.assertEqual(
+            [n for n, bit in enumerate(seating.layout(self.section), 1) if bit == "1"],
+            sorted(seats),
+        )
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_remaining, 8 - len(seats))
+
+
+@skipUnless(os.environ.get("RUN_BENCHMARKS"), "set RUN_BENCHMARKS=1 to run")
+class ShardedInventoryContentionBenchmark(TransactionTestCase):
+    """
+    Compares booking throughput for one hot event with and without sharded
+    seat counters. Only meaningful on PostgreSQL, where writers to different
+    shard rows do not block each other.
+    """
+
+    buyers = int(os.environ.get("BENCHMARK_BUYERS", 50))
+    shards = int(os.environ.get("BENCHMARK_SHARDS", 8))
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(username="organizer", password="pass")
+        User.objects.bulk_create(
+            User(username=f"buyer{i}") for i in range(self.buyers * 2)
+        )
+        self.url = reverse("reservation-list")
+
+    def rush(self, buyers, shards):
+        # Fewer seats than buyers, so the sold-out path is exercised too.
+        seats = len(buyers) * 3 // 4
+        event = Event.objects.create(
+            title=f"Rush with {shards} shards",
+            organizer=self.organizer,
+            start_time="2030-01-01T10:00:00Z",
+            end_time="2030-01-01T12:00:00Z",
+            show_time="2030-01-01T09:00:00Z",
+            capacity=seats,
+        )
+        if shards:
+            event = shard_inventory(event, shards)
+
+        barrier = threading.Barrier(len(buyers))
+        statuses = []
+
+        def reserve(user):
+            client = APIClient()
+            client.force_authenticate(user=user)
+            barrier.wait()
+            try:
+                resp = client.post(self.url, {"event_id": event.id}, format="json")
+                statuses.append(resp.status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=reserve, args=(u,)) for u in buyers]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+
+        event.refresh_from_db()
+        booked = Reservation.objects.filter(event=event).count()
+        self.assertLessEqual(booked, seats, "Overbooking occurred!")
+        self.assertEqual(booked + available_seats(event), seats)
+        self.assertEqual(statuses.count(201), booked)
+        return len(buyers) / elapsed
+
+    def test_sharded_vs_single_row_throughput(self):
+        users = list(User.objects.filter(username__startswith="buyer"))
+        single_row = self.rush(users[: self.buyers], shards=0)
+        sharded = self.rush(users[self.buyers :], shards=self.shards)
+        print(
+            f"\n[{connection.vendor}] {self.buyers} buyers: "
+            f"single row {single_row:.1f} req/s, "
+            f"{self.shards} shards {sharded:.1f} req/s"
+        )
@@ -0,0 +1,154 @@
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from events.inventory import available_seats, shard_inventory
+from events.models import Event
+from reservations.holds import sweep_expired_holds
+from reservations.models import Reservation, SeatHold, WaitlistEntry
+
+User = get_user_model()
+
+
+class SeatHoldTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.event = Event.objects.create(
+            organizer=self.user,
+            title="Checkout Event",
+            start_time="2030-01-01T10:00:00Z",
+            end_time="2030-01-01T12:00:00Z",
+            show_time="2030-01-01T09:00:00Z",
+            capacity=2,
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def hold(self, event=None):
+        event = event or self.event
+        return self.client.post(reverse("hold-list"), {"event_id": event.id})
+
+    def expire_all(self):
+        SeatHold.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+    def test_hold_takes_seat_and_confirm_reserves(self):
+        response = self.hold()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_remaining, 1)
+
+        url = reverse("hold-confirm", args=[response.data["id"]])
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["event"]["seats_remaining"], 1)
+        self.assertTrue(Reservation.objects.filter(user=self.user).exists())
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_release_returns_seat(self):
+        response = self.hold()
+        self.assertEqual(self.hold().status_code, status.HTTP_400_BAD_REQUEST)
+
+        url = reverse("hold-detail", args=[response.data["id"]])
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_remaining, 2)
+
+    def test_expired_hold_cannot_be_confirmed(self):
+        response = self.hold()
+        self.expire_all()
+        url = reverse("hold-confirm", args=[response.data["id"]])
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("expired", str(response.data))
+        self.assertFalse(Reservation.objects.exists())
+
+    def test_sweeper_releases_expired_holds_in_batches(self):
+        sharded = Event.objects.create(
+            organizer=self.user,
+            title="Sharded",
+            start_time="2030-01-01T10:00:00Z",
+            end_time="2030-01-01T12:00:00Z",
+            show_time="2030-01-01T09:00:00Z",
+            capacity=5,
+        )
+        sharded = shard_inventory(sharded, 2)
+        for i in range(5):
+            user = User.objects.create_user(username=f"buyer{i}", password="pass")
+            self.client.force_authenticate(user=user)
+            self.hold(sharded)
+            if i < 2:
+                self.hold()
+        self.client.force_authenticate(user=self.user)
+        self.expire_all()
+        live = self.hold(sharded)
+        self.assertEqual(live.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertEqual(sweep_expired_holds(batch_size=3), 7)
+        self.event.refresh_from_db()
+        sharded.refresh_from_db()
+        self.assertEqual(self.event.seats_remaining, 2)
+        self.assertEqual(available_seats(sharded), 5)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_sweeper_hands_expired_seats_to_waiters(self):
+        self.event.seats_remaining = 1
+        self.event.save()
+        self.hold()
+        waiter = User.objects.create_user(username="waiter", password="pass")
+        WaitlistEntry.objects.create(user=waiter, event=self.event)
+        self.expire_all()
+
+        out = StringIO()
+        call_command("sweep_holds", stdout=out)
+        self.assertIn("Released 1 expired hold(s).", out.getvalue())
+        self.assertTrue(Reservation.objects.filter(user=waiter).exists())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_remaining, 0)
+
+    def test_holder_cannot_join_waitlist(self):
+        self.hold()
+        other = User.objects.create_user(username="other", password="pass")
+        self.client.force_authenticate(user=other)
+        self.hold()
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            reverse("waitlist-list"), {"event_id": self.event.id}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("holding a seat", str(response.data))
+
+    def test_promotion_skips_waiters_holding_a_seat(self):
+        booked = User.objects.create_user(username="booked", password="pass")
+        reservation = Reservation.objects.create(user=booked, event=self.event)
+        self.hold()
+        # Queued before taking the hold.
+        WaitlistEntry.objects.create(user=self.user, event=self.event)
+        Event.objects.filter(pk=self.event.pk).update(seats_remaining=0)
+
+        self.client.force_authenticate(user=booked)
+        url = reverse("reservation-detail", args=[reservation.id])
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertFalse(WaitlistEntry.objects.exists())
+        self.assertFalse(Reservation.objects.filter(user=self.user).exists())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_remaining, 1)
+
+        self.client.force_authenticate(user=self.user)
+        hold = SeatHold.objects.get(user=self.user)
+        url = reverse("hold-confirm", args=[hold.id])
+        self.assertEqual(self.client.post(url).status_code, 201)
+
+    def test_confirm_leaves_the_waitlist(self):
+        response = self.hold()
+        WaitlistEntry.objects.create(user=self.user, event=self.event)
+        url = reverse("hold-confirm", args=[response.data["id"]])
+        self.assertEqual(self.client.post(url).status_code, 201)
+        self.assertFalse(WaitlistEntry.objects.filter(user=self.user).exists())
+
+    def test_unexpired_holds_are_kept(self):
+        self.hold()
+        self.assertEqual(sweep_expired_holds(), 0)
+        self.assertEqual(SeatHold.objects.count(), 1)
@@ -0,0 +1,104 @@
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from events.models import Event
+from reservations.models import IdempotencyRecord, Reservation
+
+User = get_user_model()
+
+
+class IdempotencyKeyTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="buyer", password="pass")
+        self.event = Event.objects.create(
+            organizer=self.user,
+            title="Retry Event",
+            start_time="2030-01-01T10:00:00Z",
+            end_time="2030-01-01T12:00:00Z",
+            show_time="2030-01-01T09:00:00Z",
+            capacity=2,
+        )
+        self.url = reverse("reservation-list")
+        self.client.force_authenticate(user=self.user)
+
+    def reserve(self, key, event=None):
+        return self.client.post(
+            self.url,
+            {"event_id": (event or self.event).id},
+            headers={"Idempotency-Key": key},
+        )
+
+    def test_retry_replays_created_reservation(self):
+        first = self.reserve("key-1")
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+
+        with self.assertNumQueries(1):
+            retry = self.reserve("key-1")
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_remaining, 1)
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_key_reused_for_different_request(self):
+        self.reserve("key-1")
+        other = Event.objects.create(
+            organizer=self.user,
+            title="Other",
+            start_time="2030-01-01T10:00:00Z",
+            end_time="2030-01-01T12:00:00Z",
+            show_time="2030-01-01T09:00:00Z",
+            capacity=2,
+        )
+        response = self.reserve("key-1", event=other)
+        self.assertEqual(response.status_code, 422)
+
+    def test_keys_are_per_user(self):
+        self.reserve("shared")
+        other = User.objects.create_user(username="other", password="pass")
+        self.client.force_authenticate(user=other)
+        response = self.reserve("shared")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("Idempotent-Replayed", response)
+        self.assertEqual(Reservation.objects.count(), 2)
+
+    def test_failed_request_is_not_stored(self):
+        self.event.seats_remaining = 0
+        self.event.save()
+        self.assertEqual(self.reserve("key-1").status_code, 400)
+        self.assertFalse(IdempotencyRecord.objects.exists())
+
+        self.event.seats_remaining = 1
+        self.event.save()
+        self.assertEqual(self.reserve("key-1").status_code, 201)
+
+    def test_cancellation_retry_does_not_release_twice(self):
+        reservation = Reservation.objects.create(user=self.user, event=self.event)
+        self.event.seats_remaining = 1
+        self.event.save()
+        url = reverse("reservation-detail", args=[reservation.id])
+
+        for _ in range(2):
+            response = self.client.delete(url, headers={"Idempotency-Key": "cancel"})
+            self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_remaining, 2)
+
+    def test_expired_key_runs_again_and_is_purged(self):
+        self.reserve("key-1")
+        IdempotencyRecord.objects.update(expires_at=timezone.now() - timedelta(1))
+        response = self.reserve("key-1")
+        self.assertEqual(response.status_code, 400)  # Already reserved.
+
+        call_command("purge_idempotency_keys", stdout=StringIO())
+        self.assertFalse(IdempotencyRecord.objects.exists())
+
+    def test_invalid_key(self):
+        response = self.reserve("x" * 256)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
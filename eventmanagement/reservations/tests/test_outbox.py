@@ -0,0 +1,160 @@
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from events.models import Event
+from reservations.models import OutboxMessage, Reservation, WaitlistEntry
+from reservations.outbox import drain, retry_failed
+
+User = get_user_model()
+
+DELIVERED = []
+
+
+def deliver(message):
+    DELIVERED.append((message.topic, message.payload))
+
+
+def fail(message):
+    raise ConnectionError("receiver is down")
+
+
+def outbox_settings(*handlers, **overrides):
+    handlers = [f"reservations.tests.test_outbox.{h}" for h in handlers]
+    config = {
+        "HANDLERS": {
+            "reservation.created": handlers,
+            "reservation.cancelled": handlers,
+        },
+        "BATCH_SIZE": 100,
+        "MAX_ATTEMPTS": 3,
+        "BACKOFF": 5,
+        "MAX_BACKOFF": 60,
+        "LEASE": 300,
+        "WEBHOOK_URL": None,
+        "TIMEOUT": 1,
+    }
+    config.update(overrides)
+    return override_settings(OUTBOX=config)
+
+
+@outbox_settings("deliver")
+class OutboxTests(APITestCase):
+    def setUp(self):
+        DELIVERED.clear()
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.event = Event.objects.create(
+            organizer=self.user,
+            title="Outbox Event",
+            start_time="2030-01-01T10:00:00Z",
+            end_time="2030-01-01T12:00:00Z",
+            show_time="2030-01-01T09:00:00Z",
+            capacity=1,
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def reserve(self):
+        return self.client.post(
+            reverse("reservation-list"), {"event_id": self.event.id}
+        )
+
+    def test_booking_and_cancellation_are_queued_not_delivered(self):
+        response = self.reserve()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        url = reverse("reservation-detail", args=[response.data["id"]])
+        self.assertEqual(self.client.delete(url).status_code, 204)
+
+        self.assertEqual(DELIVERED, [])
+        messages = OutboxMessage.objects.order_by("id")
+        self.assertEqual(
+            [m.topic for m in messages],
+            ["reservation.created", "reservation.cancelled"],
+        )
+        self.assertEqual(
+            messages[0].payload,
+            {
+                "reservation_id": response.data["id"],
+                "user_id": self.user.id,
+                "event_id": self.event.id,
+                "organizer_id": self.user.id,
+            },
+        )
+
+    def test_failed_booking_queues_nothing(self):
+        self.reserve()
+        other = User.objects.create_user(username="other", password="pass")
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.reserve().status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(OutboxMessage.objects.count(), 1)
+
+    def test_waitlist_promotion_is_queued(self):
+        response = self.reserve()
+        waiter = User.objects.create_user(username="waiter", password="pass")
+        WaitlistEntry.objects.create(user=waiter, event=self.event)
+        url = reverse("reservation-detail", args=[response.data["id"]])
+        self.client.delete(url)
+
+        promoted = Reservation.objects.get(user=waiter)
+        topics = OutboxMessage.objects.order_by("id").values_list("topic", "payload")
+        self.assertEqual(topics[2][0], "reservation.created")
+        self.assertEqual(topics[2][1]["reservation_id"], promoted.pk)
+
+    def test_drain_delivers_and_deletes(self):
+        self.reserve()
+        self.assertEqual(drain(), (1, 0))
+        self.assertEqual(DELIVERED[0][0], "reservation.created")
+        self.assertFalse(OutboxMessage.objects.exists())
+        self.assertEqual(drain(), (0, 0))
+
+    def test_each_handler_is_retried_on_its_own(self):
+        with outbox_settings("deliver", "fail"):
+            self.reserve()
+            now = timezone.now()
+            self.assertEqual(drain(now=now), (1, 1))
+            self.assertEqual(len(DELIVERED), 1)
+
+            message = OutboxMessage.objects.get()
+            self.assertEqual(message.handler, "reservations.tests.test_outbox.fail")
+            self.assertEqual(message.attempts, 1)
+            self.assertIn("receiver is down", message.last_error)
+            self.assertGreaterEqual(message.available_at, now + timedelta(seconds=2.5))
+            # Not due again until the backoff has passed.
+            self.assertEqual(drain(now=now + timedelta(seconds=1)), (0, 0))
+            self.assertEqual(len(DELIVERED), 1)
+
+    def test_gives_up_after_max_attempts(self):
+        with outbox_settings("fail"):
+            self.reserve()
+            now = timezone.now()
+            for attempt in range(3):
+                self.assertEqual(drain(now=now), (0, 1))
+                now += timedelta(minutes=2)
+            message = OutboxMessage.objects.get()
+            self.assertIsNotNone(message.failed_at)
+            self.assertEqual(drain(now=now + timedelta(days=1)), (0, 0))
+
+            self.assertEqual(retry_failed(), 1)
+            self.assertEqual(drain(), (0, 1))
+            message.refresh_from_db()
+            self.assertEqual(message.attempts, 1)
+            self.assertIsNone(message.failed_at)
+
+    def test_leased_messages_are_redelivered_after_lease(self):
+        self.reserve()
+        now = timezone.now()
+        # Simulate a worker that claimed the batch and died.
+        OutboxMessage.objects.update(available_at=now + timedelta(seconds=300))
+        self.assertEqual(drain(now=now), (0, 0))
+        self.assertEqual(drain(now=now + timedelta(seconds=301)), (1, 0))
+
+    def test_drain_command(self):
+        self.reserve()
+        out = StringIO()
+        call_command("drain_outbox", stdout=out)
+        self.assertIn("Delivered 1 message(s), 0 failed.", out.getvalue())
+        self.assertEqual(len(DELIVERED), 1)
@@ -0,0 +1,101 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from events.inventory import shard_inventory
+from events.models import Event
+from reservations.models import Reservation, WaitlistEntry
+
+User = get_user_model()
+
+
+class ListQueryCountTests(APITestCase):
+    """
+    Every list endpoint must run a constant number of queries, no matter how
+    many rows are on the page.
+    """
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(username="organizer", password="pass")
+        self.user = User.objects.create_user(username="user", password="pass")
+        self.hot_event = self.create_event("Hot Event")
+        shard_inventory(self.hot_event, 2)
+
+    def create_event(self, title):
+        return Event.objects.create(
+            organizer=self.organizer,
+            title=title,
+            start_time="2030-01-01T10:00:00Z",
+            end_time="2030-01-01T12:00:00Z",
+            show_time="2030-01-01T09:00:00Z",
+            capacity=100,
+        )
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def assertConstantQueries(self, url, add_rows):
+        add_rows(1)
+        few = self.count_queries(url)
+        add_rows(8)
+        many = self.count_queries(url)
+        self.assertEqual(few, many, f"{url} runs more queries as rows grow")
+
+    def test_event_list(self):
+        def add_rows(n):
+            for i in range(n):
+                event = self.create_event(f"Event {Event.objects.count()}")
+                if i % 2:
+                    shard_inventory(event, 2)
+
+        self.assertConstantQueries(reverse("event-list"), add_rows)
+
+    def test_reservation_list(self):
+        def add_rows(n):
+            for _ in range(n):
+                event = self.create_event(f"Event {Event.objects.count()}")
+                shard_inventory(event, 2)
+                Reservation.objects.create(user=self.user, event=event)
+
+        self.client.force_authenticate(user=self.user)
+        self.assertConstantQueries(reverse("reservation-list"), add_rows)
+
+    def test_waitlist(self):
+        def add_rows(n):
+            for _ in range(n):
+                event = self.create_event(f"Event {Event.objects.count()}")
+                WaitlistEntry.objects.create(user=self.organizer, event=event)
+                WaitlistEntry.objects.create(user=self.user, event=event)
+
+        self.client.force_authenticate(user=self.user)
+        self.assertConstantQueries(reverse("waitlist-list"), add_rows)
+
+    def test_event_reservations(self):
+        def add_rows(n):
+            for _ in range(n):
+                attendee = User.objects.create_user(
+                    username=f"attendee{User.objects.count()}", password="pass"
+                )
+                Reservation.objects.create(user=attendee, event=self.hot_event)
+
+        self.client.force_authenticate(user=self.organizer)
+        url = reverse("event-reservations", args=[self.hot_event.id])
+        self.assertConstantQueries(url, add_rows)
+
+    def test_event_reservations_are_paginated(self):
+        for i in range(15):
+            attendee = User.objects.create_user(
+                username=f"attendee{i}", password="pass"
+            )
+            Reservation.objects.create(user=attendee, event=self.hot_event)
+
+        self.client.force_authenticate(user=self.organizer)
+        url = reverse("event-reservations", args=[self.hot_event.id])
+        response = self.client.get(url)
+        self.assertEqual(response.data["count"], 15)
+        self.assertEqual(len(response.data["results"]), 10)
+        self.assertIsNotNone(response.data["next"])
@@ -5,6 +5,7 @@ from rest_framework import status
 from django.contrib.auth import get_user_model
 from reservations.models import Reservation
 from events.models import Event
+from events.inventory import available_seats, shard_inventory
 
 User = get_user_model()
 
@@ -69,3 +70,104 @@ class ReservationTests(APITestCase):
 
         self.event.refresh_from_db()
         self.assertEqual(self.event.seats_remaining, 0)
+
+
+class ShardedInventoryTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.event = Event.objects.create(
+            organizer=self.user,
+            title="Hot Event",
+            start_time="2030-01-01T10:00:00Z",
+            end_time="2030-01-01T12:00:00Z",
+            show_time="2030-01-01T09:00:00Z",
+            capacity=5,
+            seats_remaining=5,
+        )
+        self.event = shard_inventory(self.event, 3)
+        self.client.force_authenticate(user=self.user)
+
+    def test_sharding_keeps_total_exact(self):
+        shards = list(self.event.seat_shards.order_by("index"))
+        self.assertEqual([s.seats_remaining for s in shards], [2, 2, 1])
+        self.assertEqual(self.event.seats_remaining, 0)
+        self.assertEqual(available_seats(self.event), 5)
+
+        event = shard_inventory(self.event, 0)
+        self.assertEqual(event.seats_remaining, 5)
+        self.assertFalse(event.seat_shards.exists())
+
+    def test_reservations_drain_shards_without_overbooking(self):
+        url = reverse("reservation-list")
+        for i in range(5):
+            user = User.objects.create_user(username=f"buyer{i}", password="pass")
+            self.client.force_authenticate(user=user)
+            response = self.client.post(url, {"event_id": self.event.id})
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        late = User.objects.create_user(username="late", password="pass")
+        self.client.force_authenticate(user=late)
+        response = self.client.post(url, {"event_id": self.event.id})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.event.refresh_from_db()
+        self.assertEqual(available_seats(self.event), 0)
+        self.assertEqual(Reservation.objects.filter(event=self.event).count(), 5)
+
+    def test_cancellation_returns_seat_to_a_shard(self):
+        url = reverse("reservation-list")
+        response = self.client.post(url, {"event_id": self.event.id})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["event"]["seats_remaining"], 4)
+
+        url = reverse("reservation-detail", args=[response.data["id"]])
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.event.refresh_from_db()
+        self.assertEqual(available_seats(self.event), 5)
+
+
+class ReservationListConditionalGetTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.event = Event.objects.create(
+            organizer=self.user,
+            title="Test Event",
+            start_time="2030-01-01T10:00:00Z",
+            end_time="2030-01-01T12:00:00Z",
+            show_time="2030-01-01T09:00:00Z",
+            capacity=5,
+        )
+        self.url = reverse("reservation-list")
+        self.client.force_authenticate(user=self.user)
+
+    def test_not_modified_until_reservations_or_events_change(self):
+        response = self.client.post(self.url, {"event_id": self.event.id})
+        detail_url = reverse("reservation-detail", args=[response.data["id"]])
+        etag = self.client.get(self.url)["ETag"]
+
+        # One aggregate query, nothing serialized.
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Another buyer takes a seat: the embedded event changed.
+        other = User.objects.create_user(username="other", password="pass")
+        Reservation.objects.create(user=other, event=self.event)
+        Event.objects.filter(pk=self.event.pk).update(seats_remaining=3)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["event"]["seats_remaining"], 3)
+
+        etag = response["ETag"]
+        self.client.delete(detail_url)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"], [])
+
+    def test_other_users_copy_does_not_match(self):
+        etag = self.client.get(self.url)["ETag"]
+        other = User.objects.create_user(username="other", password="pass")
+        Reservation.objects.create(user=other, event=self.event)
+        self.client.force_authenticate(user=other)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,77 @@
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from events import seating
+from events.inventory import shard_inventory
+from events.models import Event
+from reservations.models import Reservation, ReservedSeat
+from reservations.serializers import ReservationRowSerializer, ReservationSerializer
+
+User = get_user_model()
+
+
+@override_settings(EVENT_CACHE={"ENABLED": False, "ALIAS": "events"})
+class ReservationRowSerializerTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        plain = self.create_event("Plain")
+        sharded = shard_inventory(self.create_event("Sharded"), 2)
+        seated = self.create_event("Seated")
+        self.section = seating.add_section(seated, "Stalls", 1, 4)
+        Reservation.objects.create(user=self.user, event=plain)
+        Reservation.objects.create(user=self.user, event=sharded)
+        reservation = Reservation.objects.create(user=self.user, event=seated)
+        ReservedSeat.objects.bulk_create(
+            ReservedSeat(reservation=reservation, section=self.section, row=1, seat=n)
+            for n in (3, 2)
+        )
+        self.rows = ReservationRowSerializer()
+        self.client.force_authenticate(user=self.user)
+
+    def create_event(self, title):
+        return Event.objects.create(
+            organizer=self.user,
+            title=title,
+            start_time="2030-01-01T10:00:00Z",
+            end_time="2030-01-01T12:00:00Z",
+            show_time="2030-01-01T09:00:00Z",
+            capacity=5,
+        )
+
+    def reservations(self):
+        return (
+            Reservation.objects.select_related("user", "event")
+            .prefetch_related("event__seat_shards", "seats")
+            .order_by("id")
+        )
+
+    def test_rows_render_byte_identical_json(self):
+        render = JSONRenderer().render
+        reservations = self.reservations()
+        fast = self.rows.many(reservations.values(*self.rows.columns))
+        self.assertEqual(
+            render(fast), render(ReservationSerializer(reservations, many=True).data)
+        )
+        self.assertEqual(
+            fast[2]["seats"][0], {"section": self.section.id, "row": 1, "seat": 3}
+        )
+        for reservation in reservations:
+            self.assertEqual(
+                render(self.rows.one(self.rows.instance_row(reservation))),
+                render(ReservationSerializer(reservation).data),
+            )
+
+    def test_list_and_detail_endpoints(self):
+        expected = JSONRenderer().render(
+            ReservationSerializer(self.reservations(), many=True).data
+        )
+        # Validators, count, rows, shard sums and seats: constant per page.
+        with self.assertNumQueries(5):
+            resp = self.client.get(reverse("reservation-list"))
+        self.assertEqual(JSONRenderer().render(resp.data["results"]), expected)
+
+        reservation = self.reservations().last()
+        resp = self.client.get(reverse("reservation-detail", args=[reservation.id]))
+        self.assertEqual(resp.data, ReservationSerializer(reservation).data)
@@ -0,0 +1,157 @@
+from io import StringIO
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from events import seating
+from events.inventory import available_seats, shard_inventory
+from events.models import Event, EventSection
+from reservations.models import Reservation, ReservedSeat
+
+User = get_user_model()
+
+
+class AssignedSeatingTests(APITestCase):
+    def setUp(self):
+        self.organizer = User.objects.create_user(username="organizer", password="pass")
+        self.buyer = User.objects.create_user(username="buyer", password="pass")
+        self.event = Event.objects.create(
+            organizer=self.organizer,
+            title="Concert",
+            start_time="2030-01-01T10:00:00Z",
+            end_time="2030-01-01T12:00:00Z",
+            show_time="2030-01-01T09:00:00Z",
+            capacity=100,
+        )
+        self.client.force_authenticate(user=self.organizer)
+        response = self.client.post(
+            reverse("event-sections", args=[self.event.id]),
+            {"name": "Stalls", "rows": 3, "seats_per_row": 8},
+        )
+        self.assertEqual(response.status_code, 201)
+        self.section_id = response.data["id"]
+        self.client.force_authenticate(user=self.buyer)
+
+    def reserve(self, **data):
+        return self.client.post(
+            reverse("reservation-list"),
+            {"event_id": self.event.id, **data},
+            format="json",
+        )
+
+    def seat_map(self, **params):
+        response = self.client.get(reverse("event-seats", args=[self.event.id]), params)
+        return response.data["sections"][0]
+
+    def test_seated_events_cannot_be_sharded(self):
+        with self.assertRaises(ValueError):
+            shard_inventory(self.event, 4)
+        with self.assertRaises(CommandError):
+            call_command("shard_event_inventory", self.event.id, 4, stdout=StringIO())
+        self.assertEqual(self.reserve(best_available=2).status_code, 201)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.inventory_shards, 0)
+        self.assertEqual(self.event.seats_remaining, 22)
+        self.assertEqual(available_seats(self.event), 22)
+
+    def test_first_section_switches_event_to_assigned_seating(self):
+        self.event.refresh_from_db()
+        self.assertTrue(self.event.assigned_seating)
+        self.assertEqual((self.event.capacity, self.event.seats_remaining), (24, 24))
+
+        self.client.force_authenticate(user=self.organizer)
+        url = reverse("event-sections", args=[self.event.id])
+        self.client.post(url, {"name": "Balcony", "rows": 2, "seats_per_row": 5})
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.capacity, self.event.seats_remaining), (34, 34))
+
+        response = self.client.post(
+            url, {"name": "Balcony", "rows": 1, "seats_per_row": 1}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.client.force_authenticate(user=self.buyer)
+        response = self.client.post(url, {"name": "Box", "rows": 1, "seats_per_row": 1})
+        self.assertEqual(response.status_code, 403)
+
+    def test_reserve_specific_seats_and_cancel(self):
+        seats = [{"section": self.section_id, "row": 2, "seat": n} for n in (4, 5)]
+        response = self.reserve(seats=seats)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["seats"], seats)
+        self.assertEqual(self.seat_map()["seat_map"][1], "00011000")
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_remaining, 22)
+
+        other = User.objects.create_user(username="other", password="pass")
+        self.client.force_authenticate(user=other)
+        response = self.reserve(seats=[seats[1]])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("not available", response.data[0])
+
+        self.client.force_authenticate(user=self.buyer)
+        response = self.client.delete(
+            reverse("reservation-detail", args=[Reservation.objects.get().pk])
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.seat_map()["available"], 24)
+        self.assertEqual(ReservedSeat.objects.count(), 0)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_remaining, 24)
+
+    def test_best_available_block_is_front_and_centre(self):
+        seating.claim(self.event, [(self.section_id, 1, n) for n in (3, 4)])
+        self.assertEqual(
+            self.seat_map(block=3)["best_block"],
+            [{"row": 1, "seat": n} for n in (5, 6, 7)],
+        )
+        response = self.reserve(best_available=5)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            [seat["seat"] for seat in response.data["seats"]], [2, 3, 4, 5, 6]
+        )
+        self.assertEqual({seat["row"] for seat in response.data["seats"]}, {2})
+
+    def test_seat_map_reads_one_row_per_section(self):
+        # The event, its (empty) seat shards and the sections.
+        with self.assertNumQueries(3):
+            section = self.seat_map(block=2)
+        self.assertEqual(section["seat_map"], ["00000000"] * 3)
+
+    def test_invalid_requests(self):
+        seat = {"section": self.section_id, "row": 1, "seat": 1}
+        self.assertEqual(self.reserve().status_code, 400)
+        self.assertEqual(self.reserve(seats=[seat], best_available=1).status_code, 400)
+        for bad in [{**seat, "row": 4}, {**seat, "seat": 9}, {**seat, "section": 0}]:
+            self.assertEqual(self.reserve(seats=[bad]).status_code, 400)
+        self.assertEqual(self.reserve(seats=[seat, seat]).status_code, 400)
+        self.assertEqual(self.reserve(best_available=9).status_code, 400)
+        self.assertEqual(
+            self.client.post(
+                reverse("hold-list"), {"event_id": self.event.id}
+            ).status_code,
+            400,
+        )
+        self.assertEqual(Reservation.objects.count(), 0)
+        self.assertEqual(EventSection.objects.get().taken, bytes(3))
+
+    def test_sections_need_unsold_general_admission_event(self):
+        event = Event.objects.create(
+            organizer=self.organizer,
+            title="Club Night",
+            start_time="2030-01-01T10:00:00Z",
+            end_time="2030-01-01T12:00:00Z",
+            show_time="2030-01-01T09:00:00Z",
+            capacity=10,
+        )
+        response = self.client.post(reverse("reservation-list"), {"event_id": event.id})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            self.reserve(best_available=1).status_code, 201
+        )  # the seated event still works
+
+        self.client.force_authenticate(user=self.organizer)
+        response = self.client.post(
+            reverse("event-sections", args=[event.id]),
+            {"name": "Floor", "rows": 1, "seats_per_row": 10},
+        )
+        self.assertEqual(response.status_code, 400)
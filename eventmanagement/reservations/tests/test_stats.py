@@ -0,0 +1,146 @@
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from events import seating
+from events.models import Event
+from reservations.models import Reservation, ReservationDailyStats, WaitlistEntry
+
+User = get_user_model()
+
+
+class OrganizerStatsTests(APITestCase):
+    def setUp(self):
+        self.organizer = User.objects.create_user(username="organizer", password="pass")
+        self.buyers = [
+            User.objects.create_user(username=f"buyer{i}", password="pass")
+            for i in range(3)
+        ]
+        self.events = [
+            Event.objects.create(
+                organizer=self.organizer,
+                title=f"Event {i}",
+                start_time=f"2030-01-0{i + 1}T10:00:00Z",
+                end_time=f"2030-01-0{i + 1}T12:00:00Z",
+                show_time=f"2030-01-0{i + 1}T09:00:00Z",
+                capacity=2,
+            )
+            for i in range(2)
+        ]
+        self.url = reverse("event-stats")
+
+    def reserve(self, user, event):
+        self.client.force_authenticate(user=user)
+        return self.client.post(reverse("reservation-list"), {"event_id": event.id})
+
+    def stats(self, **params):
+        self.client.force_authenticate(user=self.organizer)
+        return self.client.get(self.url, params)
+
+    def test_counts_bookings_and_cancellations(self):
+        self.reserve(self.buyers[0], self.events[0])
+        self.reserve(self.buyers[1], self.events[0])
+        self.reserve(self.buyers[0], self.events[1])
+        reservation = Reservation.objects.get(user=self.buyers[1], event=self.events[0])
+        self.client.force_authenticate(user=self.buyers[1])
+        self.client.delete(reverse("reservation-detail", args=[reservation.id]))
+
+        response = self.stats()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["totals"],
+            {
+                "events": 2,
+                "capacity": 4,
+                "booked": 3,
+                "cancelled": 1,
+                "sold": 2,
+                "fill_rate": 0.5,
+            },
+        )
+        first = response.data["events"][0]
+        self.assertEqual((first["sold"], first["cancelled"]), (1, 1))
+        self.assertEqual(first["fill_rate"], 0.5)
+        self.assertEqual(
+            response.data["buckets"],
+            [{"period": timezone.localdate(), "booked": 3, "cancelled": 1}],
+        )
+
+    def test_waitlist_promotion_and_bulk_are_counted(self):
+        self.reserve(self.buyers[0], self.events[0])
+        self.reserve(self.buyers[1], self.events[0])
+        WaitlistEntry.objects.create(user=self.buyers[2], event=self.events[0])
+        reservation = Reservation.objects.get(user=self.buyers[0], event=self.events[0])
+        self.client.force_authenticate(user=self.buyers[0])
+        self.client.delete(reverse("reservation-detail", args=[reservation.id]))
+        self.client.force_authenticate(user=self.organizer)
+        self.client.post(
+            reverse("reservation-bulk"),
+            {
+                "items": [
+                    {"user_id": u.id, "event_id": self.events[1].id}
+                    for u in self.buyers
+                ]
+            },
+            format="json",
+        )
+
+        totals = self.stats().data["totals"]
+        self.assertEqual((totals["booked"], totals["cancelled"]), (5, 1))
+        self.assertEqual(totals["sold"], Reservation.objects.count())
+
+    def test_bucket_window_and_validation(self):
+        self.reserve(self.buyers[0], self.events[0])
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        response = self.stats(bucket="month", start=tomorrow.isoformat())
+        self.assertEqual(response.data["buckets"], [])
+        self.assertEqual(response.data["totals"]["sold"], 1)
+
+        response = self.stats(bucket="year")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_only_own_events(self):
+        self.reserve(self.buyers[0], self.events[0])
+        self.client.force_authenticate(user=self.buyers[0])
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["totals"]["events"], 0)
+        self.client.force_authenticate(user=None)
+        self.assertEqual(
+            self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED
+        )
+
+    def test_rebuild_matches_live_reservations(self):
+        for buyer in self.buyers[:2]:
+            self.reserve(buyer, self.events[0])
+        Reservation.objects.create(user=self.buyers[2], event=self.events[1])
+        ReservationDailyStats.objects.update(booked=99)
+
+        call_command("rebuild_stats", stdout=StringIO())
+
+        totals = self.stats().data["totals"]
+        self.assertEqual((totals["booked"], totals["sold"]), (3, 3))
+
+    def test_rebuild_counts_assigned_seats(self):
+        event = self.events[0]
+        Event.objects.filter(pk=event.pk).update(capacity=0, seats_remaining=0)
+        seating.add_section(event, "Floor", rows=2, seats_per_row=5)
+        self.client.force_authenticate(user=self.buyers[0])
+        response = self.client.post(
+            reverse("reservation-list"),
+            {"event_id": event.id, "best_available": 4},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.reserve(self.buyers[1], self.events[1])
+        before = self.stats().data
+
+        call_command("rebuild_stats", stdout=StringIO())
+
+        after = self.stats().data
+        self.assertEqual(after["totals"], before["totals"])
+        self.assertEqual(after["events"], before["events"])
+        self.assertEqual(after["events"][0]["sold"], 4)
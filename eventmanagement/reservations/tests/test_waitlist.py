@@ -0,0 +1,109 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from events.inventory import available_seats, shard_inventory
+from events.models import Event
+from reservations.models import Reservation, WaitlistEntry
+
+User = get_user_model()
+
+
+class WaitlistTests(APITestCase):
+    def setUp(self):
+        self.holder = User.objects.create_user(username="holder", password="pass")
+        self.waiters = [
+            User.objects.create_user(username=f"waiter{i}", password="pass")
+            for i in range(3)
+        ]
+        self.event = Event.objects.create(
+            organizer=self.holder,
+            title="Sold Out Event",
+            start_time="2030-01-01T10:00:00Z",
+            end_time="2030-01-01T12:00:00Z",
+            show_time="2030-01-01T09:00:00Z",
+            capacity=1,
+            seats_remaining=0,
+        )
+        self.reservation = Reservation.objects.create(
+            user=self.holder, event=self.event
+        )
+        self.url = reverse("waitlist-list")
+
+    def join(self, user):
+        self.client.force_authenticate(user=user)
+        return self.client.post(self.url, {"event_id": self.event.id})
+
+    def test_join_reports_fifo_position(self):
+        for i, waiter in enumerate(self.waiters):
+            response = self.join(waiter)
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(response.data["position"], i + 1)
+
+        entry = WaitlistEntry.objects.get(user=self.waiters[2])
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("waitlist-detail", args=[entry.id]))
+        self.assertEqual(response.data["position"], 3)
+
+        WaitlistEntry.objects.filter(user=self.waiters[0]).delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["results"][0]["position"], 2)
+
+    def test_cannot_join_when_seats_left_or_twice(self):
+        self.assertEqual(self.join(self.holder).status_code, 400)
+        self.join(self.waiters[0])
+        response = self.join(self.waiters[0])
+        self.assertIn("already on the waitlist", str(response.data))
+
+        self.event.seats_remaining = 1
+        self.event.save()
+        response = self.join(self.waiters[1])
+        self.assertIn("Seats are still available", str(response.data))
+
+    def test_cancellation_hands_seat_to_next_waiter(self):
+        for waiter in self.waiters[:2]:
+            self.join(waiter)
+
+        self.client.force_authenticate(user=self.holder)
+        url = reverse("reservation-detail", args=[self.reservation.id])
+        self.assertEqual(self.client.delete(url).status_code, 204)
+
+        self.assertTrue(
+            Reservation.objects.filter(user=self.waiters[0], event=self.event).exists()
+        )
+        self.assertFalse(WaitlistEntry.objects.filter(user=self.waiters[0]).exists())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_remaining, 0)
+
+        self.client.force_authenticate(user=self.waiters[1])
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["results"][0]["position"], 1)
+
+    def test_waiter_who_already_booked_is_skipped(self):
+        self.join(self.waiters[0])
+        self.join(self.waiters[1])
+        # waiter0 got a seat some other way while still queued.
+        Reservation.objects.create(user=self.waiters[0], event=self.event)
+
+        self.client.force_authenticate(user=self.holder)
+        self.client.delete(reverse("reservation-detail", args=[self.reservation.id]))
+
+        self.assertTrue(
+            Reservation.objects.filter(user=self.waiters[1], event=self.event).exists()
+        )
+        self.assertFalse(WaitlistEntry.objects.exists())
+
+    def test_cancellation_without_waiters_releases_seat(self):
+        shard_inventory(self.event, 2)
+        self.client.force_authenticate(user=self.holder)
+        url = reverse("reservation-detail", args=[self.reservation.id])
+        self.client.delete(url)
+        self.event.refresh_from_db()
+        self.assertEqual(available_seats(self.event), 1)
+
+    def test_leave_waitlist(self):
+        self.join(self.waiters[0])
+        entry = WaitlistEntry.objects.get(user=self.waiters[0])
+        response = self.client.delete(reverse("waitlist-detail", args=[entry.id]))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(WaitlistEntry.objects.exists())
@@ -1,10 +1,18 @@
-from .views import ReservationViewSet
+from . import async_views
+from .views import ReservationViewSet, SeatHoldViewSet, WaitlistViewSet
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
 router = DefaultRouter()
 router.register(r"reservations", ReservationViewSet)
+router.register(r"waitlist", WaitlistViewSet, basename="waitlist")
+router.register(r"holds", SeatHoldViewSet, basename="hold")
 
 urlpatterns = [
+    path(
+        "async/reservations/",
+        async_views.create_reservation,
+        name="async-reservation-create",
+    ),
     path("", include(router.urls)),
 ]
@@ -1,16 +1,35 @@
 from django.shortcuts import render
-from .models import Event, Reservation
-from rest_framework import viewsets, serializers
-from .serializers import ReservationSerializer
-from django.db import transaction
-from django.db.models import F
+from .models import Event, Reservation, ReservedSeat, SeatHold, WaitlistEntry
+from rest_framework import mixins, viewsets, serializers
+from .bulk import reserve_in_bulk
+from .serializers import (
+    BulkReservationSerializer,
+    ReservationRowSerializer,
+    ReservationSerializer,
+    SeatHoldSerializer,
+    WaitlistEntrySerializer,
+)
+from .holds import hold_expiry, return_seats
+from .idempotency import IDEMPOTENCY_KEY_PARAMETER, idempotent
+from .outbox import RESERVATION_CANCELLED, RESERVATION_CREATED, enqueue, payload
+from .stats import record
+from .waitlist import promote_waiters, with_positions
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max, Sum
+from django.utils import timezone
 import logging
 from drf_spectacular.utils import extend_schema
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from events import seating
+from events.inventory import claim_seat, release_seat
+from eventmanagement import conditional
+from eventmanagement.ratelimit import RateLimitMixin
 
 logger = logging.getLogger(__name__)
 
 
-class ReservationViewSet(viewsets.ModelViewSet):
+class ReservationViewSet(RateLimitMixin, viewsets.ModelViewSet):
     """
     A viewset for managing reservations.
     Users can create reservations for events, ensuring that seat availability is respected.
@@ -19,34 +38,80 @@ class ReservationViewSet(viewsets.ModelViewSet):
 
     queryset = Reservation.objects.all()
     serializer_class = ReservationSerializer
+    # Read-only output of list and detail responses; writes use serializer_class.
+    rows = ReservationRowSerializer()
+    rate_limit_policy = {"create": "reservation-create"}
 
     def get_queryset(self):
-        return Reservation.objects.filter(user=self.request.user)
+        return (
+            Reservation.objects.filter(user=self.request.user)
+            .select_related("user", "event")
+            .prefetch_related("event__seat_shards", "seats")
+            .order_by("id")
+        )
+
+    def list(self, request, *args, **kwargs):
+        """
+        The user's reservations, with validators from one aggregate over
+        them and their events. A matching If-None-Match gets a 304.
+        """
+        reservations = self.filter_queryset(self.get_queryset())
+        # Sharded events keep seats_remaining at zero, so joining their shards
+        # does not inflate the sum.
+        state = reservations.order_by().aggregate(
+            count=Count("id", distinct=True),
+            last_id=Max("id"),
+            created_at=Max("created_at"),
+            updated_at=Max("event__updated_at"),
+            shards_updated_at=Max("event__seat_shards__updated_at"),
+            seats=Sum("event__seats_remaining"),
+            shard_seats=Sum("event__seat_shards__seats_remaining"),
+        )
+        state["last_modified"] = conditional.newest(
+            state["created_at"], state["updated_at"], state["shards_updated_at"]
+        )
+
+        def build():
+            rows = reservations.prefetch_related(None).values(*self.rows.columns)
+            page = self.paginate_queryset(rows)
+            return self.get_paginated_response(self.rows.many(page)).data
+
+        return conditional.serve(request, state, build)
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response(self.rows.one(self.rows.instance_row(self.get_object())))
+
+    @extend_schema(parameters=[IDEMPOTENCY_KEY_PARAMETER])
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+    @extend_schema(parameters=[IDEMPOTENCY_KEY_PARAMETER])
+    @idempotent
+    def destroy(self, request, *args, **kwargs):
+        return super().destroy(request, *args, **kwargs)
 
     def perform_create(self, serializer):
         event = serializer.validated_data["event_id"]
+        if event.assigned_seating:
+            return self.create_seated(serializer, event)
         try:
             with transaction.atomic():
-                update = Event.objects.filter(
-                    pk=event.pk, seats_remaining__gt=0
-                ).update(seats_remaining=F("seats_remaining") - 1)
-                if update == 0:
+                if not claim_seat(event):
                     raise serializers.ValidationError(
                         "No seats remaining for this event."
                     )
                 try:
-                    serializer.save(user=self.request.user)
+                    reservation = serializer.save(user=self.request.user)
+                    record(event.pk, booked=1)
+                    enqueue(RESERVATION_CREATED, payload(reservation, event))
                 except serializers.ValidationError as ve:
                     logger.warning(f"Validation error creating reservation: {ve}")
-                    Event.objects.filter(pk=event.pk).update(
-                        seats_remaining=F("seats_remaining") + 1
-                    )
+                    release_seat(event)
                     raise
                 except Exception as e:
                     logger.error(f"Unexpected error creating reservation: {e}")
-                    Event.objects.filter(pk=event.pk).update(
-                        seats_remaining=F("seats_remaining") + 1
-                    )
+                    release_seat(event)
                     raise serializers.ValidationError(
                         "An unexpected error occurred. Please try again."
                     )
@@ -58,12 +123,71 @@ class ReservationViewSet(viewsets.ModelViewSet):
                 "Could not create reservation due to a server error."
             )
 
+    def create_seated(self, serializer, event):
+        data = serializer.validated_data
+        try:
+            with transaction.atomic():
+                if "best_available" in data:
+                    seats = seating.claim_best_block(event, data["best_available"])
+                    if seats is None:
+                        raise serializers.ValidationError(
+                            f"No block of {data['best_available']} adjacent seats is available."
+                        )
+                else:
+                    seats = [(s["section"], s["row"], s["seat"]) for s in data["seats"]]
+                    if not seating.claim(event, seats):
+                        raise serializers.ValidationError(
+                            "One or more of the selected seats is not available."
+                        )
+                reservation = serializer.save(user=self.request.user)
+                ReservedSeat.objects.bulk_create(
+                    ReservedSeat(reservation=reservation, section_id=s, row=r, seat=n)
+                    for s, r, n in seats
+                )
+                record(event.pk, booked=len(seats))
+                enqueue(RESERVATION_CREATED, payload(reservation, event))
+        except IntegrityError:
+            raise serializers.ValidationError(
+                "A conflicting reservation was made at the same time. Please retry."
+            )
+
     def perform_destroy(self, instance):
         with transaction.atomic():
-            event = Event.objects.select_for_update().get(pk=instance.event.pk)
-            event.seats_remaining = F("seats_remaining") + 1
-            event.save()
-            instance.delete()
+            event = instance.event
+            seats = (
+                [(s.section_id, s.row, s.seat) for s in instance.seats.all()]
+                if event.assigned_seating
+                else []
+            )
+            deleted, _ = Reservation.objects.filter(pk=instance.pk).delete()
+            # A concurrent cancellation already gave the seat back.
+            if not deleted:
+                return
+            enqueue(RESERVATION_CANCELLED, payload(instance, event))
+            if seats:
+                seating.release(event, seats)
+                record(event.pk, cancelled=len(seats))
+                return
+            record(event.pk, cancelled=1)
+            # The freed seat goes to the next waiter, if any, not the public counter.
+            if not promote_waiters(event, 1):
+                release_seat(event)
+
+    @extend_schema(request=BulkReservationSerializer)
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        """
+        Reserve many seats in one transaction.
+        Returns a result per item, marking which were reserved and which failed
+        (sold_out, duplicate, event_not_found, user_not_found, not_organizer,
+        assigned_seating).
+        """
+        serializer = BulkReservationSerializer(
+            data=request.data, context=self.get_serializer_context()
+        )
+        serializer.is_valid(raise_exception=True)
+        results = reserve_in_bulk(request.user, serializer.get_pairs())
+        return Response({"results": results})
 
     @extend_schema(exclude=True)
     def update(self, request, *args, **kwargs):
@@ -82,3 +206,105 @@ class ReservationViewSet(viewsets.ModelViewSet):
             {"detail": "PATCH operation is not allowed."},
             status=405,
         )
+
+
+class WaitlistViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    FIFO waitlist for sold-out events.
+    When a reservation is cancelled, the seat is handed to the first user in
+    the queue. Users can check their position and leave the queue.
+    """
+
+    queryset = WaitlistEntry.objects.all()
+    serializer_class = WaitlistEntrySerializer
+
+    def get_queryset(self):
+        return with_positions(
+            WaitlistEntry.objects.filter(user=self.request.user).order_by("id")
+        )
+
+    def perform_create(self, serializer):
+        try:
+            serializer.save(user=self.request.user)
+        except IntegrityError:
+            raise serializers.ValidationError(
+                "You are already on the waitlist for this event."
+            )
+
+
+class SeatHoldViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Time-limited seat holds for checkout flows.
+    Creating a hold takes a seat until `expires_at`. The hold is then either
+    confirmed into a reservation or released (DELETE). Holds that are not
+    confirmed in time are released by the `sweep_holds` command.
+    """
+
+    queryset = SeatHold.objects.all()
+    serializer_class = SeatHoldSerializer
+
+    def get_queryset(self):
+        return SeatHold.objects.filter(user=self.request.user).order_by("id")
+
+    def perform_create(self, serializer):
+        event = serializer.validated_data["event"]
+        try:
+            with transaction.atomic():
+                if not claim_seat(event):
+                    raise serializers.ValidationError(
+                        "No seats remaining for this event."
+                    )
+                serializer.save(user=self.request.user, expires_at=hold_expiry())
+        except IntegrityError:
+            raise serializers.ValidationError(
+                "You are already holding a seat for this event."
+            )
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            deleted, _ = SeatHold.objects.filter(pk=instance.pk).delete()
+            # Nothing to give back if the sweeper released it first.
+            if deleted:
+                return_seats(instance.event, 1)
+
+    @extend_schema(request=None, responses=ReservationSerializer)
+    @action(detail=True, methods=["post"])
+    def confirm(self, request, pk=None):
+        """
+        Turn an unexpired hold into a reservation.
+        The seat was already taken when the hold was created, so no counter changes.
+        """
+        hold = self.get_object()
+        try:
+            with transaction.atomic():
+                deleted, _ = SeatHold.objects.filter(
+                    pk=hold.pk, expires_at__gt=timezone.now()
+                ).delete()
+                if not deleted:
+                    raise serializers.ValidationError("This hold has expired.")
+                reservation = Reservation.objects.create(
+                    user=request.user, event=hold.event
+                )
+                # Booked now, so a later cancellation must not book them again.
+                WaitlistEntry.objects.filter(
+                    user=request.user, event_id=hold.event_id
+                ).delete()
+                record(hold.event_id, booked=1)
+                enqueue(RESERVATION_CREATED, payload(reservation, hold.event))
+        except IntegrityError:
+            raise serializers.ValidationError(
+                "You have already made a reservation for this event."
+            )
+        return Response(ReservationSerializer(reservation).data, status=201)
@@ -0,0 +1,64 @@
+from django.db import connection
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Reservation, SeatHold, WaitlistEntry
+from .outbox import RESERVATION_CREATED, enqueue, payload
+from .stats import record
+
+
+def with_positions(queryset):
+    """Annotate waitlist entries with their 1-based queue position."""
+    ahead = (
+        WaitlistEntry.objects.filter(event=OuterRef("event"), id__lt=OuterRef("id"))
+        .order_by()
+        .values("event")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    return queryset.annotate(
+        position=Coalesce(Subquery(ahead, output_field=IntegerField()), Value(0)) + 1
+    )
+
+
+def promote_waiters(event, seats):
+    """
+    Hand up to ``seats`` freed seats straight to the oldest waiters by
+    creating their reservations, without returning the seats to the public
+    counter. Returns how many seats were handed over; the caller must release
+    the rest. Call inside the transaction that freed the seats.
+    """
+    promoted = 0
+    while promoted < seats:
+        # Skip entries a concurrent cancellation is already promoting.
+        waiters = list(
+            WaitlistEntry.objects.select_for_update(
+                skip_locked=connection.features.has_select_for_update_skip_locked
+            )
+            .filter(event_id=event.pk)
+            .order_by("id")[: seats - promoted]
+        )
+        if not waiters:
+            break
+        # Waiters who booked or hold a seat in the meantime are dequeued
+        # without a second seat.
+        user_ids = [w.user_id for w in waiters]
+        holders = set(
+            Reservation.objects.filter(
+                event_id=event.pk, user_id__in=user_ids
+            ).values_list("user_id", flat=True)
+        ) | set(
+            SeatHold.objects.filter(
+                event_id=event.pk, user_id__in=user_ids
+            ).values_list("user_id", flat=True)
+        )
+        WaitlistEntry.objects.filter(pk__in=[w.pk for w in waiters]).delete()
+        created = Reservation.objects.bulk_create(
+            Reservation(user_id=w.user_id, event_id=event.pk)
+            for w in waiters
+            if w.user_id not in holders
+        )
+        enqueue(RESERVATION_CREATED, *(payload(r, event) for r in created))
+        promoted += len(created)
+    record(event.pk, booked=promoted)
+    return promoted